@@ -21,28 +21,33 @@ finder = NgramEntityFinder
 import pickle
 import data
 import logging
+import functools
 from optparse import OptionParser
+from runner import run,add_runner_options
 
-def exp(questions,qnum,method):
-    for i in range(qnum):
-        print('问题 : %s'%(i))
-        q = questions[i]
-        
-        lexer = LexRank(q,250)
-        result = lexer.extract()
-        lexer.evaluation(result,'lex')
+#一个问题的实验, 在worker进程里面跑
+def exp_one(qid,q,method):
+    lexer = LexRank(q,250)
+    result = lexer.extract()
+    lexer.evaluation(result,'lex')
+    #result是摘要文件的路径, 句子数从lexer里面拿
+    return {"sentences":lexer.sum_sents}
+
+def exp(questions,qnum,method,workers=1,checkpoint=None):
+    run(questions,functools.partial(exp_one,method=method),workers,checkpoint,range(qnum))
 
 if __name__ == "__main__":
     print(__doc__)
 
-    #parser = OptionParser()
+    parser = OptionParser()
     #parser.add_option('-d','--data',dest='data',help='选择数据集')
     #parser.add_option('-m','--method',dest='method',help='算法选择')
-    #(options,args) = parser.parse_args()
+    add_runner_options(parser)
+    (options,args) = parser.parse_args()
 
     print('loading the data..')
     duc_question = pickle.load(open('/home/lavi/project/insummer/question_data/duc_question.pkl','rb'))
 
     #method = options.method
     
-    exp(duc_question,4,'lex')
+    exp(duc_question,4,'lex',options.workers,options.checkpoint)
@@ -8,24 +8,17 @@ sys.path.append("..")
 import insummer
 from insummer.read_conf import config
 
-import pickle
+from insummer.question_store import load_questions
 
 qconf = config("../../conf/question.conf")
 
+#配置了filter_qa_store/duc_question_store(script/build_question_store.py建的)就用store, 用到哪个问题读哪个
+#否则还是把整个pickle读进来
 def get_data():
-    
-    data_dir = qconf["filter_qa"]
-    f = open(data_dir,'rb')
-    data = pickle.load(f)
-    
-    return data
+    return load_questions(qconf,"filter_qa")
 
 def get_duc():
-    duc_dir = qconf['duc_question']
-    f = open(duc_dir,'rb')
-    data = pickle.load(f)
-
-    return data
+    return load_questions(qconf,"duc_question")
 
 
 if __name__ == '__main__':
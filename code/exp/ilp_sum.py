@@ -10,10 +10,12 @@ import insummer
 
 import pickle
 from insummer.read_conf import config
+from insummer.rouge import duc_evals,rouge_from_conf,average,write_scores,print_average
 
 import data
 import logging
 from optparse import OptionParser 
+from runner import run,add_runner_options
 
 from insummer.summarization.ilp import traditional_ilp as TI
 data_conf = config('../../conf/question.conf')
@@ -32,67 +34,53 @@ def write_tofile(question,sent_list):
     return wp    
 
 
-def evaluation(result,flags):
-
-    xml_file = open(data_conf['xml_path'],'w')
-    xml_file.write('<ROUGE_EVAL version="1.5.5">\n')
+#所有问题的摘要写好之后一起算ROUGE, 只启动shards次perl
+#每个问题的分数还是写到ROUGE_SCORE下面, 格式和以前一样
+#native=True的时候在进程内算ROUGE, 不调perl
+def evaluation(results,flags,shards=1,native=False):
     topic_ass_dict = pickle.load(open(data_conf['topic_ass_path'],'rb'))
-    tmp_s = result.split('/')
-    peer = tmp_s[-1]
-    score_path = data_conf['ROUGE_SCORE']+peer+flags
-    peer_path = '/'.join(tmp_s[:-1])
-    for evalid in topic_ass_dict[peer]:
-        xml_file.write('<EVAL ID="' + evalid + '">\n')
-        xml_file.write('<PEER-ROOT>\n')
-        xml_file.write(peer_path + '\n')
-        xml_file.write('</PEER-ROOT>\n')
-        xml_file.write('<MODEL-ROOT>\n')
-        xml_file.write(data_conf['ROUGE_model'] + '\n')
-        xml_file.write('</MODEL-ROOT>\n')
-        xml_file.write('<INPUT-FORMAT TYPE="SPL">\n')
-        xml_file.write('</INPUT-FORMAT>\n')
-        xml_file.write('<PEERS>\n')
-        xml_file.write('<P ID="'+ peer[3:5] +'">' + peer + '</P>\n')
-        xml_file.write('</PEERS>\n')
-        xml_file.write('<MODELS>\n')
-        for s_model in topic_ass_dict[peer]:
-            if s_model != evalid:
-                xml_file.write('<M ID="' + s_model[-1] + '">' + s_model + '</M>\n')
-        xml_file.write('</MODELS>\n')
-        xml_file.write('</EVAL>\n')
-    xml_file.write('</ROUGE_EVAL>')
-    xml_file.close()
-
-    options = ' -n 4 -w 1.2 -m -2 4 -u -c 95 -r 1000 -f A -p 0.5 -t 0 -a '
-
-    exec_command = data_conf['ROUGE_PATH'] + ' -e ' + data_conf['rouge_data_path'] + options + ' -x ' + data_conf['xml_path'] + ' > ' + score_path
-
-    os.system(exec_command)
 
+    evals,peer_evals = [],{}
+    for result in results.values():
+        one = duc_evals(result["peer"],data_conf['ROUGE_model'],topic_ass_dict)
+        peer_evals[result["peer"]] = set([e.eval_id for e in one])
+        evals.extend(one)
 
+    scores = rouge_from_conf(data_conf,native).run(evals,shards,flags)
+
+    for peer_path,eval_ids in peer_evals.items():
+        peer = os.path.basename(peer_path)
+        write_scores(average(scores,eval_ids),data_conf['ROUGE_SCORE']+peer+flags,peer[3:5])
+
+    print_average(average(scores))
+    return scores
 
-#定义exp函数, 是实验的主体
-#qnum是问题数据的个数
-def exp(questions,qnum):
 
-    for i in range(qnum):
-        print("问题 %s"%(i))
-        q = questions[i]
-        q.clean()
-        ose = TI(q,250)
+#一个问题的实验, 在worker进程里面跑
+def exp_one(qid,q):
+    q.clean()
+    ose = TI(q,250)
 
-        slist = ose.extract()
+    slist = ose.extract()
 
-        wp = write_tofile(ose.get_question(),slist)
+    wp = write_tofile(ose.get_question(),slist)
+
+    return {"sentences":len(slist),"peer":wp}
+
+#定义exp函数, 是实验的主体
+#qnum是问题数据的个数
+def exp(questions,qnum,workers=1,checkpoint=None,native=False):
+    results = run(questions,exp_one,workers,checkpoint,range(qnum))
 
-        evaluation(wp,'ilp')
-        print(100*"=")
+    evaluation(results,'ilp',workers,native)
 
 if __name__ == '__main__':
     print(__doc__)
 
     parser = OptionParser()  
     parser.add_option("-d", "--data", dest="data",help="选择数据集")
+    add_runner_options(parser)
+    parser.add_option("-n", "--native", dest="native",action="store_true",default=False,help="进程内算ROUGE, 不调perl")
 
     (options, args) = parser.parse_args()
     
@@ -106,5 +94,5 @@ if __name__ == '__main__':
         logging.error("载入数据出现错误")
         sys.exit(1)
         
-    exp(questions,len(questions))
+    exp(questions,len(questions),options.workers,options.checkpoint,options.native)
         
@@ -8,12 +8,15 @@ import sys
 sys.path.append("..")
 import insummer
 from insummer.read_conf import config
+from insummer.rouge import rouge_eval,rouge_from_conf,average,write_scores,print_average
 
 
 data_conf = config('../../conf/question.conf')
 
 import logging
+import functools
 from optparse import OptionParser 
+from runner import run,add_runner_options
 
 from insummer.summarization.ilp import sparse_ilp as SI
 #from insummer.summarization.textrank import SPTextRank as TR
@@ -43,56 +46,23 @@ def write_tofile(question,sent_list):
     return fname  
     
     
-def evaluation(result,flags,q):
+#一个问题一个EVAL, eval id是文件名, 例如1 => as_sum里面的1.sum是标准的摘要
+def make_eval(fname):
+    return rouge_eval(fname,as_res,[("01",fname+".res")],as_sum,[("A",fname+".sum")])
 
-    xml_file = open(data_conf['xml_path'],'w')
+#所有问题的摘要写好之后一起算ROUGE, 只启动shards次perl
+#每个问题的分数还是写到ROUGE_SCORE下面, 格式和以前一样
+#native=True的时候在进程内算ROUGE, 不调perl
+def evaluation(results,flags,shards=1,native=False):
+    fnames = [result["fname"] for result in results.values()]
 
-    author = q.get_author()
-    fname = author.split("|")[0]
+    scores = rouge_from_conf(data_conf,native).run([make_eval(fname) for fname in fnames],shards,flags)
 
-    #step1 xml开头
-    xml_file.write('<ROUGE_EVAL version="1.5.5">\n')
+    for fname in fnames:
+        write_scores(average(scores,[fname]),data_conf['ROUGE_SCORE']+fname+flags)
 
-    #step2 eval id => 这个写文件名，例如1.txt => 里面含有标准的摘要
-    xml_file.write('<EVAL ID="' + fname + '">\n')
-
-    #这个是我自己写的
-    xml_file.write('<PEER-ROOT>\n')
-    xml_file.write(as_res + '\n')
-    xml_file.write('</PEER-ROOT>\n')
-
-
-    #模型的，就是标准数据集
-    xml_file.write('<MODEL-ROOT>\n')
-    xml_file.write(as_sum + '\n')
-    xml_file.write('</MODEL-ROOT>\n')
-
-    #写文件的格式
-    xml_file.write('<INPUT-FORMAT TYPE="SPL">\n')
-    xml_file.write('</INPUT-FORMAT>\n')
-
-    #这个是我自己的文件名
-    sum_name = fname+".res"
-    xml_file.write('<PEERS>\n')
-    xml_file.write('<P ID="01">' + sum_name + '</P>\n')
-    xml_file.write('</PEERS>\n')
-    
-    #这个是模型的
-    xml_file.write('<MODELS>\n')
-    xml_file.write("<M ID=\"A\">%s.sum</M>\n"%(fname))
-    xml_file.write('</MODELS>\n')
-
-    xml_file.write('</EVAL>')
-    xml_file.write('</ROUGE_EVAL>')
-    xml_file.close()
-
-    options = ' -n 4 -w 1.2 -m -2 4 -u -c 95 -r 1000 -f A -p 0.5 -t 0 -a '
-        
-    score_path = data_conf['ROUGE_SCORE']+fname+"silp"
-        
-    exec_command = data_conf['ROUGE_PATH'] + ' -e ' + data_conf['rouge_data_path'] + options + ' -x ' + data_conf['xml_path'] + ' > ' + score_path
-
-    os.system(exec_command)
+    print_average(average(scores))
+    return scores
 
 import re,sys
 #建立问句和答案的类
@@ -145,33 +115,36 @@ def build_questions():
         
     return questions
 
-    
-def exp(questions,qnum,method):
-    for i in range(qnum):
-        print("问题 %s"%(i))
-        q = questions[i]
-        q.clean()
-        if method == "sip":
-            ose = SI(q,100)
-        else:
-            pass
-
-        '''
-        elif method == "dum":
-            ose = YA(q,100)
-        elif method == "tr":
-            ose = TR(q,100)
-        elif method == "lr":
-            ose = LR(q,100)
-            
-        else:
-            print("没有选定指定方法")
-            sys.exit(1)
-        '''
-        slist = ose.extract()
-        wp = write_tofile(ose.get_question(),slist)
-        evaluation(wp,"silp",ose.get_question())
-        print(100*"=")
+
+#一个问题的实验, 在worker进程里面跑
+def exp_one(qid,q,method):
+    q.clean()
+    if method == "sip":
+        ose = SI(q,100)
+    else:
+        pass
+
+    '''
+    elif method == "dum":
+        ose = YA(q,100)
+    elif method == "tr":
+        ose = TR(q,100)
+    elif method == "lr":
+        ose = LR(q,100)
+        
+    else:
+        print("没有选定指定方法")
+        sys.exit(1)
+    '''
+    slist = ose.extract()
+    wp = write_tofile(ose.get_question(),slist)
+    fname = ose.get_question().get_author().split("|")[0]
+    return {"sentences":len(slist),"fname":fname}
+
+def exp(questions,qnum,method,workers=1,checkpoint=None,native=False):
+    results = run(questions,functools.partial(exp_one,method=method),workers,checkpoint,range(qnum))
+
+    evaluation(results,"silp",workers,native)
 
 
 from optparse import OptionParser         
@@ -182,10 +155,12 @@ if __name__ == '__main__':
 
     parser = OptionParser()  
     parser.add_option("-m", "--method", dest="method",help="方法")
+    add_runner_options(parser)
+    parser.add_option("-n", "--native", dest="native",action="store_true",default=False,help="进程内算ROUGE, 不调perl")
 
     (options, args) = parser.parse_args()
 
-    exp(questions,len(questions),options.method)
+    exp(questions,len(questions),options.method,options.workers,options.checkpoint,options.native)
     #exp(questions,45)
 
     print("问题总数",len(all_fnames))
@@ -14,44 +14,32 @@ import insummer
 #将同义词扩展模块引入
 from insummer.query_expansion.entity_expansioner import RankRelateFilterExpansioner
 
-#引入实体发现模块,暂定的是baseline的ngram模块
-from insummer.query_expansion.entity_finder import NgramEntityFinder
-finder = NgramEntityFinder
+#引入实体发现模块, baseline的ngram模块的一遍完成版本, 和答案句子抽实体用的一样
+from insummer.query_expansion.entity_finder import SinglePassNgramEntityFinder
+finder = SinglePassNgramEntityFinder
 
 #引入数据模块
 import data
 import logging
+import functools
 from optparse import OptionParser 
+from runner import run,aggregate,print_summary,add_runner_options
 
-#定义exp函数, 是实验的主体
-#qnum是问题数据的个数
-def exp(questions,qnum,tmaxl,rmaxl):
-    tratio,tquantity,te,tf = 0,0,0,0
-    for i in range(qnum):
-        print("问题 %s"%(i))
-        q = questions[i]
-        ose = RankRelateFilterExpansioner(q,finder,1,1,display=True,n=tmaxl,length=rmaxl)
-        ratio,quantity,expand_entity,filter_len = ose.run()
-
-        #命中率
-        tratio += ratio
-
-        #命中个数
-        tquantity += quantity
+#一个问题的实验, 在worker进程里面跑
+def exp_one(qid,q,tmaxl,rmaxl):
+    ose = RankRelateFilterExpansioner(q,finder,1,1,display=True,n=tmaxl,length=rmaxl)
+    ratio,quantity,expand_entity,filter_len = ose.run()
 
-        #扩展实体个数
-        te += expand_entity
+    #命中率, 命中个数, 扩展实体个数, 过滤实体个数
+    return {"ratio":ratio,"quantity":quantity,"expand":expand_entity,"filter":filter_len}
 
-        #过滤实体个数
-        tf +=  filter_len
-        
-        #ose.print_sentence_entity()
-        print(150*"=")
+#定义exp函数, 是实验的主体
+#qnum是问题数据的个数
+def exp(questions,qnum,tmaxl,rmaxl,workers=1,checkpoint=None):
+    results = run(questions,functools.partial(exp_one,tmaxl=tmaxl,rmaxl=rmaxl),workers,checkpoint,range(qnum))
 
-    print("平均命中率 : %s"%(tratio/qnum))
-    print("平均命中个数 : %s"%(tquantity/qnum))
-    print("平均扩展实体个数: %s"%(te/qnum))
-    print("平均同义层过滤后实体个数: %s"%(tf/qnum))
+    print_summary(aggregate(results),[("ratio","平均命中率"),("quantity","平均命中个数"),\
+                                      ("expand","平均扩展实体个数"),("filter","平均同义层过滤后实体个数")])
 
 if __name__ == '__main__':
     print(__doc__)
@@ -60,6 +48,7 @@ if __name__ == '__main__':
     parser.add_option("-d", "--data", dest="data",help="选择数据集")
     parser.add_option("-t","--tmaxl",dest="tmaxl",help="同义层最大个数")
     parser.add_option("-r","--rmaxl",dest="rmaxl",help="关联层最大个数")
+    add_runner_options(parser)
     
 
     (options, args) = parser.parse_args()
@@ -80,6 +69,6 @@ if __name__ == '__main__':
     rmaxl = int(options.rmaxl)
         
     #exp(questions,length,tmaxl,rmaxl)
-    exp(questions,4,tmaxl,rmaxl)
+    exp(questions,4,tmaxl,rmaxl,options.workers,options.checkpoint)
         
     print("数据集%s，数据长度%s，同义层最大个数%s,关联层最大个数%s"%(options.data,length,tmaxl,rmaxl))    
@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+
+'''
+实验的公共运行器, 把问题分给进程池, 每个问题在一个worker进程里面跑
+    results = run(questions,task,workers=32,checkpoint="syn_ranker.ckpt")
+task(qid,question) 是模块级别的函数(要能pickle, 带参数的话用functools.partial), 返回这个问题的指标dict
+checkpoint是jsonl文件, 每跑完一个问题追加一行 {"qid":..,"task":..,"result":{..}}
+task是任务函数和参数的指纹, 程序挂了重新跑的时候, checkpoint里面qid和指纹都一样的直接跳过, 结果从文件里面读
+参数改了之后用同一个checkpoint, 旧参数的结果不会拿来用, 问题会重新跑
+某个问题出错只打印出来, 不写checkpoint, 下次重跑的时候再试
+'''
+
+import os
+import sys
+import json
+import functools
+import traceback
+import multiprocessing as mp
+
+sys.path.append("..")
+import insummer
+from insummer import registry
+
+#worker进程里面的问题集合和任务, 由initializer设置
+worker_questions = None
+worker_task = None
+
+def init_worker(questions,task):
+    global worker_questions,worker_task
+    worker_questions = questions
+    worker_task = task
+
+    #KB的连接不能跨进程共享, 每个worker自己重新连
+    registry.reset("kb_backend")
+
+#跑一个问题, 返回 (qid,结果,错误)
+def run_one(qid,questions,task):
+    try:
+        return qid,task(qid,questions[qid]),None
+    except Exception:
+        return qid,None,traceback.format_exc()
+
+def worker_run(qid):
+    return run_one(qid,worker_questions,worker_task)
+
+#任务的指纹: 函数名加上functools.partial绑定的参数
+def task_fingerprint(task):
+    args,keywords = (),{}
+    while isinstance(task,functools.partial):
+        args = task.args + args
+        keywords = dict(task.keywords,**keywords)
+        task = task.func
+
+    name = "%s.%s"%(getattr(task,"__module__",""),getattr(task,"__qualname__",repr(task)))
+    return json.dumps([name,[repr(arg) for arg in args],{key:repr(value) for key,value in keywords.items()}],sort_keys=True)
+
+#读checkpoint, 返回 {qid:结果}
+#fingerprint不是None的时候, 只要指纹一样的记录
+def load_checkpoint(checkpoint,fingerprint=None):
+    done = {}
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return done
+
+    with open(checkpoint) as ckpt_file:
+        for line in ckpt_file:
+            line = line.strip()
+            if len(line) == 0:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                #最后一行可能写到一半就挂了
+                continue
+            if fingerprint is not None and record.get("task") != fingerprint:
+                continue
+            done[record["qid"]] = record["result"]
+
+    return done
+
+#questions : 问题list或者question_store
+#qids      : 要跑的问题, 默认是全部
+#返回 {qid:结果}, 包括checkpoint里面之前跑完的
+def run(questions,task,workers=1,checkpoint=None,qids=None):
+    if qids is None:
+        qids = range(len(questions))
+
+    fingerprint = task_fingerprint(task)
+    wanted = set(qids)
+    results = {qid:result for qid,result in load_checkpoint(checkpoint,fingerprint).items() if qid in wanted}
+    todo = [qid for qid in qids if qid not in results]
+    if len(results) > 0:
+        print("checkpoint里面已经有 %s 个问题, 还剩 %s 个"%(len(results),len(todo)))
+
+    ckpt_file = open(checkpoint,"a") if checkpoint is not None else None
+    if ckpt_file is not None and ckpt_file.tell() > 0:
+        #上次最后一行写到一半就挂了的话, 先换行, 不然新的记录接在坏的行后面也读不出来
+        with open(checkpoint,"rb") as last:
+            last.seek(-1,os.SEEK_END)
+            if last.read(1) != b"\n":
+                ckpt_file.write("\n")
+
+    def collect(qid,result,error):
+        if error is not None:
+            print("问题 %s 出错\n%s"%(qid,error))
+            return
+
+        results[qid] = result
+        if ckpt_file is not None:
+            ckpt_file.write(json.dumps({"qid":qid,"task":fingerprint,"result":result})+"\n")
+            ckpt_file.flush()
+
+        print("问题 %s 完成, 共 %s/%s"%(qid,len(results),len(qids)))
+
+    try:
+        if workers <= 1:
+            for qid in todo:
+                collect(*run_one(qid,questions,task))
+        else:
+            with mp.Pool(workers,initializer=init_worker,initargs=(questions,task)) as pool:
+                for qid,result,error in pool.imap_unordered(worker_run,todo):
+                    collect(qid,result,error)
+    finally:
+        if ckpt_file is not None:
+            ckpt_file.close()
+
+    return results
+
+#把所有问题的指标求平均, 返回 {指标:平均值}
+def aggregate(results):
+    total,count = {},{}
+    for result in results.values():
+        if result is None:
+            continue
+        for key,value in result.items():
+            if isinstance(value,(int,float)):
+                total[key] = total.get(key,0) + value
+                count[key] = count.get(key,0) + 1
+
+    return {key:total[key]/count[key] for key in total}
+
+#names是 [(指标,显示的名字)...], 按这个顺序打印
+def print_summary(summary,names):
+    for key,name in names:
+        if key in summary:
+            print("%s : %s"%(name,summary[key]))
+
+#实验脚本公用的命令行参数
+def add_runner_options(parser):
+    parser.add_option("-w", "--workers", dest="workers",type="int",default=1,help="进程数")
+    parser.add_option("-c", "--checkpoint", dest="checkpoint",default=None,help="checkpoint文件, 重跑的时候跳过已经跑完的问题")
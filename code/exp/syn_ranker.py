@@ -15,57 +15,44 @@ import insummer
 #将同义词扩展模块引入
 from insummer.query_expansion.entity_expansioner import SynPagerankExpansioner,SynHitsExpansioner,SynCCExpansioner,SynKCoreExpansioner
 
-#引入实体发现模块,暂定的是baseline的ngram模块
-from insummer.query_expansion.entity_finder import NgramEntityFinder
-finder = NgramEntityFinder
+#引入实体发现模块, baseline的ngram模块的一遍完成版本, 和答案句子抽实体用的一样
+from insummer.query_expansion.entity_finder import SinglePassNgramEntityFinder
+finder = SinglePassNgramEntityFinder
 
 #引入数据模块
 import data
 import logging
+import functools
 from optparse import OptionParser 
+from runner import run,aggregate,print_summary,add_runner_options
 
 Method = ["pr","hits","cc","kcore"]
 
+#一个问题的实验, 在worker进程里面跑
+def exp_one(qid,q,method):
+    ose = ""
+    
+    if method == "pr":
+        ose = SynPagerankExpansioner(q,finder,level1=1,level2=1,display=True,n=20)
+    elif method == "hits":
+        ose = SynHitsExpansioner(q,finder,level1=1,level2=1,display=True,n=30)
+    elif method == "cc":
+        ose = SynCCExpansioner(q,finder,level1=1,level2=1,display=True)
+    else:
+        ose = SynKCoreExpansioner(q,finder,level1=1,level2=1,display=True)
+        
+    ratio,quantity,expand_entity,filter_len = ose.run()
+
+    #命中率, 命中个数, 扩展实体个数, 过滤实体个数
+    return {"ratio":ratio,"quantity":quantity,"expand":expand_entity,"filter":filter_len}
+
 #定义exp函数, 是实验的主体
 #qnum是问题数据的个数
-def exp(questions,qnum,method):
-    tratio,tquantity,te,tf = 0,0,0,0
-    for i in range(qnum):
-        print("问题 %s"%(i))
-        q = questions[i]
-
-        ose = ""
-        
-        if method == "pr":
-            ose = SynPagerankExpansioner(q,finder,level1=1,level2=1,display=True,n=20)
-        elif method == "hits":
-            ose = SynHitsExpansioner(q,finder,level1=1,level2=1,display=True,n=30)
-        elif method == "cc":
-            ose = SynCCExpansioner(q,finder,level1=1,level2=1,display=True)
-        else:
-            ose = SynKCoreExpansioner(q,finder,level1=1,level2=1,display=True)
-            
-        ratio,quantity,expand_entity,filter_len = ose.run()
-
-        #命中率
-        tratio += ratio
-
-        #命中个数
-        tquantity += quantity
-
-        #扩展实体个数
-        te += expand_entity
-
-        #过滤实体个数
-        tf +=  filter_len
-        
-        #ose.print_sentence_entity()
-        print(100*"=")
+def exp(questions,qnum,method,workers=1,checkpoint=None):
+    results = run(questions,functools.partial(exp_one,method=method),workers,checkpoint,range(qnum))
 
-    print("平均命中率 : %s"%(tratio/qnum))
-    print("平均命中个数 : %s"%(tquantity/qnum))
-    print("平均扩展实体个数: %s"%(te/qnum))
-    print("平均同义层过滤后实体个数: %s"%(tf/qnum))
+    print_summary(aggregate(results),[("ratio","平均命中率"),("quantity","平均命中个数"),\
+                                      ("expand","平均扩展实体个数"),("filter","平均同义层过滤后实体个数")])
 
 if __name__ == '__main__':
     print(__doc__)
@@ -73,6 +60,7 @@ if __name__ == '__main__':
     parser = OptionParser()  
     parser.add_option("-d", "--data", dest="data",help="选择数据集")
     parser.add_option("-m", "--method", dest="method",help="优化算法")
+    add_runner_options(parser)
 
     (options, args) = parser.parse_args()
     
@@ -96,6 +84,6 @@ if __name__ == '__main__':
         pass
 
 
-    exp(questions,length,method)
+    exp(questions,length,method,options.workers,options.checkpoint)
     print("数据集%s，数据长度%s，优化算法%s"%(options.data,length,method))    
 
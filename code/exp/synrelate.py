@@ -15,9 +15,9 @@ import insummer
 #将同义词扩展模块引入
 from insummer.query_expansion.entity_expansioner import SynRelateExpansioner
 
-#引入实体发现模块,暂定的是baseline的ngram模块
-from insummer.query_expansion.entity_finder import NgramEntityFinder
-finder = NgramEntityFinder
+#引入实体发现模块, baseline的ngram模块的一遍完成版本, 和答案句子抽实体用的一样
+from insummer.query_expansion.entity_finder import SinglePassNgramEntityFinder
+finder = SinglePassNgramEntityFinder
 
 #引入数据模块
 import data
@@ -5,12 +5,12 @@
 这个文件的主要作用是定义一些常见的数据结构
 '''
 
-from .util import NLP
+from .registry import lazy
 from .util import rule_based_sentence_cleaner as RBSC
 import sys
 
 rbsc = RBSC()
-nlp = NLP()
+nlp = lazy("nlp")
 
 #问题类,一个问题通常有
 #1.标题 title
@@ -20,19 +20,54 @@ nlp = NLP()
 #5.作者,author
 #6.答案数目,answer_count
 #六个部分组成
+#clean_tag=False表示传进来的已经是去掉html标签的了, 从question_store读出来的时候用
 class Question:
-    def __init__(self,title,content,best,nbest,author="",answer_count=0):
-        self.__title = nlp.remove_tag(title)
-        self.__content = nlp.remove_tag(content)
+    def __init__(self,title,content,best,nbest,author="",answer_count=0,clean_tag=True):
+        if clean_tag:
+            title,content = nlp.remove_tag(title),nlp.remove_tag(content)
+        self.__title = title
+        self.__content = content
         self.__best = best
         self.__nbest = nbest
         self.__author = author
         self.__count = answer_count
         self.type_name = "Question"
 
+        #答案的分析结果, 第一次用的时候才算, 见AnalyzedDocument
+        self.__analysis = {}
+
     def clean(self):
         for i in range(len(self.__nbest)):
             self.__nbest[i].clean()
+
+    #分析结果不pickle, 是可以重新算的, 而且里面有实体抽取类做key
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_Question__analysis'] = {}
+        return state
+
+    #以前pickle下来的问题没有__analysis, unpickle的时候不走__init__, 这里补上
+    def __setstate__(self,state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_Question__analysis',{})
+
+    #得到答案的分析结果, 每个问题只分句/分词/标注一次, 扩展和摘要都用这个
+    #joined=False : 每个答案单独分句, 和construct_sentence_entity一致
+    #joined=True  : 所有答案拼起来再分句, 和get_nbest_content一致, textrank/lexrank用这个
+    #缓存按答案的内容对, Answer.clean之类的改了答案之后重新分析
+    def get_analysis(self,joined=False):
+        contents = tuple([answer.get_content() for answer in self.__nbest])
+
+        cached = self.__analysis.get(joined)
+        if cached is None or cached[0] != contents:
+            if joined:
+                texts = [self.get_nbest_content()]
+            else:
+                texts = list(contents)
+            cached = (contents,AnalyzedDocument(texts))
+            self.__analysis[joined] = cached
+
+        return cached[1]
         
     def get_author(self):
         return self.__author
@@ -43,6 +78,10 @@ class Question:
     def get_best(self):
         return self.__best
 
+    #得到问题的内容(描述)
+    def get_content(self):
+        return self.__content
+
     #得到答案数目
     def get_count(self):
         return len(self.__nbest)
@@ -77,6 +116,10 @@ class Question:
 
         return result
 
+    #得到答案数目(原始数据里面的answercount)
+    def get_answer_count(self):
+        return self.__count
+
     def get_title_words(self):
         return len(self.__title.split())
         
@@ -97,9 +140,9 @@ class Question:
 #2.支持反对数目
 #3.作者hash值
 class Answer:
-    def __init__(self,sentence,support=0,oppose=0,author=""):
+    def __init__(self,sentence,support=0,oppose=0,author="",clean_tag=True):
         self.type_name = "Answer"
-        self.__content = nlp.remove_tag(sentence)
+        self.__content = nlp.remove_tag(sentence) if clean_tag else sentence
         self.__support = support
         self.__oppose = oppose
         self.__author = author
@@ -120,11 +163,120 @@ class Answer:
     def get_content(self):
         return self.__content
 
+    def get_support(self):
+        return self.__support
+
+    def get_oppose(self):
+        return self.__oppose
+
+    def get_author(self):
+        return self.__author
+
     def __str__(self):
         return "type:%s content:%s support:%s oppose:%s author:%s"%(self.type_name,self.__content\
                                  ,self.__support,self.__oppose,self.__author)
 
 
+#分析过的句子, 分词, 标注, 归一化, 长度, 实体都是第一次用的时候算, 之后直接用
+class AnalyzedSentence:
+    def __init__(self,text):
+        self.type_name = "AnalyzedSentence"
+        self.__text = text
+        self.__tokens = None
+        self.__token_set = None
+        self.__tags = None
+        self.__lemmas = None
+        self.__length = None
+
+        #实体是跟实体抽取类相关的, 所以按类分别存
+        self.__entities = {}
+
+    def get_text(self):
+        return self.__text
+
+    def get_tokens(self):
+        if self.__tokens is None:
+            self.__tokens = nlp.word_tokenize(self.__text)
+        return self.__tokens
+
+    def get_token_set(self):
+        if self.__token_set is None:
+            self.__token_set = set(self.get_tokens())
+        return self.__token_set
+
+    def get_tags(self):
+        if self.__tags is None:
+            self.__tags = nlp.blob_tags(self.__text)
+        return self.__tags
+
+    def get_lemmas(self):
+        if self.__lemmas is None:
+            self.__lemmas = [nlp.norm_text(word) for word in self.get_tokens()]
+        return self.__lemmas
+
+    #和nlp.sentence_length一样, 长度>=2的词数
+    def get_length(self):
+        if self.__length is None:
+            self.__length = len([word for word in self.get_tokens() if len(word) >= 2])
+        return self.__length
+
+    def has_entities(self,entity_finder):
+        return entity_finder in self.__entities
+
+    #批量抽取(extract_entities_batch)的结果直接存进来
+    def set_entities(self,entity_finder,entities):
+        self.__entities[entity_finder] = entities
+
+    #entity_finder是实体抽取的类, 比如NgramEntityFinder
+    def get_entities(self,entity_finder):
+        if entity_finder not in self.__entities:
+            finder = entity_finder(self.__text)
+            self.__entities[entity_finder] = finder.extract_entity(display=False)
+        return self.__entities[entity_finder]
+
+    def __str__(self):
+        return self.__text
+
+
+#一个问题所有答案的分析结果
+#texts是答案内容的list, 每个分别分句
+#同一个句子只会有一个AnalyzedSentence, 摘要里面按句子字符串取长度, 分词的时候直接查
+class AnalyzedDocument:
+    def __init__(self,texts):
+        self.type_name = "AnalyzedDocument"
+        self.__texts = texts
+        self.__sentences = None
+
+        #句子字符串 => AnalyzedSentence
+        self.__index = {}
+
+    #所有句子, 按出现的顺序, 重复的句子也保留
+    def get_sentences(self):
+        if self.__sentences is None:
+            self.__sentences = []
+            for text in self.__texts:
+                for sent in nlp.sent_tokenize(text):
+                    self.__sentences.append(self.sentence(sent))
+        return self.__sentences
+
+    def get_sentence_texts(self):
+        return [sent.get_text() for sent in self.get_sentences()]
+
+    #按字符串取句子, 不在文档里的句子(比如strip过的)也可以取, 会新建一个
+    def sentence(self,text):
+        result = self.__index.get(text)
+        if result is None:
+            result = AnalyzedSentence(text)
+            self.__index[text] = result
+        return result
+
+    def get_tokens(self,text):
+        return self.sentence(text).get_tokens()
+
+    def get_length(self,text):
+        return self.sentence(text).get_length()
+
+
 class NaiveQuestion(Question):
     def __init__(self,title,entity):
         Question.__init__(self,title,"","",None,None,None)
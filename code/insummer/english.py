@@ -9,14 +9,29 @@ modified version of Morphy, the stemmer (lemmatizer) used in WordNet.  The
 modifications mostly involve heuristics for when to apply noun or verb
 transformations to words whose part of speech is ambiguous.
 """
-import nltk
-from nltk.corpus import wordnet
 from .token_utils import untokenize, tokenize
+from functools import lru_cache
+import pickle
 import re
-morphy = wordnet._morphy
+#nltk光import就要一秒多, wordnet取_morphy的时候还要载入语料, 所以都放到第一次用的时候
+def morphy(word,pos):
+    from nltk.corpus import wordnet
+    return wordnet._morphy(word,pos)
 
 STOPWORDS = ['the', 'a', 'an']
 
+#词干和单个词归一化结果的缓存大小
+STEM_CACHE_SIZE = 200000
+
+#预先算好的词形表 {(小写的词,pos):词干}, 可以存到磁盘, 启动的时候载入, 常见的词直接查字典
+#用 warm_lemma_table/save_lemma_table/load_lemma_table 维护
+LEMMA_TABLE = {}
+
+#nltk的word_tokenize会把这几个词拆成两个, 不能走单个词的快速通道
+SPLIT_WORDS = {'cannot', 'gimme', 'gonna', 'gotta', 'lemme', 'wanna'}
+
+SINGLE_TOKEN = re.compile(r'^[A-Za-z0-9]+$')
+
 EXCEPTIONS = {
     # Avoid obsolete and obscure roots, the way lexicographers don't.
     'wrought': 'wrought',   # not 'work'
@@ -119,6 +134,7 @@ def _morphy_best(word, pos=None):
     return results[0]
 
 
+@lru_cache(maxsize=STEM_CACHE_SIZE)
 def morphy_stem(word, pos=None):
     """
     Get the most likely stem for a word. If a part of speech is supplied,
@@ -132,18 +148,37 @@ def morphy_stem(word, pos=None):
     - 'r' or 'RB' for adverbs
 
     Any other part of speech will be treated as unknown.
+
+    Results are memoised on (word, pos), and LEMMA_TABLE is consulted
+    (with Penn tags mapped to WordNet letters) before asking WordNet.
+    """
+    result = LEMMA_TABLE.get((word.lower(), _wordnet_pos(pos)))
+    if result is None:
+        result = _morphy_stem(word, pos)
+    return result
+
+
+def _wordnet_pos(pos):
+    """
+    Map a Penn Treebank tag ('NNS', 'VBD', ...) to the WordNet letter used
+    by _morphy_stem. Anything else is returned unchanged.
     """
-    # FIXME: strip punctuation that may still be attached to the word
-    word = word.lower()
     if pos is not None:
         if pos.startswith('NN'):
-            pos = 'n'
+            return 'n'
         elif pos.startswith('VB'):
-            pos = 'v'
+            return 'v'
         elif pos.startswith('JJ'):
-            pos = 'a'
+            return 'a'
         elif pos.startswith('RB'):
-            pos = 'r'
+            return 'r'
+    return pos
+
+
+def _morphy_stem(word, pos=None):
+    # FIXME: strip punctuation that may still be attached to the word
+    word = word.lower()
+    pos = _wordnet_pos(pos)
     if pos is None and word.endswith('ing') or word.endswith('ed'):
         pos = 'v'
     if pos is not None and pos not in 'nvar':
@@ -175,7 +210,11 @@ def normalize_as_list(text):
     >>> normalize_as_list('the')
     ['the']
     """
-    pieces = [morphy_stem(word) for word in tokenize(text)]
+    if is_single_token(text):
+        words = [text]
+    else:
+        words = tokenize(text)
+    pieces = [morphy_stem(word) for word in words]
     pieces = [piece for piece in pieces if good_lemma(piece)]
     if not pieces:
         return [text]
@@ -189,9 +228,65 @@ def normalize(text):
     Get a string made from the non-stopword word stems in the text. See
     normalize_as_list().
     """
+    if is_single_token(text):
+        return _normalize_token(text)
     return untokenize(normalize_as_list(text))
 
 
+def normalize_tagged(word, pos=None):
+    """
+    Normalize one token whose part of speech is already known (a Penn
+    Treebank tag such as 'NNS' or 'VBG'), without re-tokenizing it. Gives
+    the same result as normalize() for the token, except that the tag is
+    passed on to morphy_stem().
+    """
+    if not is_single_token(word):
+        return normalize(word)
+    lemma = morphy_stem(word, pos)
+    if not good_lemma(lemma):
+        return word
+    if lemma == 'to':
+        return ''
+    return untokenize([lemma])
+
+
+def is_single_token(text):
+    """
+    Whether tokenize() would return the text unchanged as one token, so the
+    NLTK tokenizers can be skipped.
+    """
+    return SINGLE_TOKEN.match(text) is not None and \
+        text.lower() not in SPLIT_WORDS
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def _normalize_token(word):
+    return untokenize(normalize_as_list(word))
+
+
+def warm_lemma_table(words, pos_list=(None,)):
+    """
+    Precompute the stems of `words` into LEMMA_TABLE.
+    """
+    for word in words:
+        for pos in pos_list:
+            LEMMA_TABLE[(word.lower(), _wordnet_pos(pos))] = _morphy_stem(word, pos)
+
+
+def save_lemma_table(fn):
+    with open(fn, 'wb') as table_file:
+        pickle.dump(LEMMA_TABLE, table_file, True)
+
+
+def load_lemma_table(fn):
+    with open(fn, 'rb') as table_file:
+        LEMMA_TABLE.update(pickle.load(table_file))
+
+    # stems memoised before the table was loaded may disagree with it
+    morphy_stem.cache_clear()
+    _normalize_token.cache_clear()
+
+
 def normalize_topic(topic):
     """
     Get a canonical representation of a Wikipedia topic, which may include
@@ -25,3 +25,201 @@ def bias_overlap_quantity(set1,set2):
 
     return len(set1.intersection(set2))
 
+
+
+#==================ROUGE==================
+#进程内算ROUGE, 不用再调perl的ROUGE-1.5.5, 调参数的时候快很多
+#和ROUGE-1.5.5 -n 2 -2 4 -u -m -f A -p 0.5 的算法一致:
+#小写, 非字母数字当空格, 长度大于3的词做porter stem
+#多个model的时候是 -f A, 命中数和计数在所有model上加起来再除(micro平均)
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+porter = None
+
+@lru_cache(maxsize=100000)
+def rouge_stem(word):
+    from nltk.stem.porter import PorterStemmer
+    global porter
+    if porter is None:
+        porter = PorterStemmer(PorterStemmer.ORIGINAL_ALGORITHM)
+    return porter.stem(word) if len(word) > 3 else word
+
+#文本 => 词的list, limit是最多的词数(-l)
+#同一个model在一个topic里面要算好几次, 缓存一下
+@lru_cache(maxsize=10000)
+def cached_tokens(text,stem=True,limit=None):
+    tokens = NON_WORD_RE.sub(" ",text.lower()).split()
+    if limit is not None:
+        tokens = tokens[:limit]
+    if stem:
+        tokens = [rouge_stem(token) for token in tokens]
+    return tuple(tokens)
+
+def rouge_tokens(text,stem=True,limit=None):
+    return list(cached_tokens(text,stem,limit))
+
+#n-gram都编码成int64, 计数和求交都是numpy的数组操作
+#词先换成id(所有文本共用一个词表), n-gram (w1,w2) 的编码是 w1*ID_SIZE+w2, 这样不同的n-gram编码不同
+#ID_SIZE是2^31, bigram的编码不会超过int64
+#n>2的时候直接乘会溢出, 所以前缀(前i个词)先换成id(每个长度一个表), 再接下一个词
+ID_SIZE = 1 << 31
+ROUGE_VOCAB = {}
+ROUGE_PREFIX = {}
+
+#词表和前缀表所有文本共用, 一直跑会越来越大, 超过ROUGE_ID_LIMIT就清空重来
+#只在rouge_score开始的时候检查, 一次调用里面peer和model的id是同一套
+#text_ids/text_counts缓存的是旧的id, 一起清掉
+ROUGE_ID_LIMIT = 1000000
+
+def bound_rouge_ids():
+    size = len(ROUGE_VOCAB) + sum([len(table) for table in ROUGE_PREFIX.values()])
+    if size > ROUGE_ID_LIMIT:
+        ROUGE_VOCAB.clear()
+        ROUGE_PREFIX.clear()
+        text_ids.cache_clear()
+        text_counts.cache_clear()
+
+@lru_cache(maxsize=10000)
+def text_ids(text,stem=True,limit=None):
+    return np.array([ROUGE_VOCAB.setdefault(token,len(ROUGE_VOCAB)) for token in cached_tokens(text,stem,limit)],dtype=np.int64)
+
+#长度是length的前缀的编码 => 前缀的id, 一样的前缀id一样, id比ID_SIZE小
+def prefix_ids(codes,length):
+    table = ROUGE_PREFIX.setdefault(length,{})
+    uniq,inverse = np.unique(codes,return_inverse=True)
+    ids = np.array([table.setdefault(code,len(table)) for code in uniq.tolist()],dtype=np.int64)
+    return ids[inverse.ravel()]
+
+def ngram_keys(ids,n):
+    if len(ids) < n:
+        return np.zeros(0,dtype=np.int64)
+
+    keys = ids[:len(ids)-n+1].copy()
+    for i in range(1,n):
+        if i > 1:
+            keys = prefix_ids(keys,i)
+        keys = keys*ID_SIZE + ids[i:len(ids)-n+1+i]
+    return keys
+
+#skip bigram, 两个词中间最多隔skip个词, unigram=True的时候把unigram也算上(-u)
+#unigram的编码加上 ID_SIZE*ID_SIZE, 不会和bigram重
+def skip_bigram_keys(ids,skip,unigram=True):
+    keys = [ids[:-gap]*ID_SIZE + ids[gap:] for gap in range(1,skip+2) if gap < len(ids)]
+    if unigram:
+        keys.append(ids + ID_SIZE*ID_SIZE)
+    if len(keys) == 0:
+        return np.zeros(0,dtype=np.int64)
+    return np.concatenate(keys)
+
+#编码 => (排好序的不重复的编码,每个的次数)
+def count_keys(keys):
+    return np.unique(keys,return_counts=True)
+
+#一个文本的n-gram计数, n是None的时候是skip bigram
+#model在一个topic里面要用好几次, 缓存起来
+@lru_cache(maxsize=10000)
+def text_counts(text,n,skip,stem=True,limit=None):
+    ids = text_ids(text,stem,limit)
+    if n is None:
+        return count_keys(skip_bigram_keys(ids,skip))
+    return count_keys(ngram_keys(ids,n))
+
+#两个计数的交的大小, 也就是 sum(min(count1,count2))
+def count_overlap(count1,count2):
+    keys1,num1 = count1
+    keys2,num2 = count2
+    common,indx1,indx2 = np.intersect1d(keys1,keys2,assume_unique=True,return_indices=True)
+    return int(np.minimum(num1[indx1],num2[indx2]).sum())
+
+#最长公共子序列的长度
+def lcs_length(tokens1,tokens2):
+    if len(tokens1) == 0 or len(tokens2) == 0:
+        return 0
+
+    prev = [0]*(len(tokens2)+1)
+    for token1 in tokens1:
+        cur = [0]
+        for j,token2 in enumerate(tokens2):
+            if token1 == token2:
+                cur.append(prev[j]+1)
+            else:
+                cur.append(max(prev[j+1],cur[j]))
+        prev = cur
+    return prev[-1]
+
+#alpha是-p, 0.5就是P和R的调和平均
+def f_score(p,r,alpha=0.5):
+    if p == 0 or r == 0:
+        return 0.0
+    return 1.0 / (alpha/p + (1-alpha)/r)
+
+#命中数, model里面的计数, peer里面的计数 => R,P,F
+def rouge_prf(hit,model_count,peer_count,alpha=0.5):
+    r = hit / model_count if model_count > 0 else 0.0
+    p = hit / peer_count if peer_count > 0 else 0.0
+    return {"R":r,"P":p,"F":f_score(p,r,alpha)}
+
+#peer和所有model的计数 => -f A 的R,P,F
+def counter_overlap(peer,models,alpha=0.5):
+    hit,model_count,peer_count = 0,0,0
+    peer_total = int(peer[1].sum())
+    for model in models:
+        hit += count_overlap(peer,model)
+        model_count += int(model[1].sum())
+        peer_count += peer_total
+    return rouge_prf(hit,model_count,peer_count,alpha)
+
+#一个摘要的ROUGE, peer是摘要的文本, models是标准摘要的文本的list
+#返回 {"ROUGE-1":{"R":..,"P":..,"F":..},"ROUGE-2":..,"ROUGE-SU4":..}, 和insummer/rouge.py的格式一样
+def rouge_score(peer,models,n=2,skip=4,lcs=False,stem=True,limit=None,alpha=0.5):
+    bound_rouge_ids()
+
+    result = {}
+    for length in range(1,n+1):
+        counts = [text_counts(text,length,None,stem,limit) for text in models]
+        result["ROUGE-%s"%(length)] = counter_overlap(text_counts(peer,length,None,stem,limit),counts,alpha)
+
+    if skip is not None:
+        counts = [text_counts(text,None,skip,stem,limit) for text in models]
+        result["ROUGE-SU%s"%(skip)] = counter_overlap(text_counts(peer,None,skip,stem,limit),counts,alpha)
+
+    if lcs:
+        peer = rouge_tokens(peer,stem,limit)
+        models = [rouge_tokens(model,stem,limit) for model in models]
+        hit = sum([lcs_length(peer,model) for model in models])
+        model_count = sum([len(model) for model in models])
+        result["ROUGE-L"] = rouge_prf(hit,model_count,len(peer)*len(models),alpha)
+
+    return result
+
+#bootstrap的置信区间, values是每个摘要的分数, 返回 (平均,下界,上界)
+#和ROUGE-1.5.5的 -c 95 -r 1000 一样
+def bootstrap(values,ci=95,resamples=1000,seed=None):
+    values = np.asarray(values,dtype=np.float64)
+    if len(values) == 0:
+        return 0.0,0.0,0.0
+
+    rng = np.random.RandomState(seed)
+    means = values[rng.randint(0,len(values),size=(resamples,len(values)))].mean(axis=1)
+    low,high = np.percentile(means,[(100-ci)/2,100-(100-ci)/2])
+    return float(values.mean()),float(low),float(high)
+
+#所有摘要的分数的平均和置信区间
+#scores是rouge_score的结果的list, 返回 {"ROUGE-1":{"R":(平均,下界,上界),..}}
+def rouge_confidence(scores,ci=95,resamples=1000,seed=None):
+    result = {}
+    if len(scores) == 0:
+        return result
+
+    for metric in scores[0]:
+        result[metric] = {}
+        for key in ("R","P","F"):
+            result[metric][key] = bootstrap([score[metric][key] for score in scores],ci,resamples,seed)
+
+    return result
@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+#coding=utf-8
+
+'''
+所有rank共用的pagerank/hits, 直接在(稀疏)矩阵上做幂迭代, 不用networkx的dict图
+pagerank和nx.pagerank的结果一致:
+  W[i,j]是i->j的边权, 按行归一化成转移矩阵
+  没有出边的点(dangling)的分数按dangling分给所有点, 默认和personalization一样
+  收敛条件是两次迭代的L1差 < N*tol
+hits和nx.hits一样, 每次迭代按最大值归一化, 收敛条件是hub的L1差 < tol, 最后按和归一化
+无向图就传对称矩阵, 自环就是对角线
+nstart是迭代的初值(warm start), 比如上一次rank的结果, 图变化不大的时候迭代次数少很多
+
+已经有networkx的图的话用pagerank_graph/hits_graph, 返回和nx一样的 {node:score}
+'''
+
+import warnings
+
+import numpy as np
+from scipy import sparse
+
+#向量归一化成和为1, None的时候是均匀的
+def normalize_vector(vector,N):
+    if vector is None:
+        return np.repeat(1.0 / N,N)
+    vector = np.asarray(vector,dtype=np.float64)
+    return vector / vector.sum()
+
+#W可以是稠密的numpy数组也可以是scipy的稀疏矩阵, 返回每个点的分数(numpy数组, 和为1)
+#personalization是每个点的重启概率(不用归一化), None表示均匀
+#dangling是没有出边的点的分数怎么分, None表示按personalization分
+def pagerank_matrix(W,alpha=0.85,personalization=None,max_iter=100,tol=1.0e-6,nstart=None,dangling=None):
+    W = sparse.csr_matrix(W,dtype=np.float64)
+    N = W.shape[0]
+    if N == 0:
+        return np.zeros(0)
+
+    #按行归一化
+    out = np.asarray(W.sum(axis=1)).ravel()
+    is_dangling = out == 0
+    out[is_dangling] = 1.0
+    P = sparse.diags(1.0 / out).dot(W).tocsr()
+
+    p = normalize_vector(personalization,N)
+    d = p if dangling is None else normalize_vector(dangling,N)
+
+    x = normalize_vector(nstart,N)
+    for indx in range(max_iter):
+        xlast = x
+        x = alpha * (P.T.dot(x) + x[is_dangling].sum() * d) + (1 - alpha) * p
+        if np.abs(x - xlast).sum() < N * tol:
+            return x
+
+    raise RuntimeError("pagerank在%s次迭代之后没有收敛"%(max_iter))
+
+#返回(hub,authority)两个numpy数组, 各自和为1
+#没有边的图hub和authority都是0
+#max_iter次迭代还没收敛的话(最大的两个特征值很接近), 给个警告, 改成和nx.hits_numpy一样直接求特征向量
+def hits_matrix(W,max_iter=100,tol=1.0e-8,nstart=None):
+    W = sparse.csr_matrix(W,dtype=np.float64)
+    N = W.shape[0]
+    if N == 0:
+        return np.zeros(0),np.zeros(0)
+
+    h = normalize_vector(nstart,N)
+    for indx in range(max_iter):
+        hlast = h
+        a = W.T.dot(hlast)
+        h = W.dot(a)
+        h = max_normalize(h)
+        a = max_normalize(a)
+        if np.abs(h - hlast).sum() < tol:
+            return sum_normalize(h),sum_normalize(a)
+
+    warnings.warn("hits在%s次迭代之后没有收敛, 改用特征向量"%(max_iter),RuntimeWarning)
+    return hits_eigen(W)
+
+#A*A^T和A^T*A最大特征值的特征向量就是hub和authority, 稠密的, 只在迭代不收敛的时候用
+def hits_eigen(W):
+    A = W.toarray()
+    return principal_vector(A.dot(A.T)),principal_vector(A.T.dot(A))
+
+def principal_vector(M):
+    values,vectors = np.linalg.eigh(M)
+    return sum_normalize(np.abs(vectors[:,np.argmax(values)]))
+
+def max_normalize(vector):
+    top = vector.max()
+    return vector / top if top > 0 else vector
+
+def sum_normalize(vector):
+    total = vector.sum()
+    return vector / total if total > 0 else vector
+
+#networkx的图 => (节点列表,csr邻接矩阵), 节点顺序和graph.nodes()一样
+#无向图的边两个方向都放, 没有weight属性的边权是1
+def graph_matrix(graph,weight='weight'):
+    nodes = list(graph.nodes())
+    index = {node:indx for indx,node in enumerate(nodes)}
+
+    row,col,data = [],[],[]
+    for u,v,attr in graph.edges(data=True):
+        w = attr.get(weight,1)
+        row.append(index[u])
+        col.append(index[v])
+        data.append(w)
+        if not graph.is_directed() and u != v:
+            row.append(index[v])
+            col.append(index[u])
+            data.append(w)
+
+    N = len(nodes)
+    return nodes,sparse.csr_matrix((data,(row,col)),shape=(N,N),dtype=np.float64)
+
+#{node:value} => 和nodes对应的向量, 没有的点是0, dict是None的时候还是None
+def node_vector(nodes,values):
+    if values is None:
+        return None
+    return np.array([values.get(node,0) for node in nodes],dtype=np.float64)
+
+#和nx.pagerank一样的接口, personalization/nstart/dangling都是{node:value}
+def pagerank_graph(graph,alpha=0.85,personalization=None,max_iter=100,tol=1.0e-6,nstart=None,weight='weight',dangling=None):
+    nodes,W = graph_matrix(graph,weight)
+    x = pagerank_matrix(W,alpha,node_vector(nodes,personalization),max_iter,tol,node_vector(nodes,nstart),node_vector(nodes,dangling))
+    return dict(zip(nodes,x.tolist()))
+
+#和nx.hits一样, 返回(hub,authority)两个{node:score}, nstart是hub的初值
+def hits_graph(graph,max_iter=100,tol=1.0e-8,nstart=None,weight='weight'):
+    nodes,W = graph_matrix(graph,weight)
+    h,a = hits_matrix(W,max_iter,tol,node_vector(nodes,nstart))
+    return dict(zip(nodes,h.tolist())),dict(zip(nodes,a.tolist()))
+
+#分数从高到低的下标, 分数一样的时候下标小的在前面(和对nx的结果dict排序一样)
+def rank_order(scores):
+    return sorted(range(len(scores)),key=lambda indx:scores[indx],reverse=True)
@@ -2,64 +2,234 @@
 这个模块的作用主要是封装KB的一些功能,变相做接口了
 '''
 
-import pymongo
-from ..util import NLP,mem_cache
-from ..read_conf import config
+from ..util import mem_cache
+from .. import registry
+from ..registry import lazy,lazy_config,KB_CONF
+import os
 import sys
 import pickle
 import time
 
 import multiprocessing as mp
 
+from scipy import sparse
+
+from .backend import mongo_backend,csr_backend
+from .string_table import string_table
+from .vocab import concept_vocab
+from .relation import ALL_MASK
+
 from math import log
 
 SMALL = 1e-6
 
-nlp = NLP()
+#配置, 概念集合, KB的连接都在第一次用的时候才建, 见registry.py
+kb_conf = lazy_config(KB_CONF)
 
 #读入词表indx
-entity_list_file = open(config("../../conf/cn_data.conf")["entity_name"],'rb')
-entity_indx = pickle.load(entity_list_file)
+#配置了entity_table(script/build_entity_table.py建的字符串表)就mmap读, 基本不花时间, 多进程共享
+#否则还是载入pickle的set
+def load_entity_indx():
+    prefix = kb_conf.get("entity_table")
+    if prefix is not None and os.path.exists(prefix+'.blob'):
+        return string_table(prefix)
+
+    with open(kb_conf["entity_name"],'rb') as entity_list_file:
+        return pickle.load(entity_list_file)
+
+entity_indx = lazy("entity_indx")
+
+#KB缓存的大小和过期时间(秒), 可以在cn_data.conf里面配置, 不配置ttl就不过期
+#没有配置文件的时候(比如测试里面直接传backend进来)用默认值
+def cache_conf(key,default=None):
+    try:
+        return kb_conf.get(key,default)
+    except FileNotFoundError:
+        return default
+
+def cache_size_conf():
+    return int(cache_conf("cache_size",100000))
+
+def cache_ttl_conf():
+    ttl = cache_conf("cache_ttl")
+    return float(ttl) if ttl is not None else None
+
+#cache_size和cache_ttl参数的默认值, 表示从配置文件里面读
+#显式传None: cache_ttl就是不过期, cache_size就是不限大小
+FROM_CONF = object()
+
+def resolve_cache_conf(cache_size,cache_ttl):
+    if cache_size is FROM_CONF:
+        cache_size = cache_size_conf()
+    if cache_ttl is FROM_CONF:
+        cache_ttl = cache_ttl_conf()
+
+    #mem_cache的size<=0表示不限大小
+    if cache_size is None:
+        cache_size = 0
+
+    return cache_size,cache_ttl
+
+#默认的存储后端, cn_data.conf里面 kb_backend = csr 并且配置 csr_path 就用本地的csr
+#否则还是用mongodb
+def default_backend():
+    if kb_conf.get("kb_backend","mongo") == "csr":
+        return csr_backend(kb_conf["csr_path"])
+    else:
+        return mongo_backend('localhost',27017)
 
 
 class InsunnetFinder:
-    def __init__(self):
+    #cache_size和cache_ttl不传就用配置文件里面的, 见resolve_cache_conf
+    #backend为None就用进程共享的默认后端, 第一次查询的时候才连
+    def __init__(self,cache_size=FROM_CONF,cache_ttl=FROM_CONF,backend=None):
         self.__usr = 'root'
         self.__pwd = ''
-        conn = pymongo.Connection('localhost',27017)
-        self.__db = conn.insunnet
-        self.tbl = self.__db.assertion
-        self.lookup_mc = mem_cache("lookup")
+        self.__backend = backend
+
+        cache_size,cache_ttl = resolve_cache_conf(cache_size,cache_ttl)
+
+        #lookup和lookup_weight的缓存, 常见概念(car,computer,person)一批会查几千次
+        #缓存里面的list是共享的, 调用者不要修改
+        self.lookup_mc = mem_cache("lookup",cache_size,cache_ttl)
+        self.weight_mc = mem_cache("lookup_weight",cache_size,cache_ttl)
+
+    @property
+    def backend(self):
+        if self.__backend is None:
+            return registry.get("kb_backend")
+        return self.__backend
 
-    def lookup(self,entity):
+    @backend.setter
+    def backend(self,backend):
+        self.__backend = backend
+
+    #rel_mask是关系的bitmask(见relation.py), 只取这些关系的边, 过滤在后端做
+    #比如同义扩展只取同义的边, 不用把整个邻居都拉回来
+    def lookup(self,entity,rel_mask=None):
 
         entity = cp_tool.concept_name(entity)
+        rel_mask = self.norm_mask(rel_mask)
+        key = self.cache_key(entity,rel_mask)
 
-        result1 = list(self.tbl.find({'start':entity}))
-        result2 = list(self.tbl.find({'end':entity}))
-        
-        result1.extend(result2)
+        result1 = self.lookup_mc.get(key)
+        if result1 is not None:
+            return result1
+
+        result1 = self.backend.lookup(entity,rel_mask)
+
+        self.lookup_mc.add(key,result1)
 
         return result1
 
+    #所有关系都要的话就等于不过滤
+    def norm_mask(self,rel_mask):
+        if rel_mask == ALL_MASK:
+            return None
+        return rel_mask
+
+    #不过滤的时候key还是概念名, 过滤的时候带上mask
+    def cache_key(self,name,rel_mask):
+        if rel_mask is None:
+            return name
+        return (name,rel_mask)
+
+    #批量查找, 一次$or/$in查询取回整个frontier的边, 然后在客户端按概念分组
+    #返回{概念名:[edge...]}, 每个概念对应的边和lookup的结果一样
+    def lookup_many(self,entities,rel_mask=None):
+
+        names = set([cp_tool.concept_name(entity) for entity in entities])
+        rel_mask = self.norm_mask(rel_mask)
+
+        #先查缓存, 只有没缓存的才去KB里查
+        result,missing = {},{}
+        for name in names:
+            edges = self.lookup_mc.get(self.cache_key(name,rel_mask))
+            if edges is not None:
+                result[name] = edges
+            else:
+                missing[name] = []
+
+        if len(missing) == 0:
+            return result
+
+        edges = self.backend.find_edges(missing.keys(),rel_mask=rel_mask)
+
+        #一条边可能同时属于start和end两个概念
+        for edge in edges:
+            start,end = edge['start'],edge['end']
+            if start in missing:
+                missing[start].append(edge)
+            if end in missing:
+                missing[end].append(edge)
+
+        for name in missing:
+            self.lookup_mc.add(self.cache_key(name,rel_mask),missing[name])
+            result[name] = missing[name]
+
+        return result
+
     def lookup_weight(self,ent1,ent2):
 
         ent1 = cp_tool.concept_name(ent1)
         ent2 = cp_tool.concept_name(ent2)
 
-        result1 = list(self.tbl.find({'start':ent1,'end':ent2}))
-        result2 = list(self.tbl.find({'start':ent2,'end':ent1}))
-        
-        
+        #权重是对称的, 所以key排个序
+        key = (ent1,ent2) if ent1 <= ent2 else (ent2,ent1)
+        result = self.weight_mc.get(key)
+        if result is not None:
+            return result
+
         result = 0
-        for edge in result1:
+        for edge in self.backend.find_pair(ent1,ent2):
             result += edge['weight']
 
-        for edge in result2:
-            result += edge['weight']
+        self.weight_mc.add(key,result)
 
         return result
 
+    #缓存的命中统计
+    def cache_stats(self):
+        return [self.lookup_mc.stats(),self.weight_mc.stats()]
+
+    #批量求权重矩阵, 一次查询取回实体集合内部的所有边, 代替两两调用lookup_weight
+    #返回(节点list, scipy的csr对称矩阵), 矩阵[i,j]就是lookup_weight(节点i,节点j)
+    #neighbourhood=True时取的是和集合相连的所有边, 集合外的邻居追加在节点list后面
+    def weight_matrix(self,entities,neighbourhood=False):
+        nodes = list(entities)
+
+        #同一个概念可能对应多个实体(比如带不带/c/en), 所以记的是位置的list
+        position = {}
+        for indx,entity in enumerate(nodes):
+            position.setdefault(cp_tool.concept_name(entity),[]).append(indx)
+
+        edges = self.backend.find_edges(list(position.keys()),both=not neighbourhood)
+
+        rows,cols,data = [],[],[]
+        for edge in edges:
+            start,end,weight = edge['start'],edge['end'],edge['weight']
+
+            for name in (start,end):
+                if name not in position:
+                    position[name] = [len(nodes)]
+                    nodes.append(name)
+
+            #lookup_weight是两个方向的边的权重和, 所以两边都加
+            for i in position[start]:
+                for j in position[end]:
+                    rows.extend((i,j))
+                    cols.extend((j,i))
+                    data.extend((weight,weight))
+
+        n = len(nodes)
+        matrix = sparse.coo_matrix((data,(rows,cols)),shape=(n,n)).tocsr()
+
+        return nodes,matrix
+
+
+#全局的概念词表, 所有的concept_tool共用一个, 这样id在整个进程里是一致的
+cp_vocab = concept_vocab()
+
 
 #定义与概念相关的常用函数集
 #这里要考虑两种情况conceptnet默认的是带/c 的, 而我自己写的不带
@@ -110,11 +280,33 @@ class concept_tool(object):
         else:
             return entity[:suffix]
 
+    #概念 => int id, 归一化只做这一次
+    def concept_id(self,entity):
+        return cp_vocab.intern(self.concept_name(entity))
+
+    def concept_ids(self,entities):
+        return [self.concept_id(entity) for entity in entities]
+
+    #int id => 概念名, 在输出的时候用
+    def id_name(self,indx):
+        return cp_vocab.name(indx)
+
+    def id_names(self,indxs):
+        return cp_vocab.names(indxs)
+
     #换了个名字,检测kb中是否有概念
     def kb_has_concept(self,concept):
         cp = self.concept_name(concept)
         return cp in entity_indx
 
+    #批量版本, 返回和concepts对应的bool的list
+    def kb_has_concepts(self,concepts):
+        cps = [self.concept_name(concept) for concept in concepts]
+        indx = registry.get("entity_indx")
+        if isinstance(indx,string_table):
+            return indx.contains_many(cps)
+        return [cp in indx for cp in cps]
+
     #某个节点的所有邻居
     def neighbours(self,cp):
         cp = self.concept_name(cp)
@@ -135,6 +327,10 @@ class concept_tool(object):
     def entity_strength(self,cp1,cp2):
         return self.finder.lookup_weight(cp1,cp2)
 
+    #批量版本的entity_strength, 返回(节点list, 稀疏权重矩阵)
+    def strength_matrix(self,entities,neighbourhood=False):
+        return self.finder.weight_matrix(entities,neighbourhood)
+
     def weight_func(self,ent1,base):
         if self.entity_strength(ent1,base) != 0:
             return (base,1)
@@ -142,5 +338,5 @@ class concept_tool(object):
             return (base,0)
 
 
-cp_tool = concept_tool()
+cp_tool = lazy("cp_tool")
 
@@ -0,0 +1,271 @@
+'''
+这个文件定义了InsunnetFinder底下的存储后端, 后端可以换
+mongo_backend : 原来的mongodb, 每次查询一次网络往返, 要先把mongod跑起来
+csr_backend   : 本地文件, 邻接表用csr存, numpy mmap读, 不需要server
+                查一个概念的邻居就是csr的一段切片, O(degree)
+                多个进程可以通过page cache共享同一份数据
+
+边统一是dict的形式 {'start':概念名,'end':概念名,'rel':关系名,'weight':权重,'rel_id':关系编号}
+老的mongo数据里面可能没有rel_id
+传进来的概念名都已经去掉了前后缀
+
+lookup和find_edges可以带rel_mask(见relation.py的rel_mask), 只返回这些关系的边
+rel_mask=None 表示不过滤
+否定的边(pos=0, 比如NotIsA)两个后端都不返回, 没有pos的老数据当成都是positive
+'''
+
+import os
+import csv
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+from .relation import relation_tool,REL_NAME,mask_indxs
+from .string_table import string_table,build_string_table
+
+rel_tool = relation_tool()
+
+class abstract_backend(metaclass=ABCMeta):
+
+    #概念的所有边, 先是start==name的, 再是end==name的
+    #自环会出现两次, 和原来两次find的结果一致
+    @abstractmethod
+    def lookup(self,name,rel_mask=None):
+        pass
+
+    #两个概念之间两个方向的边, 先是name1->name2, 再是name2->name1
+    @abstractmethod
+    def find_pair(self,name1,name2):
+        pass
+
+    #和names相关的所有边, 每条边只返回一次
+    #both=False : start或者end在names中
+    #both=True  : start和end都在names中
+    @abstractmethod
+    def find_edges(self,names,both=False,rel_mask=None):
+        pass
+
+
+class mongo_backend(abstract_backend):
+    def __init__(self,host='localhost',port=27017):
+        #只有用mongo的时候才需要pymongo
+        import pymongo
+        conn = pymongo.Connection(host,port)
+        self.__db = conn.insunnet
+        self.tbl = self.__db.assertion
+
+        #库里面的边有没有rel_id字段, 第一次用到的时候再查
+        self.__has_rel_id = None
+
+    #老的库是没有rel_id的, 这时候只能在客户端过滤
+    def has_rel_id(self):
+        if self.__has_rel_id is None:
+            self.__has_rel_id = self.tbl.find_one({'rel_id':{'$exists':True}}) is not None
+        return self.__has_rel_id
+
+    #把关系的过滤条件加到查询里面
+    def rel_query(self,query,rel_mask):
+        if rel_mask is not None and self.has_rel_id():
+            query['rel_id'] = {'$in':mask_indxs(rel_mask)}
+        return query
+
+    #否定的边不要, 老的库没有pos字段, $ne也能匹配上
+    def pos_query(self,query):
+        query['pos'] = {'$ne':0}
+        return query
+
+    def rel_filter(self,edges,rel_mask):
+        if rel_mask is None or self.has_rel_id():
+            return edges
+        return [edge for edge in edges if rel_tool.in_mask(edge,rel_mask)]
+
+    def lookup(self,name,rel_mask=None):
+        result1 = list(self.tbl.find(self.pos_query(self.rel_query({'start':name},rel_mask))))
+        result2 = list(self.tbl.find(self.pos_query(self.rel_query({'end':name},rel_mask))))
+
+        result1.extend(result2)
+
+        return self.rel_filter(result1,rel_mask)
+
+    def find_pair(self,name1,name2):
+        result1 = list(self.tbl.find(self.pos_query({'start':name1,'end':name2})))
+        result2 = list(self.tbl.find(self.pos_query({'start':name2,'end':name1})))
+
+        result1.extend(result2)
+
+        return result1
+
+    def find_edges(self,names,both=False,rel_mask=None):
+        names = list(names)
+        if both:
+            query = {'start':{'$in':names},'end':{'$in':names}}
+        else:
+            query = {'$or':[{'start':{'$in':names}},{'end':{'$in':names}}]}
+
+        result = list(self.tbl.find(self.pos_query(self.rel_query(query,rel_mask))))
+        return self.rel_filter(result,rel_mask)
+
+
+#csr的文件, 都在一个目录下面
+#concept.blob/concept.offset.npy : 概念名的字符串表, 第i个概念的id就是i
+#indptr.npy  : int64, 第i个概念的边在 [indptr[i],indptr[i+1]) 这一段
+#indices.npy : int32, 邻居的概念id
+#rel.npy     : int8,  关系的编号, 即REL_INDX
+#weight.npy  : float32, 权重
+#out.npy     : int8,  1表示这个概念是start, 0表示是end
+#pos.npy     : int8,  1表示positive, 0表示否定的边, 老的目录里面没有这个文件, 当成都是1
+#每条边在start和end的行里各存一次
+class csr_backend(abstract_backend):
+    def __init__(self,path):
+        self.concept = string_table(os.path.join(path,'concept'))
+
+        def load(name):
+            return np.load(os.path.join(path,name+'.npy'),mmap_mode='r')
+
+        self.indptr = load('indptr')
+        self.indices = load('indices')
+        self.rel = load('rel')
+        self.weight = load('weight')
+        self.out = load('out')
+        self.pos = load('pos') if os.path.exists(os.path.join(path,'pos.npy')) else None
+
+        #rel_mask => 关系编号的bool表
+        self.rel_table = {}
+
+    #把第cid行[low,high)中mask为True的部分转成边
+    def row_edges(self,cid,mask=None):
+        low,high = int(self.indptr[cid]),int(self.indptr[cid+1])
+        indices = self.indices[low:high]
+        rel = self.rel[low:high]
+        weight = self.weight[low:high]
+        out = self.out[low:high]
+
+        #否定的边不返回
+        if self.pos is not None:
+            positive = self.pos[low:high] == 1
+            mask = positive if mask is None else mask & positive
+
+        if mask is not None:
+            indices,rel,weight,out = indices[mask],rel[mask],weight[mask],out[mask]
+
+        name = self.concept.name(cid)
+        result = []
+        for nid,rid,w,o in zip(indices.tolist(),rel.tolist(),weight.tolist(),out.tolist()):
+            neighbour = self.concept.name(nid)
+            if o == 1:
+                start,end = name,neighbour
+            else:
+                start,end = neighbour,name
+            result.append({'start':start,'end':end,'rel':REL_NAME[rid],'weight':w,'rel_id':rid})
+
+        return result
+
+    def row(self,cid):
+        low,high = int(self.indptr[cid]),int(self.indptr[cid+1])
+        return self.indices[low:high],self.out[low:high]
+
+    #第cid行的边是否在rel_mask里面, 查表, 向量化
+    def row_rel(self,cid,rel_mask):
+        low,high = int(self.indptr[cid]),int(self.indptr[cid+1])
+        table = self.rel_table.get(rel_mask)
+        if table is None:
+            table = np.array([(rel_mask >> indx) & 1 == 1 for indx in range(len(REL_NAME))],dtype=bool)
+            self.rel_table[rel_mask] = table
+        return table[self.rel[low:high]]
+
+    def lookup(self,name,rel_mask=None):
+        cid = self.concept.index(name)
+        if cid < 0:
+            return []
+
+        if rel_mask is None:
+            return self.row_edges(cid)
+
+        return self.row_edges(cid,self.row_rel(cid,rel_mask))
+
+    def find_pair(self,name1,name2):
+        cid1,cid2 = self.concept.index(name1),self.concept.index(name2)
+        if cid1 < 0 or cid2 < 0:
+            return []
+
+        indices,out = self.row(cid1)
+        mask = indices == cid2
+        return self.row_edges(cid1,mask)
+
+    def find_edges(self,names,both=False,rel_mask=None):
+        cids = [self.concept.index(name) for name in names]
+        cids = np.array(sorted(set([cid for cid in cids if cid >= 0])),dtype=np.int32)
+
+        result = []
+        for cid in cids.tolist():
+            indices,out = self.row(cid)
+            inside = np.isin(indices,cids)
+            if both:
+                #两头都在集合里, 只取start这一侧的, 每条边一次
+                mask = inside & (out == 1)
+            else:
+                #两头都在集合里的边在start那一行已经取过了
+                mask = (out == 1) | ~inside
+            if rel_mask is not None:
+                mask = mask & self.row_rel(cid,rel_mask)
+            result.extend(self.row_edges(cid,mask))
+
+        return result
+
+
+#从data_iterates的copy_data导出的csv建csr, csv每行是 关系名,概念1,概念2,权重(,关系编号,positive)
+#没有positive这一列的csv当成都是positive
+def build_csr_backend(csv_path,path,display=False):
+    os.makedirs(path,exist_ok=True)
+
+    #第一遍, 收集所有概念
+    names = set()
+    with open(csv_path) as csv_file:
+        for line in csv.reader(csv_file):
+            rel,cp1,cp2,weight = line[:4]
+            names.add(cp1)
+            names.add(cp2)
+
+    names = build_string_table(names,os.path.join(path,'concept'))
+    concept_indx = {name:indx for indx,name in enumerate(names)}
+    if display:
+        print("concept %s"%(len(names)))
+
+    #第二遍, 读边
+    start,end,rel,weight,pos = [],[],[],[],[]
+    with open(csv_path) as csv_file:
+        for indx,line in enumerate(csv.reader(csv_file)):
+            rname,cp1,cp2,w = line[:4]
+            start.append(concept_indx[cp1])
+            end.append(concept_indx[cp2])
+            rel.append(rel_tool.get_rel_indx(rname))
+            weight.append(float(w))
+            pos.append(int(line[5]) if len(line) > 5 else 1)
+
+            if display and indx % 1000000 == 0:
+                print(indx)
+
+    start = np.array(start,dtype=np.int32)
+    end = np.array(end,dtype=np.int32)
+    rel = np.array(rel,dtype=np.int8)
+    weight = np.array(weight,dtype=np.float32)
+    pos = np.array(pos,dtype=np.int8)
+
+    #每条边在start和end两行各存一次, 稳定排序保证每行里start的边在前面
+    rows = np.concatenate([start,end])
+    order = np.argsort(rows,kind='stable')
+
+    indptr = np.zeros(len(names)+1,dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(rows,minlength=len(names)))
+
+    out = np.concatenate([np.ones(len(start),dtype=np.int8),np.zeros(len(end),dtype=np.int8)])
+
+    np.save(os.path.join(path,'indptr.npy'),indptr)
+    np.save(os.path.join(path,'indices.npy'),np.concatenate([end,start])[order])
+    np.save(os.path.join(path,'rel.npy'),np.concatenate([rel,rel])[order])
+    np.save(os.path.join(path,'weight.npy'),np.concatenate([weight,weight])[order])
+    np.save(os.path.join(path,'out.npy'),out[order])
+    np.save(os.path.join(path,'pos.npy'),np.concatenate([pos,pos])[order])
+
+    if display:
+        print("edge %s"%(len(start)))
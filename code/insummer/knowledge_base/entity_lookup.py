@@ -3,12 +3,12 @@
 为什么要这么设计: 因为可能用conceptnet默认的会比较困难, 所以需要做一些查询时间上的优化
 '''
 
-import pymongo
 
-from .import InsunnetFinder
+from .import InsunnetFinder,FROM_CONF,resolve_cache_conf
+from ..util import mem_cache
+from ..registry import lazy
 
-from . import concept_tool
-cn_tool = concept_tool()
+cn_tool = lazy("cp_tool")
 
 from .relation import relation_tool
 rel_tool = relation_tool()
@@ -27,7 +27,7 @@ class abstract_entity_lookup(metaclass=ABCMeta):
     def synonym_entity(self,entity):
         pass
 
-    #通过reltype来抽取合格的属性, reltype是函数, relation里面定义
+    #通过reltype来抽取合格的属性, reltype是关系的bitmask, relation里面定义
     #synonym_entity等方法可以调用该方法
     #其他附加条件, 接口留了, 到时候随意
     @abstractmethod
@@ -47,9 +47,15 @@ def insun_limit(cp1,cp2,rel,cp):
         
 class InsunnetEntityLookup(abstract_entity_lookup):
 
-    def __init__(self):
+    #cache_size/cache_ttl和InsunnetFinder一样, 不传就用配置文件里面的
+    def __init__(self,cache_size=FROM_CONF,cache_ttl=FROM_CONF,backend=None):
         abstract_entity_lookup.__init__(self)
-        self.cn_finder = InsunnetFinder()
+        cache_size,cache_ttl = resolve_cache_conf(cache_size,cache_ttl)
+        self.cn_finder = InsunnetFinder(cache_size,cache_ttl,backend)
+
+        #同义和关联实体的缓存, key是概念名
+        self.synonym_mc = mem_cache("synonym_entity",cache_size,cache_ttl)
+        self.relate_mc = mem_cache("relate_entity",cache_size,cache_ttl)
         
 
     def lookup_entity_with_reltype(self,entity,reltype,other_limit=None):
@@ -58,9 +64,32 @@ class InsunnetEntityLookup(abstract_entity_lookup):
         entity = str(entity)
         entity = cn_tool.add_prefix(entity)
 
+        edges = self.cn_finder.lookup(entity,reltype)
+
+        return self.filter_edges_with_reltype(entity,edges,reltype,other_limit)
+
+    #批量版本, 整个实体集合只查一次KB, 返回{entity:[neighbour...]}
+    def lookup_many_entity_with_reltype(self,entities,reltype,other_limit=None):
+        entities = list(entities)
+        edges_dict = self.cn_finder.lookup_many(entities,reltype)
+
+        result = {}
+        for entity in entities:
+            edges = edges_dict[cn_tool.concept_name(entity)]
+            prefix_entity = cn_tool.add_prefix(str(entity))
+            result[entity] = self.filter_edges_with_reltype(prefix_entity,edges,reltype,other_limit)
+
+        return result
+
+    #对查到的边按照reltype和其他条件过滤, 返回邻居
+    #reltype是关系的bitmask(rel_tool.synonym_mask等), 后端已经按它过滤过了, 这里只剩整数运算
+    def filter_edges_with_reltype(self,entity,edges,reltype,other_limit=None):
+
         result = []
 
-        edges = self.cn_finder.lookup(entity)
+        #KB里面存的概念名已经去过前后缀了(见data_iterates的copy_data)
+        #所以实体只归一化一次, 循环里面直接比较字符串, 不用每条边都entity_equal
+        name = cn_tool.concept_name(entity)
 
         #对于能查到的每个结构关系
         for edge in edges:
@@ -68,11 +97,10 @@ class InsunnetEntityLookup(abstract_entity_lookup):
             start,end,rel = edge['start'],edge['end'],edge['rel']
 
             #如果实体==end,则neighbour=start, 反之=end
-            #这个实体相等是可以自动去前后缀的
-            neighbour = start if cn_tool.entity_equal(end,entity) else end
+            neighbour = start if end == name else end
 
             #如果满足某个条件
-            if reltype(rel) :
+            if rel_tool.in_mask(edge,reltype) :
                 if other_limit != None :
                     if other_limit(start,end,rel,entity):
                         result.append(neighbour)
@@ -88,14 +116,34 @@ class InsunnetEntityLookup(abstract_entity_lookup):
         entity = cn_tool.concept_name(entity)
 
         #查找结果
-        edges = self.cn_finder.lookup(entity)
+        edges = self.cn_finder.lookup(entity,reltype)
+
+        return self.edges_weight(entity,edges)
+
+    #批量版本, 返回{entity:[(neighbour,weight)...]}
+    def lookup_many_entity_weight_with_reltype(self,entities,reltype,other_limit=None):
+        entities = list(entities)
+        edges_dict = self.cn_finder.lookup_many(entities,reltype)
+
+        result = {}
+        for entity in entities:
+            name = cn_tool.concept_name(entity)
+            result[entity] = self.edges_weight(name,edges_dict[name])
+
+        return result
+
+    #把边转成(邻居,权重)的list
+    def edges_weight(self,entity,edges):
 
         result = []
 
+        #同上, 实体只归一化一次
+        name = cn_tool.concept_name(entity)
+
         for edge in edges:
             start,end,rel,weight = edge['start'],edge['end'],edge['rel'],edge['weight']
             #如果start 跟 entity 相等
-            if cn_tool.entity_equal(start,entity):
+            if start == name:
                 result.append( (end,weight)  )
             else:
                 result.append( (start,weight) )
@@ -110,16 +158,99 @@ class InsunnetEntityLookup(abstract_entity_lookup):
 
         return result
         
+    #带缓存的查找, 缓存里面没有的才调用lookup
+    def cached_lookup(self,cache,entity,lookup):
+        name = cn_tool.concept_name(entity)
+        result = cache.get(name)
+        if result is None:
+            result = lookup(entity)
+            cache.add(name,result)
+
+        return result
+
+    #批量的带缓存查找, 没缓存的实体一起交给lookup_many
+    def cached_lookup_many(self,cache,entities,lookup_many):
+        result,missing = {},[]
+        for entity in entities:
+            cached = cache.get(cn_tool.concept_name(entity))
+            if cached is not None:
+                result[entity] = cached
+            else:
+                missing.append(entity)
+
+        if len(missing) > 0:
+            looked = lookup_many(missing)
+            for entity in looked:
+                cache.add(cn_tool.concept_name(entity),looked[entity])
+                result[entity] = looked[entity]
+
+        return result
+
     def synonym_entity(self,entity):
-        result = self.lookup_entity_with_reltype(entity,rel_tool.synonym_type,insun_limit)
+        lookup = lambda ent:self.lookup_entity_with_reltype(ent,rel_tool.synonym_mask,insun_limit)
+        result = self.cached_lookup(self.synonym_mc,entity,lookup)
 
         return result
 
     #关联关系
     def relate_entity(self,entity):
-        result = self.lookup_entity_with_reltype(entity,rel_tool.relate_type,insun_limit)
+        lookup = lambda ent:self.lookup_entity_with_reltype(ent,rel_tool.relate_mask,insun_limit)
+        result = self.cached_lookup(self.relate_mc,entity,lookup)
         return result
 
     def relate_entity_weight(self,entity):
-        result = self.lookup_entity_weight_with_reltype(entity,rel_tool.relate_type,insun_limit) 
+        result = self.lookup_entity_weight_with_reltype(entity,rel_tool.relate_mask,insun_limit) 
+        return result
+
+    #==========批量接口, 一层实体只查一次KB==========
+    def synonym_entity_many(self,entities):
+        lookup_many = lambda ents:self.lookup_many_entity_with_reltype(ents,rel_tool.synonym_mask,insun_limit)
+        result = self.cached_lookup_many(self.synonym_mc,entities,lookup_many)
+        return result
+
+    def relate_entity_many(self,entities):
+        lookup_many = lambda ents:self.lookup_many_entity_with_reltype(ents,rel_tool.relate_mask,insun_limit)
+        result = self.cached_lookup_many(self.relate_mc,entities,lookup_many)
+        return result
+
+    def relate_entity_weight_many(self,entities):
+        result = self.lookup_many_entity_weight_with_reltype(entities,rel_tool.relate_mask,insun_limit)
+        return result
+
+    #==========id接口, 输入输出都是概念的int id==========
+    #扩展的时候用这几个, 集合里面放的都是int, 只有输出的时候才换回字符串
+    def synonym_id_many(self,ids):
+        return self.neighbour_ids(ids,self.synonym_entity_many)
+
+    def relate_id_many(self,ids):
+        return self.neighbour_ids(ids,self.relate_entity_many)
+
+    #返回{id:[(邻居id,权重)...]}
+    def relate_id_weight_many(self,ids):
+        ids = list(ids)
+        names = cn_tool.id_names(ids)
+        looked = self.relate_entity_weight_many(names)
+
+        result = {}
+        for indx,name in zip(ids,names):
+            result[indx] = [(cn_tool.concept_id(neighbour),weight) for neighbour,weight in looked[name]]
+
+        return result
+
+    #返回{id:set(邻居id)}
+    def neighbour_ids(self,ids,lookup_many):
+        ids = list(ids)
+        names = cn_tool.id_names(ids)
+        looked = lookup_many(names)
+
+        result = {}
+        for indx,name in zip(ids,names):
+            result[indx] = set(cn_tool.concept_ids(looked[name]))
+
+        return result
+
+    #所有缓存的命中统计
+    def cache_stats(self):
+        result = self.cn_finder.cache_stats()
+        result.extend([self.synonym_mc.stats(),self.relate_mc.stats()])
         return result
@@ -39,6 +39,41 @@ REL_INDX = {\
             'other':30,\
         }
 
+#编号 => 关系名, csr存的是编号, 查出来的时候要换回关系名
+REL_NAME = {REL_INDX[name]:name for name in REL_INDX}
+
+#关系类型用bitmask表示, 第i位是1表示包含编号为i的关系
+#这样过滤条件可以直接下推到后端: mongo里面是rel_id:{$in:[...]}, csr里面是numpy的向量化过滤
+def rel_mask(indxs):
+    mask = 0
+    for indx in indxs:
+        if indx in REL_NAME:
+            mask |= 1 << indx
+    return mask
+
+#所有关系的mask, 用这个过滤等于没过滤
+ALL_MASK = rel_mask(REL_NAME.keys())
+
+#mask => 关系编号的list
+def mask_indxs(mask):
+    return [indx for indx in sorted(REL_NAME) if (mask >> indx) & 1]
+
+#关系字符串 => (编号,是否positive), 导数据的时候算一次存到边里面
+#同一个字符串只解析一次
+REL_PARSE = {}
+def parse_rel(rel):
+    result = REL_PARSE.get(rel)
+    if result is None:
+        if rel.startswith('/r/Not'):
+            name,pos = rel[6:],False
+        elif rel.startswith('/r'):
+            name,pos = rel[3:],True
+        else:
+            name,pos = rel,True
+        result = (REL_INDX.get(name,REL_INDX['other']),pos)
+        REL_PARSE[rel] = result
+    return result
+
 #定义relation的函数集
 class relation_tool:
     def __init__(self):
@@ -48,6 +83,11 @@ class relation_tool:
         #self.__relate_type = {0,1,2,3,4,5,6,7,8,9,10,11,13,14,15,16,17,19,20}
         self.__all_type = set(range(40))
 
+        #上面几种类型对应的bitmask
+        self.synonym_mask = rel_mask(self.__synonym_type)
+        self.relate_mask = rel_mask(self.__relate_type)
+        self.all_mask = rel_mask(self.__all_type)
+
     #检测概念是否是关系
     
     def is_relation(self,rel):
@@ -75,17 +115,11 @@ class relation_tool:
             return rel    
 
     def get_rel_indx(self,rel_name):
-        indx = -1
-        rel_name = self.rel_name(rel_name)
-        if rel_name in REL_INDX:
-            return REL_INDX[rel_name]
-        else:
-            return REL_INDX['other']
+        return parse_rel(rel_name)[0]
         
     #得到关系的具体函数
     def get_rel_type(self,rel,type_set):
-        rel_name = self.rel_name(rel)
-        rel_indx = self.get_rel_indx(rel_name)
+        rel_indx = self.get_rel_indx(rel)
         if rel_indx in type_set:
             return True
         else:
@@ -101,6 +135,17 @@ class relation_tool:
 
     def all_type(self,rel):
         return self.get_rel_type(rel,self.__all_type)
+
+    #边的关系编号, 新导的数据边里面直接有rel_id, 老数据才去解析字符串
+    def edge_rel_indx(self,edge):
+        indx = edge.get('rel_id')
+        if indx is None:
+            indx = parse_rel(edge['rel'])[0]
+        return indx
+
+    #边是否在mask里面, 只有整数运算
+    def in_mask(self,edge,mask):
+        return (mask >> self.edge_rel_indx(edge)) & 1 == 1
         
 rel_tool = relation_tool()
 
@@ -0,0 +1,87 @@
+'''
+这个文件定义了一个排好序的字符串表
+所有字符串按utf-8编码排序后拼成一个blob文件, 再加一个offset数组(.npy)
+两个文件都是mmap读的, 多个进程可以通过page cache共享, 载入基本不花时间
+查找是在blob上二分, O(log n)
+现在用在两个地方: csr后端的概念表, 和kb_has_concept的概念集合(代替原来pickle的set)
+'''
+
+import os
+import mmap
+import numpy as np
+
+#把names写成 prefix.blob 和 prefix.offset.npy 两个文件
+#返回排好序的字符串list, 第i个字符串的id就是i
+def build_string_table(names,prefix):
+    encoded = sorted(set([name.encode('utf-8') for name in names]))
+
+    offset = np.zeros(len(encoded)+1,dtype=np.int64)
+    with open(prefix+'.blob','wb') as blob_file:
+        for indx,name in enumerate(encoded):
+            blob_file.write(name)
+            offset[indx+1] = offset[indx] + len(name)
+
+    np.save(prefix+'.offset.npy',offset)
+
+    return [name.decode('utf-8') for name in encoded]
+
+class string_table:
+    def __init__(self,prefix):
+        self.offset = np.load(prefix+'.offset.npy',mmap_mode='r')
+
+        #空文件不能mmap
+        if os.path.getsize(prefix+'.blob') == 0:
+            self.blob = b''
+        else:
+            with open(prefix+'.blob','rb') as blob_file:
+                self.blob = mmap.mmap(blob_file.fileno(),0,access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.offset) - 1
+
+    def __iter__(self):
+        for indx in range(len(self)):
+            yield self.name(indx)
+
+    def get_bytes(self,indx):
+        return self.blob[int(self.offset[indx]):int(self.offset[indx+1])]
+
+    #id => 字符串
+    def name(self,indx):
+        return self.get_bytes(indx).decode('utf-8')
+
+    #在[low,len)里面找第一个>=key的位置
+    def lower_bound(self,key,low=0):
+        high = len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self.get_bytes(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    #字符串 => id, 没有的话返回-1
+    def index(self,name):
+        key = name.encode('utf-8')
+        low = self.lower_bound(key)
+
+        if low < len(self) and self.get_bytes(low) == key:
+            return low
+        return -1
+
+    def __contains__(self,name):
+        return self.index(name) >= 0
+
+    #批量判断, 返回和names对应的bool的list
+    #先把要查的排好序, 后一个的二分从前一个的位置开始, 一句话的所有候选词一次查完
+    def contains_many(self,names):
+        keys = sorted(set([name.encode('utf-8') for name in names]))
+
+        found,low = set(),0
+        for key in keys:
+            low = self.lower_bound(key,low)
+            if low < len(self) and self.get_bytes(low) == key:
+                found.add(key)
+
+        return [name.encode('utf-8') in found for name in names]
@@ -0,0 +1,43 @@
+'''
+概念词表, 把归一化之后的概念名映射成紧凑的int id
+概念在载入KB和抽取实体的时候只归一化/intern一次, 扩展的集合, 权重字典和ranker的图都用id
+只有在最后输出的时候才换回字符串
+'''
+
+import threading
+
+class concept_vocab:
+    def __init__(self):
+        self.__indx = {}
+        self.__names = []
+        #flask server是多线程的, 新加概念的时候要加锁
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__names)
+
+    #概念名 => id, 没有的话新分配一个
+    #传进来的必须是已经去过前后缀的概念名
+    def intern(self,name):
+        indx = self.__indx.get(name)
+        if indx is not None:
+            return indx
+
+        with self.__lock:
+            indx = self.__indx.get(name)
+            if indx is None:
+                indx = len(self.__names)
+                self.__names.append(name)
+                self.__indx[name] = indx
+
+        return indx
+
+    def intern_many(self,names):
+        return [self.intern(name) for name in names]
+
+    #id => 概念名
+    def name(self,indx):
+        return self.__names[indx]
+
+    def names(self,indxs):
+        return [self.__names[indx] for indx in indxs]
@@ -0,0 +1,126 @@
+'''
+说明:多词概念的自动机(Aho-Corasick), 用来在句子里面一遍找出所有KB里面的多词概念
+边是归一化之后的词, 不是字母, 所以一个概念 get_sick 就是 get -> sick 两步
+KB里面的概念几百万个, 建一次挺慢, 可以用script/build_concept_trie.py建好存成pickle
+'''
+
+import pickle
+from collections import deque
+
+class concept_trie:
+    #max_len是概念最多的词数, 再长的不要
+    def __init__(self,max_len=5):
+        self.max_len = max_len
+
+        #第i个状态的转移 {词:状态}
+        self.goto = [{}]
+
+        #失配的时候跳到的状态
+        self.fail = [0]
+
+        #到这个状态的时候匹配上的概念的词数(包括失配链上的)
+        self.out = [[]]
+
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    #加一个概念, tokens是归一化之后的词的list
+    def add(self,tokens):
+        if len(tokens) == 0 or len(tokens) > self.max_len:
+            return False
+
+        state = 0
+        for token in tokens:
+            nxt = self.goto[state].get(token)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][token] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+
+        if len(tokens) not in self.out[state]:
+            self.out[state].append(len(tokens))
+            self.size += 1
+
+        return True
+
+    #加完所有概念之后建失配链, 宽度优先
+    def build(self):
+        queue = deque()
+        for token,state in self.goto[0].items():
+            self.fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for token,nxt in self.goto[state].items():
+                queue.append(nxt)
+
+                fail = self.fail[state]
+                while fail != 0 and token not in self.goto[fail]:
+                    fail = self.fail[fail]
+                fail = self.goto[fail].get(token,0)
+                if fail == nxt:
+                    fail = 0
+
+                self.fail[nxt] = fail
+                #失配链上匹配的也算, 按词数从长到短
+                self.out[nxt] = sorted(set(self.out[nxt] + self.out[fail]),reverse=True)
+
+        return self
+
+    #一遍扫描, 返回所有匹配的区间 [(start,end)...], end不包括
+    def match(self,tokens):
+        result = []
+        state = 0
+        for indx,token in enumerate(tokens):
+            while state != 0 and token not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(token,0)
+
+            for length in self.out[state]:
+                result.append((indx+1-length,indx+1))
+
+        return result
+
+    def save(self,fn):
+        with open(fn,'wb') as trie_file:
+            pickle.dump((self.max_len,self.goto,self.fail,self.out,self.size),trie_file,True)
+
+    @staticmethod
+    def load(fn):
+        with open(fn,'rb') as trie_file:
+            max_len,goto,fail,out,size = pickle.load(trie_file)
+
+        trie = concept_trie(max_len)
+        trie.goto,trie.fail,trie.out,trie.size = goto,fail,out,size
+        return trie
+
+
+#从概念名建自动机, 概念名是用_连起来的, 只要多词的, 单个词的直接查KB的概念集合
+def build_concept_trie(names,max_len=5):
+    trie = concept_trie(max_len)
+    for name in names:
+        tokens = name.split('_')
+        if len(tokens) >= 2:
+            trie.add(tokens)
+
+    return trie.build()
+
+
+#最长匹配, 从左到右, 同一个起点取最长的, 区间不重叠
+def longest_spans(spans):
+    spans = sorted(spans,key=lambda span:(span[0],-span[1]))
+
+    result = []
+    last = 0
+    for start,end in spans:
+        if start >= last:
+            result.append((start,end))
+            last = end
+
+    return result
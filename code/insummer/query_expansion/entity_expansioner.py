@@ -7,15 +7,16 @@ import math
 import sys
 from abc import ABCMeta, abstractmethod
 from ..common_type import Question
-from ..util import NLP
-from .entity_finder import NgramEntityFinder
-from ..knowledge_base.entity_lookup import InsunnetEntityLookup
-from ..knowledge_base import concept_tool
+from .entity_finder import SinglePassNgramEntityFinder,extract_entities_batch
+from ..registry import lazy
+from .frontier import frontier_expander
 
 from ..ranker import Pageranker,Hitsranker,CCRanker,KCoreRanker
+from ..graph_rank import hits_graph
 
-nlp = NLP()
-searcher = InsunnetEntityLookup()
+nlp = lazy("nlp")
+searcher = lazy("searcher")
+cn = lazy("cp_tool")
 
 import networkx as nx
 import itertools
@@ -31,7 +32,11 @@ clock = time.time
 #3.能够换用不同的策略进行扩展
 
 class abstract_entity_expansioner(metaclass=ABCMeta):
-    def __init__(self,mquestion,entity_finder,display=False):
+    #答案句子抽实体用的类, 整句只分词标注一次, 子类可以换
+    sentence_finder = SinglePassNgramEntityFinder
+
+    #workers>1 时答案句子的实体抽取用进程池并行
+    def __init__(self,mquestion,entity_finder,display=False,workers=1):
         assert mquestion.type_name == "Question"
 
         self.__question = mquestion
@@ -49,6 +54,8 @@ class abstract_entity_expansioner(metaclass=ABCMeta):
 
         self.display = display
 
+        self.workers = workers
+
     #返回问题题目
     def get_title(self):
         return self.__question.get_title()
@@ -73,34 +80,38 @@ class abstract_entity_expansioner(metaclass=ABCMeta):
     def get_sentence_entity(self):
         return self.__sentence_entity    
 
+    #答案的分析结果, 分句分词和实体都在里面, 摘要也用同一个
+    def get_analysis(self):
+        return self.__question.get_analysis()
+
     #构建sentence entity
     def construct_sentence_entity(self):
-        #先把所有answer取出来
-        answers = self.get_answers()
-
-        #对于每一个答案
-        for answer in answers:
-
-            #得到答案的内容
-            content = answer.get_content()
+        #每个答案分好的句子
+        sentences = self.get_analysis().get_sentences()
 
-            sentences = nlp.sent_tokenize(content)
+        #还没抽过实体的句子一起批量抽, 结果存到句子里面, 重复的句子是同一个对象, 只抽一次
+        todo,seen = [],set()
+        for asentence in sentences:
+            if not asentence.has_entities(self.sentence_finder) and id(asentence) not in seen:
+                seen.add(id(asentence))
+                todo.append(asentence)
+        results = extract_entities_batch([asentence.get_text() for asentence in todo],self.sentence_finder,self.workers)
+        for asentence,(sentence,entity) in zip(todo,results):
+            asentence.set_entities(self.sentence_finder,entity)
 
-            #对于每一个句子
-            for sentence in sentences:
+        #对于每一个句子
+        for asentence in sentences:
+            sentence = asentence.get_text()
 
-                #实体链接
-                finder = NgramEntityFinder(sentence)
+            #实体链接, 找出所有实体, 结果存在句子里面
+            entity = asentence.get_entities(self.sentence_finder)
 
-                #找出所有实体
-                entity = finder.extract_entity(display=False)
+            #跟总实体取并
+            self.__sentence_total_entity = self.__sentence_total_entity.union(set(entity))
 
-                #跟总实体取并
-                self.__sentence_total_entity = self.__sentence_total_entity.union(set(entity))
-
-                #加入结果集中
-                if len(entity) >0 :
-                    self.append_sentence_entity((sentence,entity))
+            #加入结果集中
+            if len(entity) >0 :
+                self.append_sentence_entity((sentence,entity))
 
     #得到标题的实体
     def title_entity(self):
@@ -124,6 +135,14 @@ class abstract_entity_expansioner(metaclass=ABCMeta):
         base_entity = base_entity.difference(remove)
         return base_entity
 
+    #标题实体的int id, 扩展的时候用这个
+    def title_entity_ids(self):
+        return set(cn.concept_ids(self.title_entity()))
+
+    #扩展的结果是id, 在输出的时候换回概念名
+    def output_entity(self,result):
+        return set(cn.id_names(result))
+
     def print_sentence_entity(self):
         for sentence,entity in self.__sentence_entity:
             print("%s\n%s\n%s"%(sentence,entity,100*"="))
@@ -149,53 +168,41 @@ class abstract_entity_expansioner(metaclass=ABCMeta):
 #level1 是同义层层数
 #level2 是关联层层数
 class level_filter_entity_expansioner(abstract_entity_expansioner):
-    def __init__(self,mquestion,entity_finder,level1,level2,display):
-        abstract_entity_expansioner.__init__(self,mquestion,entity_finder,display)
+    #workers传给abstract_entity_expansioner, 所有子类都一样
+    def __init__(self,mquestion,entity_finder,level1,level2,display,workers=1):
+        abstract_entity_expansioner.__init__(self,mquestion,entity_finder,display,workers)
         self.level1 = level1
         self.level2 = level2
 
         #经过同义层过滤后的实体个数
         self.syn_filter_len = -1 
 
+        #每次扩展每层的 (frontier大小,新实体数)
+        self.expand_stats = []
+        self.set_budget()
+
     def get_level(self):
         return self.level1,self.level2
         
+    #扩展的限制, 见frontier.py, 都是None表示不限制
+    #level_cap : 每层最多新加多少个实体
+    #max_nodes : 一次扩展最多多少个实体
+    #max_calls : 一次扩展最多查多少次KB
+    #max_time  : 一次扩展最多花多少秒
+    def set_budget(self,level_cap=None,max_nodes=None,max_calls=None,max_time=None):
+        self.budget = {"level_cap":level_cap,"max_nodes":max_nodes,"max_calls":max_calls,"max_time":max_time}
+
     #这个是扩展的通用方法, 给定输入的base_entity集合, 利用某种扩展规则进行扩展, 还有扩展层数
+    #expand_rule是批量接口, 输入一层的实体, 返回{entity:[neighbour...]}, 每层只查一次KB
+    #宽度优先, 每层只扩展上一层新发现的实体
     #返回扩展的实体    
     def expand_with_entity_type(self,base_entity,expand_rule,expand_level):
+        expander = frontier_expander(expand_rule,expand_level,**self.budget)
+        expand_entity = expander.expand(base_entity)
 
-        #开始扩展
-        #算法流程打算用基于栈的非递归方法
-        
-        #1. 记录当前的实体数量
-        previous_entity_length = len(base_entity)
-
-        #2. expand_entity初始化设为base_entity
-        expand_entity = base_entity.copy()
-
-        #3. 假设扩展之前 a,b,c 当a,b,c 都扩展完之后, 需要与之前的比较大小, 那么之前的需要初始化进行记录
-        previous_expand_entity = expand_entity.copy()
-
-        #4. 判断条件, 1. expand_entity 的体积没有增长, 2.previous_expand_entity 已经遍历完了
-        indx = 0
-
-        while indx < expand_level:
-
-            #对每个前一轮的实体来说
-            for entity in previous_expand_entity:
-                #进行同义词扩展
-                temp_expand_entity = expand_rule(entity)
-
-                #合并
-                expand_entity = expand_entity.union(temp_expand_entity)
-                
-            indx += 1    
-            #扩展的集合体积没有增长, 则说明循环结束, 跳出循环, 如不然则重新赋值
-            if len(expand_entity) == previous_expand_entity:
-                break;
-            else:
-                previous_entity_length = len(expand_entity)
-                previous_expand_entity = expand_entity.copy()
+        self.expand_stats.append(expander.level_stats)
+        if self.display and expander.stop_reason is not None:
+            print("扩展提前停止 : %s"%(expander.stop_reason))
 
         return expand_entity
 
@@ -204,10 +211,13 @@ class level_filter_entity_expansioner(abstract_entity_expansioner):
     def expand_with_entity_weight(self,entity_dict,expand_rule):
         target_dict = {}
 
+        #整个基实体一次查询, 得到{entity:[(邻居,权值)...]}
+        neighbour_weight_dict = expand_rule(entity_dict)
+
         #对于基实体的每个实体来说
         for entity in entity_dict:
             #得到的是一个(邻居,权值)的list
-            neighbour_weight = expand_rule(entity)
+            neighbour_weight = neighbour_weight_dict[entity]
 
             #反向建立一个target的字典里面存储的都是base entity 和weight, 暂定为tuple
             for neighbour,nweight in neighbour_weight:
@@ -219,10 +229,11 @@ class level_filter_entity_expansioner(abstract_entity_expansioner):
 
     #==================下面的是接口方法======================
     #expand的具体方法
+    #中间的集合都是概念的int id, 最后才换回字符串
     def expand(self):
 
         #step1: 得到base entity(title的所有实体)
-        base_entity = self.title_entity()
+        base_entity = self.title_entity_ids()
 
         #step2: 同义层扩展
         syn_entity = self.syn_expand(base_entity)
@@ -235,10 +246,10 @@ class level_filter_entity_expansioner(abstract_entity_expansioner):
         relate_entity = self.relate_expand(syn_entity)
 
         
-        return relate_entity
+        return self.output_entity(relate_entity)
         
     def syn_expand(self,base_entity):
-        expand_rule = searcher.synonym_entity
+        expand_rule = searcher.synonym_id_many
         result = self.expand_with_entity_type(base_entity,expand_rule,self.level1)
         return result
         
@@ -262,22 +273,22 @@ class level_filter_entity_expansioner(abstract_entity_expansioner):
 #这个算法只扩展同义词类
 class OnlySynExpansioner(level_filter_entity_expansioner):
     #max level是可扩展到最大层数, 如需要两层 则level = 2
-    def __init__(self,mquestion,entity_finder,level,display):
-        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level,level,display)
+    def __init__(self,mquestion,entity_finder,level,display,workers=1):
+        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level,level,display,workers)
 
     def relate_filter(self,base_entity,entity):
         pass
 
 #这个方法先扩展成同义词然后扩展关联关系
 class SynRelateExpansioner(level_filter_entity_expansioner):
-    def __init__(self,mquestion,entity_finder,level1,level2,display):
-        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display)
+    def __init__(self,mquestion,entity_finder,level1,level2,display,workers=1):
+        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display,workers)
 
     #重载relate_expand
     def relate_expand(self,entity):
         
         dumb,level2 = self.get_level()
-        expand_rule = searcher.relate_entity
+        expand_rule = searcher.relate_id_many
         
         result = self.expand_with_entity_type(entity,expand_rule,level2)
         
@@ -286,35 +297,14 @@ class SynRelateExpansioner(level_filter_entity_expansioner):
     def relate_filter(self,base_entity,entity):
         pass
 
-#===========================================
-#获得两个实体之间的权重
-#第一个函数与第二个函数的区别是
-#第一个函数只有相同实体才是0,1, 剩下的都是按照正常的来
-#第二个函数只要有连接就是1,剩下的是0
-cn = concept_tool()
-def get_weight1(ent1,ent2):
-    weight = cn.entity_strength(ent1,ent2)
-    if ent1 == ent2 :
-        return 1
-    else:
-        return weight
-
-def get_weight2(ent1,ent2):
-    weight = cn.entity_strength(ent1,ent2)
-    if ent1 == ent2 or weight != 0:
-        return 1
-    else:
-        return 0
-
-#============================================
 
 
 #这个方法先扩同义词, 然后用rank(page rank 或者hits)
 class SynPagerankExpansioner(level_filter_entity_expansioner):
 
     #n是同义词过滤实体后的个数
-    def __init__(self,mquestion,entity_finder,level1,level2,display,n=30):
-        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display)
+    def __init__(self,mquestion,entity_finder,level1,level2,display,n=30,workers=1):
+        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display,workers)
         self.n = n
 
 
@@ -334,7 +324,7 @@ class SynPagerankExpansioner(level_filter_entity_expansioner):
         l = min(len(important_entity),self.n)
         
         #得到top n, 并且并上基实体
-        topn = set(important_entity[:l]).union(self.title_entity())
+        topn = set(important_entity[:l]).union(self.title_entity_ids())
 
         return topn
 
@@ -342,7 +332,7 @@ class SynPagerankExpansioner(level_filter_entity_expansioner):
     def relate_expand(self,entity):
         
         dumb,level2 = self.get_level()
-        expand_rule = searcher.relate_entity
+        expand_rule = searcher.relate_id_many
         
         result = self.expand_with_entity_type(entity,expand_rule,level2)
         
@@ -356,15 +346,15 @@ class SynPagerankExpansioner(level_filter_entity_expansioner):
         
 
     def hits(self,gr):
-        h,a = nx.hits(gr,max_iter = 300)
+        h,a = hits_graph(gr,max_iter=300)
         return h
         
 #这个方法先扩同义词, 然后用rank(page rank 或者hits)
 class SynHitsExpansioner(level_filter_entity_expansioner):
 
     #n是同义词过滤实体后的个数
-    def __init__(self,mquestion,entity_finder,level1,level2,display,n=20):
-        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display)
+    def __init__(self,mquestion,entity_finder,level1,level2,display,n=20,workers=1):
+        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display,workers)
         self.n = n
 
 
@@ -384,7 +374,7 @@ class SynHitsExpansioner(level_filter_entity_expansioner):
         l = min(len(important_entity),self.n)
         
         #得到top n, 并且并上基实体
-        topn = set(important_entity[:l]).union(self.title_entity())
+        topn = set(important_entity[:l]).union(self.title_entity_ids())
 
         return topn
 
@@ -392,7 +382,7 @@ class SynHitsExpansioner(level_filter_entity_expansioner):
     def relate_expand(self,entity):
         
         dumb,level2 = self.get_level()
-        expand_rule = searcher.relate_entity
+        expand_rule = searcher.relate_id_many
         
         result = self.expand_with_entity_type(entity,expand_rule,level2)
         
@@ -406,15 +396,15 @@ class SynHitsExpansioner(level_filter_entity_expansioner):
         
 
     def hits(self,gr):
-        h,a = nx.hits(gr,max_iter = 300)
+        h,a = hits_graph(gr,max_iter=300)
         return h        
 
 
 #这个方法先扩同义词, 然后根据联通分量过滤或者度进行过滤
 class SynCCExpansioner(level_filter_entity_expansioner):
     
-    def __init__(self,mquestion,entity_finder,level1,level2,display):
-        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display)
+    def __init__(self,mquestion,entity_finder,level1,level2,display,workers=1):
+        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display,workers)
 
     #=======================重写部分================================
     #重写同义词过滤的方法
@@ -428,7 +418,7 @@ class SynCCExpansioner(level_filter_entity_expansioner):
         result = ranker.rank()    
             
         
-        important_entity = result.union(self.title_entity())
+        important_entity = result.union(self.title_entity_ids())
 
         return important_entity
 
@@ -436,7 +426,7 @@ class SynCCExpansioner(level_filter_entity_expansioner):
     def relate_expand(self,entity):
         
         dumb,level2 = self.get_level()
-        expand_rule = searcher.relate_entity
+        expand_rule = searcher.relate_id_many
         
         result = self.expand_with_entity_type(entity,expand_rule,level2)
         
@@ -451,8 +441,8 @@ class SynCCExpansioner(level_filter_entity_expansioner):
 #这个方法先扩同义词, 然后根据联通分量过滤或者度进行过滤
 class SynKCoreExpansioner(level_filter_entity_expansioner):
     
-    def __init__(self,mquestion,entity_finder,level1,level2,display):
-        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display)
+    def __init__(self,mquestion,entity_finder,level1,level2,display,workers=1):
+        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display,workers)
 
     #=======================重写部分================================
     #重写同义词过滤的方法
@@ -465,7 +455,7 @@ class SynKCoreExpansioner(level_filter_entity_expansioner):
         ranker = KCoreRanker(base_entity)
         result = ranker.rank()    
         
-        important_entity = result.union(self.title_entity())
+        important_entity = result.union(self.title_entity_ids())
 
         return important_entity
 
@@ -473,7 +463,7 @@ class SynKCoreExpansioner(level_filter_entity_expansioner):
     def relate_expand(self,entity):
         
         dumb,level2 = self.get_level()
-        expand_rule = searcher.relate_entity
+        expand_rule = searcher.relate_id_many
         
         result = self.expand_with_entity_type(entity,expand_rule,level2)
         
@@ -488,8 +478,8 @@ class SynKCoreExpansioner(level_filter_entity_expansioner):
 
 #过滤关联层为主        
 class RankRelateFilterExpansioner(SynPagerankExpansioner):
-    def __init__(self,mquestion,entity_finder,level1,level2,display,n=30,length=8000):
-        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display)
+    def __init__(self,mquestion,entity_finder,level1,level2,display,n=30,length=8000,workers=1):
+        level_filter_entity_expansioner.__init__(self,mquestion,entity_finder,level1,level2,display,workers)
         self.n = n
         self.count = 0
         self.length = length
@@ -512,7 +502,7 @@ class RankRelateFilterExpansioner(SynPagerankExpansioner):
         #得到top n, 并且并上基实体,注意, 这里返回的形式是dict, 所以后面加上了这么多东西
         topn = important_entity[:l]
 
-        title_entity = self.title_entity()
+        title_entity = self.title_entity_ids()
 
         for indx in range(l+1,len(important_entity)):
             enti,weig = important_entity[indx]
@@ -531,16 +521,20 @@ class RankRelateFilterExpansioner(SynPagerankExpansioner):
     #entity_dict 是一个带权重的实体集
     def relate_expand(self,entity_dict):
 
-        expand_rule = searcher.relate_entity_weight
+        expand_rule = searcher.relate_id_weight_many
         
         target_dict = self.expand_with_entity_weight(entity_dict,expand_rule)
         
         result = self.relate_filter(target_dict,entity_dict)
 
-        #result = result.union(self.title_entity())
+        #result = result.union(self.title_entity_ids())
                 
         return result
         
+    #结果是[(id,分数)...], 换回[(概念名,分数)...]
+    def output_entity(self,result):
+        return [(cn.id_name(entity),weight) for entity,weight in result]
+
     def relate_filter(self,expand_entity,base_entity):
 
         result = {}
@@ -10,12 +10,19 @@
 #find通用方法, 查找到所有的实体, 返回一个entity string 类的list, 这样做的好处是, 用entity string 进行封装, 使得里面的比如get sick这样的词组可以进行二次查询, 扩大搜索范围
 
 from abc import ABCMeta, abstractmethod
-from ..util import NLP
-from ..knowledge_base import concept_tool
+import multiprocessing as mp
+import atexit
+from .. import registry
+from ..registry import lazy
+from ..english import normalize_tagged
+from .concept_trie import longest_spans
 
-nlp = NLP()
-cn_tool = concept_tool()
-in_kb = cn_tool.kb_has_concept
+nlp = lazy("nlp")
+cn_tool = lazy("cp_tool")
+trie = lazy("concept_trie")
+
+def in_kb(word):
+    return cn_tool.kb_has_concept(word)
 
 class abstract_entity_finder(metaclass=ABCMeta):
 
@@ -23,6 +30,7 @@ class abstract_entity_finder(metaclass=ABCMeta):
         self.__sentence = sentence
         self.__words_filter = words_filter
         self.__entity = None
+        self.__known = None
 
     #这个是抽象方法,是必须定义的
     #display 属性是debug用的, 可以打印几个阶段什么的
@@ -41,6 +49,17 @@ class abstract_entity_finder(metaclass=ABCMeta):
 
     def get_entity(self):
         return self.__entity
+
+    #一句话的所有候选词一次查KB的概念集合, 查到的存起来
+    def batch_in_kb(self,words):
+        words = list(set(words))
+        self.__known = set([word for word,has in zip(words,cn_tool.kb_has_concepts(words)) if has])
+
+    #batch_in_kb查过的直接用结果, 没查过的单独查
+    def in_kb(self,word):
+        if self.__known is None:
+            return in_kb(word)
+        return word in self.__known
         
     def filter_words(self):
         if self.__words_filter == None:
@@ -77,21 +96,27 @@ class NgramEntityFinder(abstract_entity_finder):
         sent = self.get_sentence().replace('/',' ')
         sent = self.get_sentence().replace('-',' ')
 
-        #先POS-tagging
-        pos_sent = nlp.blob_tags(sent)
+        #先POS-tagging, 再归一化, 每个词只归一化一次
+        pos_sent = self.tag_and_normalize(sent)
 
         #bigram
         bgm = nlp.bigrams(pos_sent)
 
-        #cand 是已经确定候选的词的集合, 已经经过词形转换了,是个set
-        cand = set([])
-        for (word1,tag1),(word2,tag2) in bgm:
+        #先把所有的unigram和bigram归一化, 一次查KB
+        grams = []
+        for (sword1,tag1),(sword2,tag2) in bgm:
             
-            sword1,sword2 = nlp.norm_text(word1),nlp.norm_text(word2)
             sword12 = sword1+"_"+sword2
             
             condition = self.build_condition(tag1,tag2)
 
+            grams.append((sword1,sword2,sword12,condition))
+
+        self.batch_in_kb([word for gram in grams for word in gram[:3]])
+
+        #cand 是已经确定候选的词的集合, 已经经过词形转换了,是个set
+        cand = set([])
+        for sword1,sword2,sword12,condition in grams:
             self.process_condition(sword1,sword2,sword12,cand,condition)
 
         if display==True:
@@ -105,6 +130,10 @@ class NgramEntityFinder(abstract_entity_finder):
             
         return list(cand)
             
+    #分词标注, 然后归一化, 返回[(归一化的词,tag)...]
+    def tag_and_normalize(self,sent):
+        return [(nlp.norm_text(word),tag) for word,tag in nlp.blob_tags(sent)]
+
     #得到三种tag
     def get_small_tag(self,tag):
         if nlp.tag_is_noun(tag):
@@ -120,20 +149,20 @@ class NgramEntityFinder(abstract_entity_finder):
         return t1+'+'+t2
 
     def add_both(self,word1,word2,word12,cand):
-        if word12 not in cand and in_kb(word12) :
+        if word12 not in cand and self.in_kb(word12) :
             cand.add(word12)
         else:
-            if word1 not in cand and in_kb(word1) :
+            if word1 not in cand and self.in_kb(word1) :
                 cand.add(word1)
-            if word2 not in cand and in_kb(word2) :
+            if word2 not in cand and self.in_kb(word2) :
                 cand.add(word2)
 
     def add_first(self,word1,cand):
-        if word1 not in cand and in_kb(word1) :
+        if word1 not in cand and self.in_kb(word1) :
             cand.add(word1)
 
     def add_last(self,word2,cand):
-        if word2 not in cand and in_kb(word2) :
+        if word2 not in cand and self.in_kb(word2) :
             cand.add(word2)
             
     def process_condition(self,word1,word2,word12,cand,condition):
@@ -146,6 +175,57 @@ class NgramEntityFinder(abstract_entity_finder):
         elif condition == 'o+v' or condition == 'o+n':
             self.add_last(word2,cand)
 
+#一遍完成的版本, 整句只分词标注一次, 然后带着词性直接词形还原
+#不再对每个词单独走normalize(会重新分句分词), 词性已知所以词干也更准
+class SinglePassNgramEntityFinder(NgramEntityFinder):
+
+    def tag_and_normalize(self,sent):
+        return [(normalize_tagged(word,tag),tag) for word,tag in nlp.blob_tags(sent)]
+
+#用多词概念的自动机找实体, 不限于bigram, 一遍扫描找出句子里所有KB的概念
+#单个词的概念一次批量查KB的概念集合, 多词的在自动机里面找
+#mode='longest' : 从左到右最长匹配, 区间不重叠, 比如 get_sick 匹配上了就不要 get 和 sick
+#mode='all'     : 所有匹配上的概念都要
+class TrieEntityFinder(abstract_entity_finder):
+
+    def __init__(self,sentence,mode='longest'):
+        abstract_entity_finder.__init__(self,sentence,stopwords_filter)
+        self.mode = mode
+
+    def find(self,display=False):
+        sent = self.get_sentence().replace('/',' ').replace('-',' ')
+
+        #归一化之后的词, KB的概念都是小写的
+        tokens = [nlp.norm_text(word).lower() for word in nlp.word_tokenize(sent)]
+
+        #多词的概念
+        spans = trie.match(tokens)
+
+        #单个词的概念
+        for indx,has in enumerate(cn_tool.kb_has_concepts(tokens)):
+            if has:
+                spans.append((indx,indx+1))
+
+        if self.mode == 'longest':
+            spans = longest_spans(spans)
+        else:
+            spans = sorted(spans)
+
+        cand = []
+        for start,end in spans:
+            entity = '_'.join(tokens[start:end])
+            if entity not in cand:
+                cand.append(entity)
+
+        if display==True:
+            print("orign    sent:|| %s ||"%(self.get_sentence()))
+            print("norm     word:|| %s ||"%(tokens))
+            print("cand     word:|| %s ||"%(cand))
+
+        self.set_entity(cand)
+
+        return cand
+
 #这个类主要利用的方法是寻找出所有符合ngram的实体来, 当然现在我只考虑bigram
 #注意这里的输入是每一句话,而不是一个答案
 #那么我们的第一步是利用conceptNet内置的stem进行stem
@@ -160,21 +240,27 @@ class MoreNgramEntityFinder(abstract_entity_finder):
         sent = self.get_sentence().replace('/',' ')
         sent = self.get_sentence().replace('-',' ')
 
-        #先POS-tagging
-        pos_sent = nlp.blob_tags(sent)
+        #先POS-tagging, 再归一化, 每个词只归一化一次
+        pos_sent = self.tag_and_normalize(sent)
 
         #bigram
         bgm = nlp.bigrams(pos_sent)
 
-        #cand 是已经确定候选的词的集合, 已经经过词形转换了,是个set
-        cand = set([])
-        for (word1,tag1),(word2,tag2) in bgm:
+        #先把所有的unigram和bigram归一化, 一次查KB
+        grams = []
+        for (sword1,tag1),(sword2,tag2) in bgm:
             
-            sword1,sword2 = nlp.norm_text(word1),nlp.norm_text(word2)
             sword12 = sword1+"_"+sword2
             
             condition = self.build_condition(tag1,tag2)
 
+            grams.append((sword1,sword2,sword12,condition))
+
+        self.batch_in_kb([word for gram in grams for word in gram[:3]])
+
+        #cand 是已经确定候选的词的集合, 已经经过词形转换了,是个set
+        cand = set([])
+        for sword1,sword2,sword12,condition in grams:
             self.process_condition(sword1,sword2,sword12,cand,condition)
 
         if display==True:
@@ -188,6 +274,10 @@ class MoreNgramEntityFinder(abstract_entity_finder):
             
         return list(cand)
             
+    #分词标注, 然后归一化, 返回[(归一化的词,tag)...]
+    def tag_and_normalize(self,sent):
+        return [(nlp.norm_text(word),tag) for word,tag in nlp.blob_tags(sent)]
+
     #得到三种tag
     def get_small_tag(self,tag):
         if nlp.tag_is_noun(tag):
@@ -203,20 +293,20 @@ class MoreNgramEntityFinder(abstract_entity_finder):
         return t1+'+'+t2
 
     def add_both(self,word1,word2,word12,cand):
-        if word12 not in cand and in_kb(word12) :
+        if word12 not in cand and self.in_kb(word12) :
             cand.add(word12)
         else:
-            if word1 not in cand and in_kb(word1) :
+            if word1 not in cand and self.in_kb(word1) :
                 cand.add(word1)
-            if word2 not in cand and in_kb(word2) :
+            if word2 not in cand and self.in_kb(word2) :
                 cand.add(word2)
 
     def add_first(self,word1,cand):
-        if word1 not in cand and in_kb(word1) :
+        if word1 not in cand and self.in_kb(word1) :
             cand.add(word1)
 
     def add_last(self,word2,cand):
-        if word2 not in cand and in_kb(word2) :
+        if word2 not in cand and self.in_kb(word2) :
             cand.add(word2)
             
     def process_condition(self,word1,word2,word12,cand,condition):
@@ -233,3 +323,68 @@ class MoreNgramEntityFinder(abstract_entity_finder):
             self.add_first(word1,cand)
             self.add_first(word12,cand)
             
+
+
+#MoreNgramEntityFinder的一遍完成的版本
+class SinglePassMoreNgramEntityFinder(MoreNgramEntityFinder):
+
+    def tag_and_normalize(self,sent):
+        return [(normalize_tagged(word,tag),tag) for word,tag in nlp.blob_tags(sent)]
+
+
+#==================批量抽取实体==================
+
+#进程池里每个worker启动的时候调一次, 先把NLP模型和KB的概念集合建好, 之后的句子就不用再等
+def warm_worker():
+    nlp.blob_tags("warm up")
+    nlp.norm_text("warm")
+    registry.get("entity_indx")
+
+def extract_one(args):
+    sentence,entity_finder = args
+    finder = entity_finder(sentence)
+    return sentence,finder.extract_entity(display=False)
+
+#整个进程共用一个进程池, 第一次用的时候才建, 之后所有问题都用它, 每个worker只预热一次
+batch_pool = None
+batch_pool_workers = 0
+
+def close_batch_pool():
+    global batch_pool,batch_pool_workers
+    if batch_pool is not None:
+        batch_pool.close()
+        batch_pool.join()
+    batch_pool = None
+    batch_pool_workers = 0
+
+atexit.register(close_batch_pool)
+
+#返回workers个进程的池, workers变了就重建
+#已经在进程池的worker里面(比如exp/runner.py)的时候不能再建子进程, 返回None
+def get_batch_pool(workers):
+    global batch_pool,batch_pool_workers
+    if mp.current_process().daemon:
+        return None
+
+    if batch_pool is None or batch_pool_workers != workers:
+        close_batch_pool()
+        batch_pool = mp.Pool(workers,initializer=warm_worker)
+        batch_pool_workers = workers
+
+    return batch_pool
+
+#批量抽取实体, 返回和sentences顺序一致的[(sentence,[entity...])...]
+#workers>1 的时候分给进程池, chunksize个句子一组, 答案很多的问题用得上
+#进程池拿不到的时候(在别的进程池的worker里)就在本进程里做
+#entity_finder必须是模块级别的类, 要能pickle
+def extract_entities_batch(sentences,entity_finder=NgramEntityFinder,workers=1,chunksize=8):
+    tasks = [(sentence,entity_finder) for sentence in sentences]
+
+    pool = None
+    if workers > 1 and len(tasks) > chunksize:
+        pool = get_batch_pool(workers)
+
+    if pool is None:
+        return [extract_one(task) for task in tasks]
+
+    return list(pool.imap(extract_one,tasks,chunksize))
@@ -0,0 +1,94 @@
+'''
+说明:一层一层的宽度优先扩展, 每层只扩展上一层新发现的实体(frontier)
+以前每一层都把到目前为止所有的实体重新扩展一遍, 早扩展过的实体会一直被重复查
+扩展出来的实体集合和以前一样, 但是查KB的次数只和每层新发现的实体数有关
+
+可以加限制, 到了就提前停:
+level_cap : 每层最多新加多少个实体
+max_nodes : 总共最多多少个实体(包括基实体)
+max_calls : 最多扩展多少个实体, 也就是查多少次KB
+max_time  : 最多花多少秒, 每层开始之前检查
+'''
+
+import time
+clock = time.time
+
+class frontier_expander:
+    #expand_rule是批量接口, 输入一层的实体, 返回{entity:[neighbour...]}
+    def __init__(self,expand_rule,level,level_cap=None,max_nodes=None,max_calls=None,max_time=None):
+        self.expand_rule = expand_rule
+        self.level = level
+        self.level_cap = level_cap
+        self.max_nodes = max_nodes
+        self.max_calls = max_calls
+        self.max_time = max_time
+
+        #每层的统计 [(frontier大小,新发现的实体数)...]
+        self.level_stats = []
+        self.calls = 0
+
+        #停下来的原因, None表示扩展完了所有层或者没有新实体了
+        self.stop_reason = None
+
+    def remaining_calls(self):
+        if self.max_calls is None:
+            return None
+        return self.max_calls - self.calls
+
+    #返回所有访问过的实体, 包括base_entity
+    def expand(self,base_entity):
+        start = clock()
+
+        visited = set(base_entity)
+        frontier = list(base_entity)
+
+        for indx in range(self.level):
+            if len(frontier) == 0:
+                break
+
+            if self.max_nodes is not None and len(visited) >= self.max_nodes:
+                self.stop_reason = "nodes"
+                break
+
+            if self.max_time is not None and clock() - start >= self.max_time:
+                self.stop_reason = "time"
+                break
+
+            #查KB的次数不够了, 只扩展前面的
+            remaining = self.remaining_calls()
+            if remaining is not None:
+                if remaining <= 0:
+                    self.stop_reason = "calls"
+                    break
+                frontier = frontier[:remaining]
+
+            neighbours = self.expand_rule(frontier)
+            self.calls += len(frontier)
+
+            #按发现的顺序收集新实体
+            new_entity = []
+            for entity in frontier:
+                for neighbour in neighbours.get(entity,[]):
+                    if neighbour not in visited:
+                        visited.add(neighbour)
+                        new_entity.append(neighbour)
+
+            if self.level_cap is not None and len(new_entity) > self.level_cap:
+                for entity in new_entity[self.level_cap:]:
+                    visited.discard(entity)
+                new_entity = new_entity[:self.level_cap]
+
+            if self.max_nodes is not None and len(visited) > self.max_nodes:
+                over = min(len(visited) - self.max_nodes,len(new_entity))
+                for entity in new_entity[len(new_entity)-over:]:
+                    visited.discard(entity)
+                new_entity = new_entity[:len(new_entity)-over]
+                self.stop_reason = "nodes"
+
+            self.level_stats.append((len(frontier),len(new_entity)))
+            frontier = new_entity
+
+            if self.stop_reason is not None:
+                break
+
+        return visited
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+#coding=utf-8
+
+'''
+这个文件的主要作用是流式地读Yahoo Answers的数据, 一个一个地yield Question
+以前是把整个文件读进来再用正则找, 几个G的manner.xml内存放不下
+现在内存里面只有当前的这一个问题
+
+xml  : manner.xml 那种, <vespaadd><document>...</document></vespaadd>, 用iterparse增量解析
+json : computers.json 那种, 一行一个json, 问题行(有answercount)后面跟着它的答案行(有content)
+
+文件名以.gz结尾的话直接读压缩文件
+'''
+
+import gzip
+import json
+from xml.etree.ElementTree import iterparse
+
+from .common_type import Question,Answer
+
+#打开文件, fn也可以是已经打开的文件对象
+#xml用二进制读, 编码交给解析器按文件头里面的encoding处理
+def open_source(fn,binary=False):
+    if not isinstance(fn,str):
+        return fn
+
+    opener = gzip.open if fn.endswith(".gz") else open
+    if binary:
+        return opener(fn,"rb")
+
+    return opener(fn,"rt",encoding="utf-8")
+
+#元素里面的全部文本, 包括子元素的
+def element_text(elem):
+    if elem is None:
+        return ""
+    return "".join(elem.itertext()).strip()
+
+#manner.xml 每个document是一个问题
+#subject是标题, content是描述, bestanswer是最佳答案, nbestanswers下面的answer_item是所有答案
+def iter_xml_questions(fn):
+    source = open_source(fn,binary=True)
+    try:
+        yield from xml_questions(source)
+    finally:
+        #自己打开的文件自己关, 传进来的文件对象不管
+        if source is not fn:
+            source.close()
+
+def xml_questions(source):
+    root = None
+    for event,elem in iterparse(source,events=("start","end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+
+        if elem.tag != "document":
+            continue
+
+        title = element_text(elem.find("subject"))
+        content = element_text(elem.find("content"))
+        best = element_text(elem.find("bestanswer"))
+        nbest = [Answer(element_text(item)) for item in elem.iter("answer_item")]
+
+        #解析完的问题扔掉, 内存里面只留当前的问题
+        root.clear()
+
+        yield Question(title,content,best,nbest)
+
+#把一行解析成json, 去掉结尾的逗号, 数组的开头结尾和空行返回None
+def parse_json_line(line):
+    line = line.strip()
+    if len(line) > 0 and line[-1] == ',':
+        line = line[:-1]
+
+    if line in ("","[","]"):
+        return None
+
+    return json.loads(line)
+
+#computers.json 问题行后面跟着答案行, 读到下一个问题的时候把上一个问题yield出去
+#没有答案的问题不要
+#解析不了的行打印出来跳过, 不再直接退出
+def iter_json_questions(fn):
+    source = open_source(fn)
+    try:
+        yield from json_questions(source)
+    finally:
+        if source is not fn:
+            source.close()
+
+def json_questions(source):
+    title,nbest,answer_count,author = "",[],0,""
+    for indx,line in enumerate(source):
+        try:
+            line_json = parse_json_line(line)
+        except ValueError:
+            print("error json line %s"%(indx))
+            continue
+
+        if line_json is None:
+            continue
+
+        if "answercount" in line_json:
+            #是问题, 先把上一个问题yield出去
+            if len(nbest) > 0:
+                yield Question(title,"","",nbest,author,answer_count)
+
+            if len(line_json["answercount"].strip()) > 0:
+                answer_count = int(line_json["answercount"])
+            else:
+                answer_count = 0
+
+            title = line_json["subject"]
+            author = line_json["postuser"]
+            nbest = []
+
+        elif "content" in line_json:
+            content = line_json["content"]
+            support = int(line_json["supportnum"])
+            oppose = int(line_json["opposenum"])
+            ans_author = line_json["answeruser"]
+
+            nbest.append(Answer(content,support,oppose,ans_author))
+
+        else:
+            print("error line %s"%(indx))
+
+    if len(nbest) > 0:
+        yield Question(title,"","",nbest,author,answer_count)
+
+#根据文件名选xml还是json
+def iter_questions(fn):
+    name = fn[:-3] if fn.endswith(".gz") else fn
+    if name.endswith(".xml"):
+        return iter_xml_questions(fn)
+
+    return iter_json_questions(fn)
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+#coding=utf-8
+
+'''
+这个文件定义了问题的存储, 代替原来整个pickle的filter_qa和duc_question
+原来要把所有问题都unpickle出来才能开始处理第一个, 现在用到哪个读哪个
+
+两个文件:
+prefix.qs  : 每个问题一条记录, 记录是zlib压缩的json, 一条接一条地写在后面(append-only)
+prefix.qidx: int64的数组, 第i个是第i条记录的结束位置, 第i个问题的qid就是i
+
+两个文件都是mmap读的, 多个进程可以各自读不相交的一段
+    store = question_store(prefix)
+    store[3]      #第3个问题
+    store[10:20]  #第10到20个问题, list
+    len(store)
+'''
+
+import os
+import json
+import mmap
+import zlib
+import pickle
+
+import numpy as np
+
+from .common_type import Question,Answer
+
+DATA_SUFFIX = ".qs"
+INDEX_SUFFIX = ".qidx"
+
+#Question <=> 可以json的dict, 字符串都已经去掉了html标签
+def question_to_record(question):
+    nbest = [[answer.get_content(),answer.get_support(),answer.get_oppose(),answer.get_author()] \
+             for answer in question.get_nbest()]
+
+    return {"title":question.get_title(),"content":question.get_content(),"best":question.get_best(),
+            "nbest":nbest,"author":question.get_author(),"count":question.get_answer_count()}
+
+def record_to_question(record):
+    nbest = [Answer(content,support,oppose,author,clean_tag=False) for content,support,oppose,author in record["nbest"]]
+
+    return Question(record["title"],record["content"],record["best"],nbest,record["author"],record["count"],clean_tag=False)
+
+#往后面加问题, 先写记录再写位置, 写到一半断了也不会读到半条记录
+#打开的时候以.qidx为准: 最后一个位置之后的数据(记录写了位置没写)和不完整的位置都截掉
+class question_store_writer:
+    def __init__(self,prefix):
+        self.prefix = prefix
+
+        #文件不存在的话先建
+        for suffix in (DATA_SUFFIX,INDEX_SUFFIX):
+            open(prefix+suffix,"ab").close()
+
+        self.index_file = open(prefix+INDEX_SUFFIX,"r+b")
+        self.size = os.path.getsize(prefix+INDEX_SUFFIX) // 8
+        self.index_file.truncate(self.size*8)
+
+        self.end = 0
+        if self.size > 0:
+            self.index_file.seek((self.size-1)*8)
+            self.end = int(np.frombuffer(self.index_file.read(8),dtype=np.int64)[0])
+        self.index_file.seek(self.size*8)
+
+        self.data_file = open(prefix+DATA_SUFFIX,"r+b")
+        self.data_file.truncate(self.end)
+        self.data_file.seek(self.end)
+
+    def __len__(self):
+        return self.size
+
+    #返回这个问题的qid
+    def append(self,question):
+        data = zlib.compress(json.dumps(question_to_record(question)).encode("utf-8"))
+        self.data_file.write(data)
+        self.data_file.flush()
+
+        self.end += len(data)
+        self.index_file.write(np.array([self.end],dtype=np.int64).tobytes())
+        self.index_file.flush()
+
+        self.size += 1
+        return self.size - 1
+
+    def close(self):
+        self.data_file.close()
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+class question_store:
+    def __init__(self,prefix):
+        self.prefix = prefix
+        self.open()
+
+    def open(self):
+        #空文件不能mmap
+        if os.path.getsize(self.prefix+INDEX_SUFFIX) == 0:
+            self.end = np.zeros(0,dtype=np.int64)
+            self.data = b''
+            return
+
+        self.end = np.memmap(self.prefix+INDEX_SUFFIX,dtype=np.int64,mode='r')
+        with open(self.prefix+DATA_SUFFIX,'rb') as data_file:
+            self.data = mmap.mmap(data_file.fileno(),0,access=mmap.ACCESS_READ)
+
+    #mmap不能pickle, 传给别的进程的时候只传路径, 那边重新打开
+    def __getstate__(self):
+        return {"prefix":self.prefix}
+
+    def __setstate__(self,state):
+        self.prefix = state["prefix"]
+        self.open()
+
+    def __len__(self):
+        return len(self.end)
+
+    #第qid条记录解压之前的字节
+    def get_bytes(self,qid):
+        start = int(self.end[qid-1]) if qid > 0 else 0
+        return self.data[start:int(self.end[qid])]
+
+    def get_record(self,qid):
+        return json.loads(zlib.decompress(self.get_bytes(qid)).decode("utf-8"))
+
+    def get(self,qid):
+        if qid < 0:
+            qid += len(self)
+        if qid < 0 or qid >= len(self):
+            raise IndexError("qid %s out of range"%(qid))
+
+        return record_to_question(self.get_record(qid))
+
+    def __getitem__(self,key):
+        if isinstance(key,slice):
+            return [self.get(qid) for qid in range(*key.indices(len(self)))]
+
+        return self.get(key)
+
+    def __iter__(self):
+        for qid in range(len(self)):
+            yield self.get(qid)
+
+#把问题一个一个地写成store, questions可以是list也可以是生成器
+def build_question_store(questions,prefix,display=False):
+    for suffix in (DATA_SUFFIX,INDEX_SUFFIX):
+        if os.path.exists(prefix+suffix):
+            os.remove(prefix+suffix)
+
+    with question_store_writer(prefix) as writer:
+        for question in questions:
+            qid = writer.append(question)
+            if display and qid % 1000 == 0:
+                print("question %s"%(qid))
+
+        return len(writer)
+
+#读问题集合, 配置了 name_store 并且已经建好了就用store, 否则还是读name的pickle
+#比如 load_questions(qconf,"filter_qa") 先看 filter_qa_store
+def load_questions(conf,name):
+    store_name = name + "_store"
+    if store_name in conf and os.path.exists(conf[store_name]+INDEX_SUFFIX):
+        return question_store(conf[store_name])
+
+    with open(conf[name],'rb') as question_file:
+        return pickle.load(question_file)
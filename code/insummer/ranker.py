@@ -4,34 +4,36 @@
 
 import sys
 from abc import ABCMeta, abstractmethod
-from .knowledge_base import concept_tool
+from .registry import lazy
 from .evaluation import bias_overlap_ratio,bias_overlap_quantity
+from .graph_rank import pagerank_graph,hits_graph
 
 import networkx as nx
 import itertools
 from operator import itemgetter
-import matplotlib.pyplot as plt
+
+from scipy import sparse
 
 import time
 clock = time.time
 
-cn = concept_tool()
+cn = lazy("cp_tool")
+
+#一次查询得到实体间的权重矩阵, 不再两两查询
+#entity是概念的int id, 只在查KB的时候换成概念名
+#返回有关系(entity_strength不为0)的实体对[(id1,id2,1)...]
+def weight_edges2(entity):
+    ids = list(entity)
+    nodes,matrix = cn.strength_matrix(cn.id_names(ids))
 
-def get_weight1(ent1,ent2):
-    weight = cn.entity_strength(ent1,ent2)
-    if ent1 == ent2 :
-        return 1
-    else:
-        return weight
+    #对称矩阵只取上三角, 不要对角线
+    matrix = sparse.triu(matrix,k=1).tocoo()
+    mask = matrix.data != 0
 
-def get_weight2(ent1,ent2):
-    weight = cn.entity_strength(ent1,ent2)
-    if ent1 == ent2 or weight != 0:
-        return 1
-    else:
-        return 0
+    #矩阵的前len(ids)个节点和ids一一对应
+    return [(ids[i],ids[j],1) for i,j in zip(matrix.row[mask],matrix.col[mask])]
 
-#给定一群实体, 最后得出这些实体的重要性
+#给定一群实体(概念的int id), 最后得出这些实体的重要性
 class abstract_ranker(metaclass=ABCMeta):
     def __init__(self,entity):
         self.__entity = entity
@@ -52,10 +54,8 @@ class abstract_ranker(metaclass=ABCMeta):
         
         gr = nx.Graph()
         gr.add_nodes_from(entity)
-        node_pairs = list(itertools.combinations(entity,2))
 
-        for ent1,ent2 in node_pairs:
-            weight = get_weight2(ent1,ent2)
+        for ent1,ent2,weight in weight_edges2(entity):
             if weight > 0.3 and ent1 != ent2:
                 gr.add_edge(ent1,ent2,weight=weight)
 
@@ -71,14 +71,15 @@ class Hitsranker(abstract_ranker):
     def __init__(self,entity):
         abstract_ranker.__init__(self,entity)
 
-    def rank(self,return_type='set'):
+    #nstart是hub的初值{ent:score}, 比如上一次rank的结果, 可以少迭代几次
+    def rank(self,return_type='set',nstart=None):
         #排除一些异常情况    
         graph = self.get_graph()
         if graph==None:
             graph = self.build_graph()
 
 
-        h,a = nx.hits_numpy(graph)
+        h,a = hits_graph(graph,max_iter=300,nstart=nstart)
 
         imp = a
 
@@ -102,23 +103,12 @@ class Pageranker(abstract_ranker):
         
         gr = nx.Graph()
         gr.add_nodes_from(entity)
-        node_pairs = list(itertools.combinations(entity,2))
 
-        for ent1,ent2 in node_pairs:
-            weight = get_weight2(ent1,ent2)
+        for ent1,ent2,weight in weight_edges2(entity):
             if weight > 0:
                 gr.add_edge(ent1,ent2,weight=weight)
 
-        #去掉0初度的点, 防止pagerank报错
-        W = nx.DiGraph(gr)    
-        degree = W.out_degree(weight='weight')
-        for(u,v,d) in W.edges(data=True):
-            if degree[u] == 0:
-                try:
-                    gr.remove_node(u)
-                except:
-                    pass
-
+        #没有边的实体不用去掉, pagerank把它们的分数按personalization分出去
         return self.set_graph(gr)
 
     def rank1(self,return_type='set'):
@@ -129,7 +119,8 @@ class Pageranker(abstract_ranker):
         return result
 
         
-    def rank(self,return_type='set'):
+    #nstart是迭代的初值{ent:score}, 比如上一次rank的结果
+    def rank(self,return_type='set',nstart=None):
         #排除一些异常情况
 
         graph = self.get_graph()
@@ -145,7 +136,7 @@ class Pageranker(abstract_ranker):
                 person[ent] = 0.5
 
 
-        pr = nx.pagerank(graph,weight='weight',alpha=0.8,personalization=person,max_iter = 600)
+        pr = pagerank_graph(graph,alpha=0.8,personalization=person,max_iter=600,nstart=nstart)
         result = sorted(pr.items(), key=lambda d: d[1],reverse=True)
 
         if return_type == 'set':
@@ -0,0 +1,146 @@
+'''
+全局单例的注册表
+NLP, KB的连接, 概念集合, 停用词, 配置文件这些东西建起来都很慢, 以前都是import的时候就建好了
+现在统一放在这里, 第一次用到的时候才建, 整个进程只建一次
+模块里面用 lazy("名字") 拿一个代理, 跟原来的全局变量一样用
+
+    nlp = lazy("nlp")
+    nlp.sent_tokenize(...)   #这个时候才会真的去建NLP()
+'''
+
+import threading
+
+#名字 => 建对象的函数
+factories = {}
+
+#名字 => 已经建好的对象
+instances = {}
+
+lock = threading.RLock()
+
+def register(name,factory):
+    factories[name] = factory
+
+#取单例, 没建的话现在建
+def get(name):
+    if name in instances:
+        return instances[name]
+
+    with lock:
+        if name not in instances:
+            instances[name] = factories[name]()
+
+    return instances[name]
+
+#已经建好了没有
+def loaded(name):
+    return name in instances
+
+#扔掉建好的对象, 下次用的时候重新建, 测试的时候用
+def reset(name=None):
+    with lock:
+        if name is None:
+            instances.clear()
+        else:
+            instances.pop(name,None)
+
+#直接塞一个建好的对象进去, 测试的时候用
+def provide(name,instance):
+    with lock:
+        instances[name] = instance
+
+#代理, 所有的访问都转给registry里面的单例
+class lazy:
+    def __init__(self,name):
+        object.__setattr__(self,'_lazy_name',name)
+
+    def __getattr__(self,attr):
+        return getattr(get(self._lazy_name),attr)
+
+    def __setattr__(self,attr,value):
+        setattr(get(self._lazy_name),attr,value)
+
+    def __getitem__(self,key):
+        return get(self._lazy_name)[key]
+
+    def __contains__(self,item):
+        return item in get(self._lazy_name)
+
+    def __iter__(self):
+        return iter(get(self._lazy_name))
+
+    def __len__(self):
+        return len(get(self._lazy_name))
+
+    def __call__(self,*args,**kwargs):
+        return get(self._lazy_name)(*args,**kwargs)
+
+    def __repr__(self):
+        return "lazy(%s)"%(self._lazy_name)
+
+#配置文件也是第一次用的时候才读, 同一个文件只读一次
+def lazy_config(fn):
+    name = "config:%s"%(fn)
+    if name not in factories:
+        def load():
+            from .read_conf import config
+            return config(fn)
+        register(name,load)
+    return lazy(name)
+
+
+#==================下面是默认注册的单例==================
+#都在函数里面import, 这样import registry本身不花时间
+
+KB_CONF = "../../conf/cn_data.conf"
+
+def make_nlp():
+    import os
+    from .util import NLP
+    from .english import load_lemma_table
+
+    #配置了lemma_table(script/build_lemma_table.py建的)就先载入, 常见词的归一化直接查表
+    conf = lazy_config(KB_CONF)
+    if "lemma_table" in conf and os.path.exists(conf["lemma_table"]):
+        load_lemma_table(conf["lemma_table"])
+
+    return NLP()
+
+def make_stopwords():
+    with open(lazy_config(KB_CONF)["stop_pos"]) as stop_file:
+        return [word.strip() for word in stop_file.readlines()]
+
+def make_entity_indx():
+    from .knowledge_base import load_entity_indx
+    return load_entity_indx()
+
+def make_kb_backend():
+    from .knowledge_base import default_backend
+    return default_backend()
+
+#多词概念的自动机, 配置了concept_trie(script/build_concept_trie.py建的)就直接载入, 否则现建
+def make_concept_trie():
+    import os
+    from .query_expansion.concept_trie import concept_trie,build_concept_trie
+
+    conf = lazy_config(KB_CONF)
+    if "concept_trie" in conf and os.path.exists(conf["concept_trie"]):
+        return concept_trie.load(conf["concept_trie"])
+
+    return build_concept_trie(get("entity_indx"))
+
+def make_cp_tool():
+    from .knowledge_base import concept_tool
+    return concept_tool()
+
+def make_searcher():
+    from .knowledge_base.entity_lookup import InsunnetEntityLookup
+    return InsunnetEntityLookup()
+
+register("nlp",make_nlp)
+register("stopwords",make_stopwords)
+register("entity_indx",make_entity_indx)
+register("kb_backend",make_kb_backend)
+register("concept_trie",make_concept_trie)
+register("cp_tool",make_cp_tool)
+register("searcher",make_searcher)
@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+#coding=utf-8
+
+'''
+批量调用ROUGE-1.5.5
+以前每个问题写一个xml, os.system跑一次perl, 每次都要启动perl再做1000次resampling
+现在一次实验所有的 peer/model 写到一个配置里面, 跑一次ROUGE(或者分成几份并行跑)
+加-d输出每个EVAL ID的分数, 解析回来
+
+    evals = [rouge_eval(eval_id,peer_root,[(pid,peer)],model_root,[(mid,model)...]) ...]
+    scores = batch_rouge(rouge_path,data_path,work_dir).run(evals,shards=4)
+    scores[eval_id][peer_id]["ROUGE-1"]["F"]
+'''
+
+import os
+import re
+import subprocess
+
+from .evaluation import rouge_score
+
+#和以前的实验一样的参数, -x 表示不算ROUGE-L
+ROUGE_OPTIONS = '-n 4 -w 1.2 -m -2 4 -u -c 95 -r 1000 -f A -p 0.5 -t 0 -a -x'
+
+#-d 输出的每个EVAL的分数
+#01 ROUGE-1 Eval D0701.M.250.A.A R:0.41234 P:0.39876 F:0.40543
+EVAL_RE = re.compile(r"^(\S+) (ROUGE-\S+) Eval (\S+) R:([\d.]+) P:([\d.]+) F:([\d.]+)")
+
+#配置里面的一个EVAL, 一个eval_id, 若干个peer和model
+#peers和models都是 [(id,文件名)...], 文件名是相对peer_root/model_root的
+class rouge_eval:
+    def __init__(self,eval_id,peer_root,peers,model_root,models):
+        self.eval_id = eval_id
+        self.peer_root = peer_root
+        self.peers = peers
+        self.model_root = model_root
+        self.models = models
+
+    def to_xml(self):
+        lines = ['<EVAL ID="%s">'%(self.eval_id),
+                 '<PEER-ROOT>',self.peer_root,'</PEER-ROOT>',
+                 '<MODEL-ROOT>',self.model_root,'</MODEL-ROOT>',
+                 '<INPUT-FORMAT TYPE="SPL">','</INPUT-FORMAT>',
+                 '<PEERS>']
+        lines.extend(['<P ID="%s">%s</P>'%(pid,peer) for pid,peer in self.peers])
+        lines.append('</PEERS>')
+        lines.append('<MODELS>')
+        lines.extend(['<M ID="%s">%s</M>'%(mid,model) for mid,model in self.models])
+        lines.append('</MODELS>')
+        lines.append('</EVAL>')
+        return '\n'.join(lines) + '\n'
+
+#一个DUC的peer对应的所有EVAL, 轮流拿一个assessor的摘要做eval_id, 其余的做model
+#topic_ass_dict是 peer文件名 => 这个topic所有的model文件名
+def duc_evals(peer_path,model_root,topic_ass_dict):
+    peer_root,peer = os.path.split(peer_path)
+    evals = []
+    for evalid in topic_ass_dict[peer]:
+        models = [(s_model[-1],s_model) for s_model in topic_ass_dict[peer] if s_model != evalid]
+        evals.append(rouge_eval(evalid,peer_root,[(peer[3:5],peer)],model_root,models))
+
+    return evals
+
+def write_config(evals,xml_path):
+    with open(xml_path,'w') as xml_file:
+        xml_file.write('<ROUGE_EVAL version="1.5.5">\n')
+        for one in evals:
+            xml_file.write(one.to_xml())
+        xml_file.write('</ROUGE_EVAL>\n')
+
+#解析-d的输出, 返回 {eval_id:{peer_id:{"ROUGE-1":{"R":..,"P":..,"F":..}}}}
+def parse_output(text,scores=None):
+    if scores is None:
+        scores = {}
+
+    for line in text.splitlines():
+        match = EVAL_RE.match(line.strip())
+        if match is None:
+            continue
+        peer_id,metric,eval_id,r,p,f = match.groups()
+        peer_scores = scores.setdefault(eval_id,{}).setdefault(peer_id,{})
+        peer_scores[metric] = {"R":float(r),"P":float(p),"F":float(f)}
+
+    return scores
+
+#所有EVAL的平均, 返回 {"ROUGE-1":{"R":..,"P":..,"F":..}}
+#和ROUGE自己输出的Average一样是EVAL之间的平均, 分片跑的时候也对
+#eval_ids不为None的时候只平均这些EVAL
+def average(scores,eval_ids=None):
+    total,count = {},{}
+    for eval_id,peers in scores.items():
+        if eval_ids is not None and eval_id not in eval_ids:
+            continue
+        for peer_scores in peers.values():
+            for metric,value in peer_scores.items():
+                metric_total = total.setdefault(metric,{"R":0.0,"P":0.0,"F":0.0})
+                for key in metric_total:
+                    metric_total[key] += value[key]
+                count[metric] = count.get(metric,0) + 1
+
+    return {metric:{key:value/count[metric] for key,value in metric_total.items()} for metric,metric_total in total.items()}
+
+#按ROUGE的Average的格式写分数文件, script/cal_rouge.py能读
+def write_scores(avg,score_path,peer_id="01"):
+    with open(score_path,'w') as score_file:
+        for metric in sorted(avg):
+            score_file.write(50*"-"+"\n")
+            for key in ("R","P","F"):
+                score_file.write("%s %s Average_%s: %.5f\n"%(peer_id,metric,key,avg[metric][key]))
+
+def print_average(avg):
+    for metric in sorted(avg):
+        print("%s R:%.5f P:%.5f F:%.5f"%(metric,avg[metric]["R"],avg[metric]["P"],avg[metric]["F"]))
+
+class batch_rouge:
+    #work_dir放配置文件, 每个分片一个
+    def __init__(self,rouge_path,data_path,work_dir,options=ROUGE_OPTIONS):
+        self.rouge_path = rouge_path
+        self.data_path = data_path
+        self.work_dir = work_dir
+        self.options = options.split()
+
+    def command(self,xml_path):
+        return [self.rouge_path,'-e',self.data_path] + self.options + ['-d',xml_path]
+
+    #shards是并行跑的ROUGE进程数, EVAL平均分到每一份
+    #name是配置文件名的前缀, 同时跑几个实验的时候分开
+    def run(self,evals,shards=1,name="rouge"):
+        if len(evals) == 0:
+            return {}
+
+        shards = max(1,min(shards,len(evals)))
+        size = (len(evals) + shards - 1) // shards
+
+        os.makedirs(self.work_dir,exist_ok=True)
+
+        procs = []
+        for indx in range(shards):
+            part = evals[indx*size:(indx+1)*size]
+            if len(part) == 0:
+                continue
+            xml_path = os.path.join(self.work_dir,"%s.%s.xml"%(name,indx))
+            write_config(part,xml_path)
+            procs.append(subprocess.Popen(self.command(xml_path),stdout=subprocess.PIPE,universal_newlines=True))
+
+        scores = {}
+        for proc in procs:
+            output,_ = proc.communicate()
+            if proc.returncode != 0:
+                raise RuntimeError("ROUGE失败 %s"%(" ".join(proc.args)))
+            parse_output(output,scores)
+
+        return scores
+
+#进程内算ROUGE(见evaluation.rouge_score), 和batch_rouge一样的接口, 不用启动perl
+#只有ROUGE-1/2/SU4, 没有置信区间, 要的话用evaluation.rouge_confidence
+class native_rouge:
+    def __init__(self,n=2,skip=4,stem=True):
+        self.n = n
+        self.skip = skip
+        self.stem = stem
+
+        #model文件一个topic要用好几次, 读一次就行
+        self.texts = {}
+
+    def read(self,path):
+        if path not in self.texts:
+            with open(path) as text_file:
+                self.texts[path] = text_file.read()
+        return self.texts[path]
+
+    def run(self,evals,shards=1,name=None):
+        scores = {}
+        for one in evals:
+            models = [self.read(os.path.join(one.model_root,model)) for mid,model in one.models]
+            for pid,peer in one.peers:
+                peer_text = self.read(os.path.join(one.peer_root,peer))
+                result = rouge_score(peer_text,models,self.n,self.skip,stem=self.stem)
+                scores.setdefault(one.eval_id,{})[pid] = result
+
+        return scores
+
+#用question.conf里面的ROUGE_PATH和rouge_data_path, 配置文件放在xml_path的目录下
+#native=True的时候不调perl, 在进程内算
+def rouge_from_conf(conf,native=False):
+    if native:
+        return native_rouge()
+
+    return batch_rouge(conf['ROUGE_PATH'],conf['rouge_data_path'],os.path.dirname(conf['xml_path']))
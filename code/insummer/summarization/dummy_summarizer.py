@@ -5,13 +5,12 @@
 
 from .summarizer import abstract_summarizer,ya_summarizer
 from ..query_expansion.entity_expansioner import RankRelateFilterExpansioner as RFE
-from ..query_expansion.entity_finder import NgramEntityFinder as ngram
-from ..read_conf import config
-from ..util import NLP
+from ..query_expansion.entity_finder import SinglePassNgramEntityFinder as ngram
+from ..registry import lazy,lazy_config
 
-conf = config('/home/lavi/project/insummer/conf/question.conf')
+conf = lazy_config('/home/lavi/project/insummer/conf/question.conf')
 
-nlp = NLP()
+nlp = lazy("nlp")
 
 def sent_len(sent):
     words = nlp.word_tokenize(sent)
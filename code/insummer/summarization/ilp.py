@@ -5,19 +5,22 @@
 
 from .summarizer import abstract_summarizer
 from ..query_expansion.entity_expansioner import RankRelateFilterExpansioner as RFE
-from ..query_expansion.entity_finder import NgramEntityFinder as ngram
-from ..query_expansion.entity_finder import MoreNgramEntityFinder as mngram
-from ..read_conf import config
-from ..util import NLP
+#标题和答案都用一遍完成的实体抽取, 两边的词形还原一样才能对上
+from ..query_expansion.entity_finder import SinglePassNgramEntityFinder as ngram
+from ..query_expansion.entity_finder import SinglePassMoreNgramEntityFinder as mngram
+from ..registry import lazy,lazy_config
 
 from pulp import *
 import sys
 
-nlp = NLP()
+import numpy as np
+from scipy import sparse
+
+nlp = lazy("nlp")
 
 import math
 
-conf = config('/home/lavi/project/insummer/conf/question.conf')
+conf = lazy_config('/home/lavi/project/insummer/conf/question.conf')
 
 #abstract_ilp
 #ep         , 实体扩展类
@@ -32,11 +35,12 @@ conf = config('/home/lavi/project/insummer/conf/question.conf')
 #candidate_sentence_entities_dict      , 候选答案句子和实体组成的dict[(e1:w1),(e2:w2)....]
 #sent_index                            , 候选答案句子的索引
 #sent_inverse_index                    , 候选答案句子的逆索引
-#sent_length                           , 候选答案句子的长度
 #entity_index                          , 候选实体的索引
 #entity_inverse_index                  , 候选实体的逆索引
 
-#OCC                                   , 构建出现矩阵OCC[i][j] 为实体I在句子J中出现了没
+#OCC                                   , 构建出现矩阵OCC[i,j] 为实体I在句子J中出现了没, 稀疏的csr
+#entity_weight/sent_weight             , 实体和句子变量的权重, 下标就是标号
+#sent_length                           , 候选答案句子的长度, 下标就是标号
 class abstract_ilp(abstract_summarizer):
     def __init__(self,q,word_limit,entity_finder,alpha,beta,unseen_limit,min_el,min_sl,max_sl):
         abstract_summarizer.__init__(self,q,word_limit)
@@ -67,6 +71,9 @@ class abstract_ilp(abstract_summarizer):
     def init_step(self,alpha,beta,unseen_limit):
         ##先进行实体扩展，得到的实体是具有权重的list，[(e1,w1),(e2,w2)]
         expand_entities = self.ep.run()
+
+        #扩展的时候已经分好句, 抽好实体了, 句子长度也从这里取
+        self.analysis = self.ep.get_analysis()
         ##需要转化成字典形式，方便计算
         dict_expand_entities = dict(expand_entities)
 
@@ -141,14 +148,13 @@ class abstract_ilp(abstract_summarizer):
                     
     #整数规划的输入阶段
     #在这个阶段准备整数规划所需要的数据
-    #主要包括: 1得到候选句子集合（过滤掉无关的句子）；2得到扩展实体的子集；3对实体和候选句子进行标号；4.构建句子和实体的OCC矩阵；
+    #主要包括: 1得到候选句子集合（过滤掉无关的句子）；2得到扩展实体的子集；3对实体和候选句子进行标号；4.构建句子和实体的OCC矩阵；5.算好变量的权重和句子长度
     def ilp_prepare(self,min_el,min_sl,max_sl):
 
         self.candidate_sentence_entities_dict = {}
         #给标号初始化
         self.sent_index           = {}
         self.sent_inverse_index   = {}
-        self.sent_length          = {}
         self.entity_index         = {}
         self.entity_inverse_index = {}
 
@@ -177,7 +183,7 @@ class abstract_ilp(abstract_summarizer):
 
             #如果没有交集，那么直接扔了
             el = intersec_num
-            sl = nlp.sentence_length(manswer_sent) 
+            sl = self.analysis.get_length(manswer_sent)
             if el <= min_el or sl < min_sl or sl>max_sl :
                 pass
             else:
@@ -205,9 +211,8 @@ class abstract_ilp(abstract_summarizer):
 
             
         #====> step4：构建OCC矩阵
-        self.OCC = [[0 for j in range(len(self.sent_index))]  for i in range(len(self.entity_index))]
-
-        #对于每个 candidate_sentence_entities_dict 中的句子和实体， 下面填充OCC矩阵的工作
+        #OCC是稀疏的(csr), 每一行是一个实体出现过的句子, 只存出现了的(实体,句子)对
+        row,col = [],[]
         for manswer_sent in self.candidate_sentence_entities_dict:
             #找到其实体集
             mentities_set = self.candidate_sentence_entities_dict[manswer_sent]
@@ -215,125 +220,73 @@ class abstract_ilp(abstract_summarizer):
             #得到句子的索引
             msent_index = self.sent_index[manswer_sent]
 
-            #对于每个实体来说
+            #对于每个实体来说, 现在实体  (i=menetity_index )  ,  (j=msent_index)
             for mentity in mentities_set:
-                #找到这个实体的索引
-                mentity_index = self.entity_index[mentity]
+                row.append(self.entity_index[mentity])
+                col.append(msent_index)
+
+        shape = (len(self.entity_index),len(self.sent_index))
+        self.OCC = sparse.csr_matrix((np.ones(len(row)),(row,col)),shape=shape)
+
+        #====> step5：提前算好变量的权重和句子长度, 下标就是变量的标号
+        #实体的权重
+        self.entity_weight = np.array([self.hit_entities[self.entity_inverse_index[i]] for i in range(shape[0])])
+
+        #句子的权重: 2*句子的实体数 + 实体权重和/2
+        el = np.asarray(self.OCC.sum(axis=0)).ravel()
+        ew = self.OCC.T.dot(self.entity_weight)
+        self.sent_weight = (el + el) + ew/2
 
-                #现在实体  (i=menetity_index )  ,  (j=msent_index)
-                self.OCC[mentity_index][msent_index] = 1
+        #句子长度
+        self.sent_length = np.array([self.analysis.get_length(self.sent_inverse_index[j]) for j in range(shape[1])])
 
     def ilp(self):
         #====> 定义问题
         prob = LpProblem("ILP for summarization problem",LpMaximize)
 
-        #变量的字典
-        x_var = []
-        y_var = []
+        entity_num,sent_num = self.OCC.shape
 
-        for indx in self.entity_inverse_index:
-            x_var.append("x%s"%(indx))
-
-        for indx in self.sent_inverse_index:
-            y_var.append("y%s"%(indx))
-
-        #====> 建立variable,类别全部设为binary
-        x_lpvariable = LpVariable.dicts("entity",x_var,cat=LpInteger,lowBound=0,upBound=10)
-        y_lpvariable = LpVariable.dicts("sent",  y_var,cat=LpInteger,lowBound=0,upBound=1)
+        #====> 建立variable, 直接用标号做变量的下标
+        x_lpvariable = LpVariable.dicts("entity",range(entity_num),cat=LpInteger,lowBound=0,upBound=10)
+        y_lpvariable = LpVariable.dicts("sent",range(sent_num),cat=LpInteger,lowBound=0,upBound=1)
 
         #====>取得问题的实体
         title_entity = self.ep.title_entity()
 
-        
-        #获取ILP变量的权重
-        def variable_weight(var):
-            #首字母和尾字母
-            first,last = var[0],var[1:]
-            if first == "y":
-                #得到句子名字
-                variable_name = self.sent_inverse_index[int(last)]
-
-                sent_entity = self.candidate_sentence_entities_dict[variable_name]
-
-                ew = 0
-                #得到句子实体数目
-                el = len(sent_entity)
-
-                for entity in self.candidate_sentence_entities_dict[variable_name]:
-                    mentity_weight = self.hit_entities[entity]
-                    ew += mentity_weight
-                    
-                return ((el + el) + ew/2 )
-                
-            elif first == "x":
-                #得到变量实体的名字
-                variable_name = self.entity_inverse_index[int(last)]
-                
-                #得到相应的权重
-                w = self.hit_entities[variable_name]
-                
-                return w
-
-            else :
-                print("获取权重信息有误")
-                sys.exit(1)
-                
-
-        obj1 = [x_lpvariable[i] * variable_weight(i) for i in x_var ]
-        obj2 = [y_lpvariable[i] * variable_weight(i) for i in y_var ]
-        obj1.extend(obj2)
-        tobj = obj1
-        prob += lpSum( tobj )
-
-        #定义一个求句子长度的函数
-        def variable_length(var):
-            first,last = var[0],var[1:]
-            if first == "y":
-                #得到句子
-                msent = self.sent_inverse_index[int(last)]
-                #得到句子长度
-                ml = nlp.sentence_length(msent)
-                return ml
-            else:
-                print("变量有问题")
-                sys.exit(1)
+        #目标函数, 权重在ilp_prepare里算好了
+        tobj = [(x_lpvariable[i],self.entity_weight[i]) for i in range(entity_num)]
+        tobj.extend([(y_lpvariable[j],self.sent_weight[j]) for j in range(sent_num)])
+        prob += LpAffineExpression(tobj)
 
         #满足长度限制
-        prob += lpSum([y_lpvariable[i] * variable_length(i) for i in y_var]) <= self.word_limit
-        prob += lpSum([y_lpvariable[i] * variable_length(i) for i in y_var]) >= (self.word_limit-100)
+        length = LpAffineExpression([(y_lpvariable[j],self.sent_length[j]) for j in range(sent_num)])
+        prob += length <= self.word_limit
+        prob += length >= (self.word_limit-100)
 
 
         #满足出现次数限制
-        #对每个实体而言
-        for i in range(len(self.entity_index)):
-            nobj = []
-            
-            #对每个句子都有
-            for j in range(len(self.sent_index)):
-                nobj.append(self.OCC[i][j] * y_lpvariable["y%s"%(j)])
+        #对每个实体而言, 只有它出现过的句子: sum(y_j) - x_i == 0
+        indptr,indices = self.OCC.indptr,self.OCC.indices
+        for i in range(entity_num):
+            nobj = [(y_lpvariable[j],1) for j in indices[indptr[i]:indptr[i+1]]]
+            nobj.append((x_lpvariable[i],-1))
 
-            nobj.append(-1 * x_lpvariable["x%s"%(i)])
-                
-            prob += lpSum( nobj ) == 0
+            prob += LpAffineExpression(nobj) == 0
 
 
 
         prob.solve()
         
+        #按句子的标号顺序, 也就是句子在答案里的顺序
         sent_list = []
-        for v in prob.variables():
-            sp = v.name.split('_')
-            if sp[0] == "sent" and v.varValue > 0 :
-                indx = int(sp[1][1:])
-                msent = self.sent_inverse_index[indx]
-                sent_list.append(msent)
-            else:
-                pass
+        for j in range(sent_num):
+            if y_lpvariable[j].varValue > 0:
+                sent_list.append(self.sent_inverse_index[j])
 
 
         sent_length = 0
         for msent in sent_list:
-            sent_length += nlp.sentence_length(msent)
+            sent_length += self.analysis.get_length(msent)
 
         print("摘要长度===>",sent_length)
             
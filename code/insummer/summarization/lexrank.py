@@ -6,29 +6,33 @@ LexRank类
 '''
 
 from .summarizer import abstract_summarizer,ya_summarizer
-from .tfidf import TFIDF
+from .tfidf import TFIDF,lexrank_similarity
 from ..common_type import Question,Answer
-from ..read_conf import config
-from ..util import NLP
+from ..registry import lazy,lazy_config
 from ..query_expansion.entity_finder import NgramEntityFinder
 from math import log
 from numpy import dot
 from numpy.linalg import norm
-import networkx as nx
+from ..graph_rank import pagerank_matrix,rank_order
 
-data_conf = config('/home/lavi/project/insummer/conf/question.conf')
+data_conf = lazy_config('/home/lavi/project/insummer/conf/question.conf')
 
-nlp = NLP()
+nlp = lazy("nlp")
 
 class LexRank(abstract_summarizer):
     '''
     tfidf matrix => graph => pagerank => lexrank scores
     '''
 
-    def __init__(self,q,words):
+    #idf是语料级别的idf_table(见tfidf.py), None的话每个问题自己算
+    #threshold是None的时候是continuous LexRank, 边权就是余弦相似度
+    #否则是相似度大于threshold的句子之间连边, 边权都是1
+    def __init__(self,q,words,idf=None,threshold=None):
         #abstract_summarizer.__init__(self)
         self.__question = q
         self.words_limit = words
+        self.idf = idf
+        self.threshold = threshold
         print(q.get_author())
 
     #两个抽象方法，extract(self) evaluation(self,result)
@@ -40,39 +44,34 @@ class LexRank(abstract_summarizer):
         answer_text = self.__question.get_nbest_content()
 
         print('句子重要性排名，开始分句..')
-        self.nlp = NLP()
+        self.nlp = nlp
 
-        sent_tokens = self.nlp.sent_tokenize(answer_text)
+        #分句分词的结果整个问题共用, 每个句子只分词一次
+        self.analysis = self.__question.get_analysis(joined=True)
+        sent_tokens = self.analysis.get_sentence_texts()
 
         print('获得句子列表，开始计算tfidf..')
 
         self.N = len(sent_tokens)
-        self.tfidf = TFIDF(sent_tokens).matrix
+        tfidf = TFIDF(self.analysis.get_sentences(),self.idf)
+        self.tfidf = tfidf.sparse
 
         print('获得tfidf矩阵，开始构建图结构..')
 
-        #这里用index来表示句子，方便找到tfidf值
-        nodes = [idx for idx in range(self.N)]
-
-        self.lex_graph = nx.Graph()
-        self.lex_graph.add_nodes_from(nodes)
-
-        #可以itertools创建组合数，或者直接循环加边
-        #nodepairs = list(itertools.combinations(nodes,2))
-        for i in range(self.N):
-            for j in range(self.N):
-                sim = self.get_cos(self.tfidf[i],self.tfidf[j])
-                self.lex_graph.add_edge(i,j,weight=sim)
+        #相似度矩阵就是图的邻接矩阵, 句子i就是第i个点
+        self.lex_matrix = lexrank_similarity(tfidf,self.threshold)
 
         print('图构建完成，开始计算lexrankscore..')
 
-        cal_lexrank = nx.pagerank(self.lex_graph)
+        cal_lexrank = pagerank_matrix(self.lex_matrix)
 
         print('计算完成，开始摘要..')
 
-        orders = sorted(cal_lexrank,key=cal_lexrank.get,reverse=True)
+        orders = rank_order(cal_lexrank)
 
         k_th = self.get_sum_sents(sent_tokens,orders)
+        #摘要的句子数, 实验脚本要用
+        self.sum_sents = k_th
 
         str_tmp_list = []
         for sidx in range(k_th):
@@ -116,7 +115,7 @@ class LexRank(abstract_summarizer):
         idx = 0
         
         while(total_num <= self.words_limit and idx < len(sents)):
-            total_num += len(self.nlp.word_tokenize(sents[orders[idx]]))
+            total_num += len(self.analysis.get_tokens(sents[orders[idx]]))
             if (total_num > self.words_limit):
                 break
             idx += 1
@@ -135,10 +134,12 @@ class SPLexRank(ya_summarizer):
     tfidf matrix => graph => pagerank => lexrank scores
     '''
 
-    def __init__(self,q,words):
+    def __init__(self,q,words,idf=None,threshold=None):
         #abstract_summarizer.__init__(self)
         self.question = q
         self.words_limit = words
+        self.idf = idf
+        self.threshold = threshold
         print(q.get_author())
 
         nbest_total_words = 0
@@ -162,37 +163,30 @@ class SPLexRank(ya_summarizer):
         answer_text = self.question.get_nbest_content()
 
         print('句子重要性排名，开始分句..')
-        self.nlp = NLP()
+        self.nlp = nlp
 
-        sent_tokens = self.nlp.sent_tokenize(answer_text)
+        #分句分词的结果整个问题共用, 每个句子只分词一次
+        self.analysis = self.question.get_analysis(joined=True)
+        sent_tokens = self.analysis.get_sentence_texts()
 
         print('获得句子列表，开始计算tfidf..')
 
         self.N = len(sent_tokens)
-        self.tfidf = TFIDF(sent_tokens).matrix
+        tfidf = TFIDF(self.analysis.get_sentences(),self.idf)
+        self.tfidf = tfidf.sparse
 
         print('获得tfidf矩阵，开始构建图结构..')
 
-        #这里用index来表示句子，方便找到tfidf值
-        nodes = [idx for idx in range(self.N)]
-
-        self.lex_graph = nx.Graph()
-        self.lex_graph.add_nodes_from(nodes)
-
-        #可以itertools创建组合数，或者直接循环加边
-        #nodepairs = list(itertools.combinations(nodes,2))
-        for i in range(self.N):
-            for j in range(self.N):
-                sim = self.get_cos(self.tfidf[i],self.tfidf[j])
-                self.lex_graph.add_edge(i,j,weight=sim)
+        #相似度矩阵就是图的邻接矩阵, 句子i就是第i个点
+        self.lex_matrix = lexrank_similarity(tfidf,self.threshold)
 
         print('图构建完成，开始计算lexrankscore..')
 
-        cal_lexrank = nx.pagerank(self.lex_graph)
+        cal_lexrank = pagerank_matrix(self.lex_matrix)
 
         print('计算完成，开始摘要..')
 
-        orders = sorted(cal_lexrank,key=cal_lexrank.get,reverse=True)
+        orders = rank_order(cal_lexrank)
 
         k_th = self.get_sum_sents(sent_tokens,orders)
 
@@ -236,7 +230,7 @@ class SPLexRank(ya_summarizer):
         idx = 0
         
         while(total_num <= self.words_limit and idx < len(sents)):
-            total_num += len(self.nlp.word_tokenize(sents[orders[idx]]))
+            total_num += len(self.analysis.get_tokens(sents[orders[idx]]))
             if (total_num > self.words_limit):
                 break
             idx += 1
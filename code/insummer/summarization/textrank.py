@@ -7,16 +7,16 @@ TextRank类
 
 from .summarizer import ya_summarizer,duc_summarizer
 from ..common_type import Question,Answer
-from ..read_conf import config
-from ..util import NLP
+from ..registry import lazy,lazy_config
 from ..query_expansion.entity_finder import NgramEntityFinder
+from .textrank_graph import overlap_matrix
+from ..graph_rank import pagerank_matrix
 from math import log
-import itertools
-import networkx as nx
+from collections import OrderedDict
 
-nlp = NLP()
+nlp = lazy("nlp")
 
-data_conf = config('/home/lavi/project/insummer/conf/question.conf')
+data_conf = lazy_config('/home/lavi/project/insummer/conf/question.conf')
 
 class TextRank(duc_summarizer):
     '''
@@ -41,10 +41,12 @@ class TextRank(duc_summarizer):
         title_text = self.__question.get_title()
         answer_text = self.__question.get_nbest_content()
 
-        self.nlp = NLP()
+        self.nlp = nlp
         
         #分句，在textrank中，这也是图结构的nodes
-        sent_tokens = self.nlp.sent_tokenize(answer_text)
+        #分句分词的结果整个问题共用, 算相似度的时候每个句子不用再分词
+        self.analysis = self.__question.get_analysis(joined=True)
+        sent_tokens = self.analysis.get_sentence_texts()
 
         #根据文本条件筛选句子，可扩展
         #sent_tokens = filter_sent(sent_tokens,2)
@@ -55,8 +57,9 @@ class TextRank(duc_summarizer):
         #开始textrank
         print('开始计算textrank scores')
 
-        #pagerank:1-pagerank(..) 2-pagerank_numpy(..) 3-pagerank_scipy(..)
-        cal_pagerank = nx.pagerank(self.__text_graph)
+        #在共现矩阵上直接算pagerank, 见graph_rank.py
+        scores = pagerank_matrix(self.__text_matrix)
+        cal_pagerank = dict(zip(self.__text_nodes,scores.tolist()))
 
         print('开始摘要..')
 
@@ -107,21 +110,14 @@ class TextRank(duc_summarizer):
         '''创建图结构'''
         print('开始创建图结构')
 
-        self.__text_graph = nx.Graph()
-        self.__text_graph.add_nodes_from(nodes)
+        #一样的句子在图里是一个点
+        nodes = list(OrderedDict.fromkeys(nodes))
 
-        #这里没有对边进行筛选，假设了任意两边有相似性
-        nodepairs = list(itertools.combinations(nodes,2))
-
-        for pair in nodepairs:
-
-            first_sent = pair[0]
-            second_sent = pair[1]
-
-            #权重，这里选择共现词，可以更改
-            weights = self.sent_sim(first_sent,second_sent)
-
-            self.__text_graph.add_edge(first_sent,second_sent,weight=weights)
+        #图就是邻接矩阵, 第i个点是nodes[i]
+        #权重是共现词数, 用倒排索引只算有共现词的句子对, 见textrank_graph.py
+        self.__text_nodes = nodes
+        token_lists = [self.analysis.get_tokens(sent) for sent in nodes]
+        self.__text_matrix = overlap_matrix(token_lists)
 
         print('建图完成..')
 
@@ -144,14 +140,22 @@ class TextRank(duc_summarizer):
     def sent_sim(self,sent_1,sent_2):
         '''计算两个句子之间的相似度'''
 
-        sent_1_tokens = self.nlp.word_tokenize(sent_1)
-        sent_2_tokens = self.nlp.word_tokenize(sent_2)
+        asent_1 = self.analysis.sentence(sent_1)
+        asent_2 = self.analysis.sentence(sent_2)
+        sent_1_tokens = asent_1.get_tokens()
+        sent_2_tokens = asent_2.get_tokens()
         
         #交集即为共现的词语
-        sim_set = set(sent_1_tokens) & set(sent_2_tokens)
+        sim_set = asent_1.get_token_set() & asent_2.get_token_set()
         
         num_up = len(sim_set)
+        if num_up == 0:
+            return 0.
+
+        #两个句子都只有一个词的时候分母是0
         num_down = log(len(sent_1_tokens)) + log(len(sent_2_tokens))
+        if num_down == 0:
+            return 0.
 
         return num_up * 1. / num_down
 
@@ -162,7 +166,7 @@ class TextRank(duc_summarizer):
         idx = 0
 
         while(total_num <= self.words_limit and idx < len(sents)):
-            total_num += len(self.nlp.word_tokenize(sents[idx]))
+            total_num += len(self.analysis.get_tokens(sents[idx]))
             if (total_num > self.words_limit):
                 break
             idx += 1
@@ -205,10 +209,12 @@ class SPTextRank(ya_summarizer):
         title_text = self.question.get_title()
         answer_text = self.question.get_nbest_content()
 
-        self.nlp = NLP()
+        self.nlp = nlp
         
         #分句，在textrank中，这也是图结构的nodes
-        sent_tokens = self.nlp.sent_tokenize(answer_text)
+        #分句分词的结果整个问题共用, 算相似度的时候每个句子不用再分词
+        self.analysis = self.question.get_analysis(joined=True)
+        sent_tokens = self.analysis.get_sentence_texts()
 
         #根据文本条件筛选句子，可扩展
         #sent_tokens = filter_sent(sent_tokens,2)
@@ -219,8 +225,9 @@ class SPTextRank(ya_summarizer):
         #开始textrank
         print('开始计算textrank scores')
 
-        #pagerank:1-pagerank(..) 2-pagerank_numpy(..) 3-pagerank_scipy(..)
-        cal_pagerank = nx.pagerank(self.__text_graph)
+        #在共现矩阵上直接算pagerank, 见graph_rank.py
+        scores = pagerank_matrix(self.__text_matrix)
+        cal_pagerank = dict(zip(self.__text_nodes,scores.tolist()))
 
         print('开始摘要..')
 
@@ -267,21 +274,14 @@ class SPTextRank(ya_summarizer):
         '''创建图结构'''
         print('开始创建图结构')
 
-        self.__text_graph = nx.Graph()
-        self.__text_graph.add_nodes_from(nodes)
+        #一样的句子在图里是一个点
+        nodes = list(OrderedDict.fromkeys(nodes))
 
-        #这里没有对边进行筛选，假设了任意两边有相似性
-        nodepairs = list(itertools.combinations(nodes,2))
-
-        for pair in nodepairs:
-
-            first_sent = pair[0]
-            second_sent = pair[1]
-
-            #权重，这里选择共现词，可以更改
-            weights = self.sent_sim(first_sent,second_sent)
-
-            self.__text_graph.add_edge(first_sent,second_sent,weight=weights)
+        #图就是邻接矩阵, 第i个点是nodes[i]
+        #权重是共现词数, 用倒排索引只算有共现词的句子对, 见textrank_graph.py
+        self.__text_nodes = nodes
+        token_lists = [self.analysis.get_tokens(sent) for sent in nodes]
+        self.__text_matrix = overlap_matrix(token_lists)
 
         print('建图完成..')
 
@@ -304,14 +304,22 @@ class SPTextRank(ya_summarizer):
     def sent_sim(self,sent_1,sent_2):
         '''计算两个句子之间的相似度'''
 
-        sent_1_tokens = self.nlp.word_tokenize(sent_1)
-        sent_2_tokens = self.nlp.word_tokenize(sent_2)
+        asent_1 = self.analysis.sentence(sent_1)
+        asent_2 = self.analysis.sentence(sent_2)
+        sent_1_tokens = asent_1.get_tokens()
+        sent_2_tokens = asent_2.get_tokens()
         
         #交集即为共现的词语
-        sim_set = set(sent_1_tokens) & set(sent_2_tokens)
+        sim_set = asent_1.get_token_set() & asent_2.get_token_set()
         
         num_up = len(sim_set)
+        if num_up == 0:
+            return 0.
+
+        #两个句子都只有一个词的时候分母是0
         num_down = log(len(sent_1_tokens)) + log(len(sent_2_tokens))
+        if num_down == 0:
+            return 0.
 
         return num_up * 1. / num_down
 
@@ -322,7 +330,7 @@ class SPTextRank(ya_summarizer):
         idx = 0
 
         while(total_num <= self.words_limit and idx < len(sents)):
-            total_num += len(self.nlp.word_tokenize(sents[idx]))
+            total_num += len(self.analysis.get_tokens(sents[idx]))
             if (total_num > self.words_limit):
                 break
             idx += 1
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+#coding=utf-8
+
+'''
+TextRank的句子图, 用倒排索引建
+以前是所有句子两两组合, 每一对都重新分词算共现词, N^2次
+现在每个句子只分词一次, 句子x词的0/1稀疏矩阵B就是倒排索引
+B*B^T的(i,j)就是句子i和j共现的词数, 只有真的有共现词的句子对才会算到, 没有共现词的句子之间不连边
+权重和以前一样: 共现词数 / (log(句子i的词数) + log(句子j的词数))
+权重是0的边对pagerank没有影响(nx算转移概率的时候也是0), 所以结果和以前的完全图一样
+'''
+
+import numpy as np
+from scipy import sparse
+
+#token_lists是每个句子分好的词, 返回对称的csr权重矩阵, 对角线是0
+#分母是0的句子对(两个句子都只有一个词)以前会除0, 现在不连边
+def overlap_matrix(token_lists):
+    vocab = {}
+    indptr = np.zeros(len(token_lists)+1,dtype=np.int64)
+    indices = []
+    for idx,tokens in enumerate(token_lists):
+        for word in set(tokens):
+            indices.append(vocab.setdefault(word,len(vocab)))
+        indptr[idx+1] = len(indices)
+
+    N = len(token_lists)
+    B = sparse.csr_matrix((np.ones(len(indices)),np.array(indices,dtype=np.int64),indptr),shape=(N,len(vocab)))
+
+    #只要上三角, 一对句子只算一次
+    overlap = sparse.triu(B.dot(B.T),k=1).tocoo()
+
+    #有共现词的句子至少有一个词, log不会出错
+    log_len = np.zeros(N)
+    lengths = np.array([len(tokens) for tokens in token_lists],dtype=np.float64)
+    log_len[lengths > 0] = np.log(lengths[lengths > 0])
+
+    down = log_len[overlap.row] + log_len[overlap.col]
+    keep = down > 0
+    row,col = overlap.row[keep],overlap.col[keep]
+    weight = overlap.data[keep] / down[keep]
+
+    upper = sparse.csr_matrix((weight,(row,col)),shape=(N,N))
+    return (upper + upper.T).tocsr()
+
+#上三角里面的边 [(i,j,weight)...], i<j, 用来建networkx的图
+def overlap_edges(token_lists):
+    upper = sparse.triu(overlap_matrix(token_lists),k=1).tocoo()
+    return list(zip(upper.row.tolist(),upper.col.tolist(),upper.data.tolist()))
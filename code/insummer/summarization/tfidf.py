@@ -1,20 +1,34 @@
 #!/usr/bin/python3
 #coding=utf-8
 
-from numpy import zeros,log
-from ..util import NLP
+import pickle
+
+import numpy as np
+from scipy import sparse
+
+from ..registry import lazy
+from ..common_type import AnalyzedSentence
 
 
 class TFIDF(object):
     '''
     根据分句内容，创建整个问题答案的tfidf矩阵
+    词表是dict, 词频矩阵是一遍扫描建的csr, idf是向量化算的
+    默认的idf和以前一样是 log(词表大小/这个词在所有句子里的总次数)
+    传进来idf_table的话用语料级别的idf, 多个问题共用
     '''
 
-    def __init__(self,sents):
-        '''根据句子列表初始化，词表，统计..'''
+    def __init__(self,sents,idf=None):
+        '''根据句子列表初始化，词表，统计..
+        sents可以是字符串, 也可以是AnalyzedSentence, 后者直接用分好的词'''
 
         self.sents = sents
-        self.nlp = NLP()
+        self.nlp = lazy("nlp")
+        self.idf_table = idf
+
+        #每个句子只分词一次, 建词表和统计都用这个
+        self.tokens = [self.tokenize(sent) for sent in sents]
+
         self.get_word_set()
 
         self.sent_num = len(self.sents)
@@ -24,40 +38,127 @@ class TFIDF(object):
 
 
     def get_word_set(self):
-        '''根据sents获得词表'''
+        '''根据sents获得词表, 词 => 列号'''
 
-        self.words = set()
+        self.vocab = {}
+        for tokens in self.tokens:
+            for word in tokens:
+                if word not in self.vocab:
+                    self.vocab[word] = len(self.vocab)
 
-        for sent in self.sents:
-            temp_set = set(self.nlp.word_tokenize(sent))
-            self.words = self.words | temp_set
-        
-        #之后用到它的index，所以转换成list形式
-        self.words = list(self.words)
+        self.words = list(self.vocab)
 
         print('获得词表...')
 
 
     def make_matrix(self):
-        '''构建邻接矩阵'''
+        '''构建tfidf矩阵, 行是句子, 列是词, csr'''
+
+        #一遍扫描, 每个句子的词换成列号
+        indptr = np.zeros(self.sent_num+1,dtype=np.int64)
+        indices = []
+        for idx,tokens in enumerate(self.tokens):
+            indices.extend([self.vocab[word] for word in tokens])
+            indptr[idx+1] = len(indices)
+
+        indices = np.array(indices,dtype=np.int64)
+        data = np.ones(len(indices))
+
+        #重复的(行,列)在sum_duplicates的时候加起来, 就是词频
+        self.counts = sparse.csr_matrix((data,indices,indptr),shape=(self.sent_num,self.word_num))
+        self.counts.sum_duplicates()
+
+        self.idf = self.make_idf()
+
+        #每一列乘上idf
+        self.sparse = sparse.csr_matrix(self.counts.multiply(self.idf.reshape(1,-1)))
+
+        self.__matrix = None
+        self.__normalized = None
+
+    def make_idf(self):
+        if self.idf_table is not None:
+            return self.idf_table.get_idf(self.words)
 
-        self.matrix = zeros((self.sent_num,self.word_num))
-        
-        for idx in range(self.sent_num):
-            self.matrix[idx,:] = self.make_vector(self.sents[idx])
+        count = np.asarray(self.counts.sum(axis=0)).ravel()
+        return np.log(self.word_num / count)
 
-        for col in range(self.word_num):
-            count = float(self.matrix.sum(axis=0)[col])
-            idf = log(self.word_num / count)
-            self.matrix[:,col] *= idf
+    @property
+    def matrix(self):
+        '''稠密的tfidf矩阵, 和以前一样'''
+        if self.__matrix is None:
+            self.__matrix = self.sparse.toarray()
+        return self.__matrix
 
-    
-    def make_vector(self,sent):
+    def get_normalized(self):
+        '''每一行L2归一化之后的csr, 两行的点积就是余弦相似度, 全零的行还是全零'''
+        if self.__normalized is None:
+            norm = np.sqrt(np.asarray(self.sparse.multiply(self.sparse).sum(axis=1)).ravel())
+            norm[norm == 0] = 1
+            self.__normalized = sparse.csr_matrix(sparse.diags(1 / norm).dot(self.sparse))
+        return self.__normalized
+
+
+    def tokenize(self,sent):
+        if isinstance(sent,AnalyzedSentence):
+            return sent.get_tokens()
+        return self.nlp.word_tokenize(sent)
+
+    def make_vector(self,tokens):
         '''统计单个句子信息'''
 
-        vector = zeros(self.word_num)
+        vector = np.zeros(self.word_num)
 
-        for word in self.nlp.word_tokenize(sent):
-            vector[self.words.index(word)] += 1
+        for word in tokens:
+            vector[self.vocab[word]] += 1
 
         return vector
+
+
+#句子之间的余弦相似度矩阵, 归一化之后的tfidf乘自己的转置, 稀疏的
+#threshold不是None的时候, 大于threshold的是1, 其余是0
+#LexRank的图就是这个矩阵, 放在这里是因为它只依赖tfidf
+def lexrank_similarity(tfidf,threshold=None):
+    normalized = tfidf.get_normalized()
+    sim = normalized.dot(normalized.T).tocsr()
+    if threshold is not None:
+        sim = (sim > threshold).astype(float)
+    return sim
+
+
+class idf_table(object):
+    '''
+    语料级别的idf, 多个问题共用, 每个句子算一篇文档
+    idf = log((1+文档数)/(1+包含这个词的文档数)), 没见过的词按df=0算, idf不会小于0
+    '''
+
+    def __init__(self):
+        self.df = {}
+        self.doc_num = 0
+
+    def add(self,tokens):
+        '''加一篇文档(一个句子分好的词)'''
+        self.doc_num += 1
+        for word in set(tokens):
+            self.df[word] = self.df.get(word,0) + 1
+
+    def add_many(self,token_lists):
+        for tokens in token_lists:
+            self.add(tokens)
+        return self
+
+    def get_idf(self,words):
+        '''words的idf向量'''
+        df = np.array([self.df.get(word,0) for word in words],dtype=np.float64)
+        return np.log((1 + self.doc_num) / (1 + df))
+
+    def save(self,fn):
+        with open(fn,'wb') as idf_file:
+            pickle.dump((self.doc_num,self.df),idf_file,True)
+
+    @staticmethod
+    def load(fn):
+        table = idf_table()
+        with open(fn,'rb') as idf_file:
+            table.doc_num,table.df = pickle.load(idf_file)
+        return table
@@ -7,7 +7,6 @@ be able to do their job in any Western language that uses spaces.
 """
 
 import re
-import nltk
 
 
 def tokenize(text):
@@ -19,6 +18,8 @@ def tokenize(text):
 
 
 def _tokenize_gen(text):
+    import nltk
+    ensure_punkt()
     for sent in nltk.sent_tokenize(text):
         for word in nltk.word_tokenize(sent):
             yield word
@@ -109,7 +110,16 @@ def un_camel_case(text):
     return revstr[::-1].replace('- ', '-')
 
 
-try:
-    tokenize('test')
-except LookupError:
-    nltk.download('punkt')
+#第一次分词的时候才检查punkt有没有, 没有的话下载, 不在import的时候做
+_punkt_ready = False
+
+def ensure_punkt():
+    global _punkt_ready
+    if _punkt_ready:
+        return
+    import nltk
+    try:
+        nltk.sent_tokenize('test')
+    except LookupError:
+        nltk.download('punkt')
+    _punkt_ready = True
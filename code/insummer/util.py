@@ -2,27 +2,34 @@
 这个文件主要封装了一些常用的函数
 '''
 
-import nltk
-from nltk import word_tokenize
-from textblob import TextBlob
-import textblob
-from nltk.stem import WordNetLemmatizer
-from bs4 import BeautifulSoup
-from textblob.tokenizers import SentenceTokenizer as sent_tok
-from textblob.tokenizers import WordTokenizer as word_tok
-from .read_conf import config
+#nltk, textblob, bs4 光import就要一秒多, 所以都放到用的地方再import
+#NLP本身也是通过registry第一次用的时候才建
+from .registry import lazy
 
 from .english import normalize
 
+import threading
+import time
+from collections import OrderedDict
 
-stopwords = open(config("../../conf/cn_data.conf")["stop_pos"])
-stopwords = stopwords.readlines()
-stopwords = [i.strip() for i in stopwords]
 
+#停用词第一次用的时候才读, 见registry.py
+stopwords = lazy("stopwords")
+
+
+#NLP结果缓存的大小, 同一个问题的句子在抽实体, 算长度, 建tfidf的时候会反复分词标注
+NLP_CACHE_SIZE = 200000
 
 #定义所有NLP的方法
+#整个进程共用一个, 用 registry.lazy("nlp") 拿, 不要自己NLP()
+#分句, 分词, 标注, 归一化的结果都缓存了, 返回的list是拷贝, 调用者可以随便改
 class NLP:
-    def __init__(self):
+    def __init__(self,cache_size=NLP_CACHE_SIZE):
+        import textblob
+        import textblob.en.np_extractors
+        from nltk.stem import WordNetLemmatizer
+        from textblob.tokenizers import SentenceTokenizer as sent_tok
+        from textblob.tokenizers import WordTokenizer as word_tok
 
         self.__np_extractor = textblob.en.np_extractors.ConllExtractor()
 
@@ -34,22 +41,44 @@ class NLP:
 
         self.__stopwords = set(stopwords)
 
+        self.sent_mc = mem_cache("sent_tokenize",cache_size)
+        self.word_mc = mem_cache("word_tokenize",cache_size)
+        self.tag_mc = mem_cache("blob_tags",cache_size)
+        self.norm_mc = mem_cache("norm_text",cache_size)
+
+    #带缓存的调用, 没缓存的才真的算
+    def cached(self,cache,key,func):
+        result = cache.get(key)
+        if result is None:
+            result = func(key)
+            cache.add(key,result)
+        return result
+
+    def cache_stats(self):
+        return [self.sent_mc.stats(),self.word_mc.stats(),self.tag_mc.stats(),self.norm_mc.stats()]
+
     #用blob进行标注
     def blob_tags(self,sentence):
+        return list(self.cached(self.tag_mc,sentence,self.__blob_tags))
+
+    def __blob_tags(self,sentence):
+        from textblob import TextBlob
         blob = TextBlob(sentence)
         return blob.tags
 
     #用nltk进行标注
     def nltk_tags(self,sentence):
-        tk = word_tokenize(sentence)
+        import nltk
+        tk = nltk.word_tokenize(sentence)
         return nltk.tag.pos_tag(tk)
 
     #将文本归一化,这个用的是conceptNet自带的归一化工具
     def norm_text(self,text):
-        return normalize(text)
+        return self.cached(self.norm_mc,text,normalize)
 
     #去html的tag
     def remove_tag(self,sentence):
+        from bs4 import BeautifulSoup
         sentence = BeautifulSoup(sentence).get_text()
         sentence = sentence.split()
         sentence = ' '.join(sentence)
@@ -57,17 +86,18 @@ class NLP:
 
     #分句
     def sent_tokenize(self,sents):
-        result = self.__st.tokenize(sents)
-        return result
+        return list(self.cached(self.sent_mc,sents,self.__st.tokenize))
 
     def word_tokenize(self,sent):
-        return self.__wt.tokenize(sent)
+        return list(self.cached(self.word_mc,sent,self.__wt.tokenize))
         
 
     def bigrams(self,sent_tok):
+        import nltk
         return nltk.bigrams(sent_tok)
         
     def trigrams(self,sent_tok):
+        import nltk
         return nltk.bigrams(sent_tok)
 
         
@@ -122,7 +152,7 @@ from itertools import product
 
 class rule_based_sentence_cleaner:
     def __init__(self):
-        self.nlp = NLP()
+        self.nlp = lazy("nlp")
         
     def clean_head(self,sent,head_symbol):
         if head_symbol in sent:
@@ -166,24 +196,66 @@ class rule_based_sentence_cleaner:
         return sent
 
 #传说中的内存存储
+#有上限的LRU缓存, 超过size就把最久没用的扔掉, size<=0表示不设上限
+#ttl不为None时, 超过ttl秒的条目视为过期
+#flask server是多线程的, 所以所有操作都加锁
 class mem_cache:
-    def __init__(self,name):
-        self.data = {}
+    def __init__(self,name,size=100000,ttl=None):
+        self.data = OrderedDict()
+        self.name = name
+        self.size = size
+        self.ttl = ttl
         self.hit = 0
+        self.miss = 0
+        self.eviction = 0
         self.total = 0
-        self.name = name
+        self.__lock = threading.RLock()
 
     def add(self,key,value):
-        self.data[key] = value
+        with self.__lock:
+            self.data[key] = (value,time.time())
+            self.data.move_to_end(key)
+
+            while self.size > 0 and len(self.data) > self.size:
+                self.data.popitem(last=False)
+                self.eviction += 1
+
+    #取缓存, 没有或者过期了返回default
+    def get(self,key,default=None):
+        with self.__lock:
+            self.total += 1
+            if key in self.data:
+                value,stamp = self.data[key]
+                if self.ttl is None or time.time() - stamp <= self.ttl:
+                    self.data.move_to_end(key)
+                    self.hit += 1
+                    return value
+
+                #过期了
+                del self.data[key]
+                self.eviction += 1
+
+            self.miss += 1
+            return default
 
     def has(self,key,display = False):
-        self.total += 1    
-        if key in self.data:
-            self.hit += 1
-            if display:
-                if self.hit % 100 == 0:
-                    print("cache名",self.name,"命中率",self.hit/self.total,"总个数",self.total,"命中个数",self.hit)
-            return self.data[key]
+        result = self.get(key)
+        if display and result is not None:
+            if self.hit % 100 == 0:
+                print("cache名",self.name,"命中率",self.hit/self.total,"总个数",self.total,"命中个数",self.hit)
+
+        return result
+
+    def clear(self):
+        with self.__lock:
+            self.data.clear()
 
-        return None
+    def __len__(self):
+        return len(self.data)
 
+    #命中情况的统计
+    def stats(self):
+        with self.__lock:
+            ratio = self.hit / self.total if self.total > 0 else 0
+            return {"name":self.name,"size":len(self.data),"capacity":self.size,\
+                    "hit":self.hit,"miss":self.miss,"eviction":self.eviction,"hit_ratio":ratio}
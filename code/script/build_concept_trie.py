@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+
+'''
+作用:把KB里面的多词概念建成自动机, 给TrieEntityFinder用
+建好之后在cn_data.conf里面配置
+    concept_trie = 输出文件
+不配置的话第一次用TrieEntityFinder的时候现建
+'''
+import sys
+sys.path.append("..")
+import insummer
+from insummer.read_conf import config
+from insummer.registry import lazy
+from insummer.query_expansion.concept_trie import build_concept_trie
+
+from optparse import OptionParser
+
+conf = config("../../conf/cn_data.conf")
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-o", "--output",dest="output",default=conf.get("concept_trie"),help="输出的pickle")
+    parser.add_option("-n", "--max_len",dest="max_len",type="int",default=5,help="概念最多的词数")
+
+    (options, args) = parser.parse_args()
+
+    if options.output == None:
+        print("请指定输出文件")
+        sys.exit(1)
+
+    trie = build_concept_trie(lazy("entity_indx"),options.max_len)
+    trie.save(options.output)
+    print("concept trie %s"%(len(trie)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/python3
+
+'''
+作用:用data_iterates.py -t copy_data -s 导出的csv建本地的csr知识库
+建好之后在cn_data.conf里面配置
+    kb_backend = csr
+    csr_path = 输出目录
+InsunnetFinder就不再连mongodb了
+'''
+import sys
+sys.path.append("..")
+import insummer
+from insummer.read_conf import config
+from insummer.knowledge_base.backend import build_csr_backend
+
+from optparse import OptionParser
+
+conf = config("../../conf/cn_data.conf")
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-i", "--input",dest="input",default=conf.get("copy_data"),help="copy_data导出的csv")
+    parser.add_option("-o", "--output",dest="output",default=conf.get("csr_path"),help="csr的输出目录")
+
+    (options, args) = parser.parse_args()
+
+    if options.input == None or options.output == None:
+        print("请指定输入的csv和输出目录")
+        sys.exit(1)
+
+    build_csr_backend(options.input,options.output,display=True)
+
+if __name__ == '__main__':
+    main()
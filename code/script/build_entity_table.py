@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+
+'''
+作用:把data_iterates.py -t entity_list -s 导出的概念集合(pickle)转成mmap的字符串表
+建好之后在cn_data.conf里面配置
+    entity_table = 输出前缀
+kb_has_concept就不再载入pickle的set了
+'''
+import sys
+sys.path.append("..")
+import insummer
+from insummer.read_conf import config
+from insummer.knowledge_base.string_table import build_string_table
+
+import pickle
+from optparse import OptionParser
+
+conf = config("../../conf/cn_data.conf")
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-i", "--input",dest="input",default=conf.get("entity_name"),help="entity_list导出的pickle")
+    parser.add_option("-o", "--output",dest="output",default=conf.get("entity_table"),help="字符串表的输出前缀")
+
+    (options, args) = parser.parse_args()
+
+    if options.input == None or options.output == None:
+        print("请指定输入的pickle和输出前缀")
+        sys.exit(1)
+
+    with open(options.input,'rb') as entity_file:
+        entity_list = pickle.load(entity_file)
+
+    names = build_string_table(entity_list,options.output)
+    print("entity table %s"%(len(names)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+
+'''
+作用:用整个问题集合的答案句子建语料级别的idf表, LexRank的时候所有问题共用
+e.g. ./build_idf_table.py -d duc -o duc_idf.pkl
+'''
+import sys
+sys.path.append("..")
+import insummer
+from insummer.read_conf import config
+from insummer.question_store import load_questions
+from insummer.summarization.tfidf import idf_table
+
+from optparse import OptionParser
+
+qconf = config("../../conf/question.conf")
+
+#数据集 => question.conf里面的名字
+DATA_NAME = {"ya":"filter_qa","duc":"duc_question"}
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-d", "--data",dest="data",default="duc",help="ya或者duc")
+    parser.add_option("-o", "--output",dest="output",default=None,help="输出的pickle")
+
+    (options, args) = parser.parse_args()
+
+    if options.output == None or options.data not in DATA_NAME:
+        print("请指定数据集和输出文件")
+        sys.exit(1)
+
+    table = idf_table()
+    for indx,question in enumerate(load_questions(qconf,DATA_NAME[options.data])):
+        table.add_many([sent.get_tokens() for sent in question.get_analysis(joined=True).get_sentences()])
+        if indx % 100 == 0:
+            print("question %s"%(indx))
+
+    table.save(options.output)
+    print("sentence %s word %s"%(table.doc_num,len(table.df)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+
+'''
+作用:预先算好常见词的词干, 存成english.LEMMA_TABLE的pickle
+词表默认取KB概念名里面的所有单词, 也可以用-i给一个一行一个词的文件
+建好之后在cn_data.conf里面配置
+    lemma_table = 输出文件
+NLP第一次建的时候就会载入
+'''
+import sys
+sys.path.append("..")
+import insummer
+from insummer.read_conf import config
+from insummer.registry import lazy
+from insummer.english import warm_lemma_table,save_lemma_table,LEMMA_TABLE
+
+from optparse import OptionParser
+
+conf = config("../../conf/cn_data.conf")
+
+#KB概念名里面的单词, 概念名是用_连起来的
+def kb_words():
+    words = set()
+    for concept in lazy("entity_indx"):
+        words.update(concept.split('_'))
+    return words
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-i", "--input",dest="input",default=None,help="词表文件, 一行一个词, 不给就用KB的概念")
+    parser.add_option("-o", "--output",dest="output",default=conf.get("lemma_table"),help="输出的pickle")
+
+    (options, args) = parser.parse_args()
+
+    if options.output == None:
+        print("请指定输出文件")
+        sys.exit(1)
+
+    if options.input == None:
+        words = kb_words()
+    else:
+        with open(options.input) as word_file:
+            words = set([line.strip() for line in word_file if len(line.strip()) > 0])
+
+    #pos为None是normalize用的, 后面四个是带词性的
+    warm_lemma_table(words,pos_list=(None,'n','v','a','r'))
+    save_lemma_table(options.output)
+    print("lemma table %s"%(len(LEMMA_TABLE)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+
+'''
+作用:把问题集合转成question_store, 见insummer/question_store.py
+输入可以是原来pickle的问题list, 也可以直接是Yahoo Answers的xml/json(流式读)
+e.g. ./build_question_store.py -d ya      #filter_qa => filter_qa_store
+     ./build_question_store.py -d duc     #duc_question => duc_question_store
+     ./build_question_store.py -i manner.xml -o manner
+建好之后在question.conf里面配置 filter_qa_store/duc_question_store, exp/data.py就会用store
+'''
+import sys
+sys.path.append("..")
+import insummer
+from insummer.read_conf import config
+from insummer.question_reader import iter_questions
+from insummer.question_store import build_question_store
+
+import pickle
+from optparse import OptionParser
+
+qconf = config("../../conf/question.conf")
+
+#数据集 => question.conf里面pickle的名字
+DATA_NAME = {"ya":"filter_qa","duc":"duc_question"}
+
+def read_questions(fn):
+    if fn.endswith(".pkl") or fn.endswith(".pickle"):
+        with open(fn,'rb') as question_file:
+            return pickle.load(question_file)
+
+    return iter_questions(fn)
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-d", "--data",dest="data",default=None,help="ya或者duc, 按question.conf的配置转")
+    parser.add_option("-i", "--input",dest="input",default=None,help="输入文件, pickle/xml/json")
+    parser.add_option("-o", "--output",dest="output",default=None,help="输出的前缀")
+
+    (options, args) = parser.parse_args()
+
+    if options.data != None:
+        if options.data not in DATA_NAME:
+            print("没有这个数据集 %s"%(options.data))
+            sys.exit(1)
+        name = DATA_NAME[options.data]
+        fn = options.input or qconf[name]
+        output = options.output or qconf.get(name+"_store")
+    else:
+        fn,output = options.input,options.output
+
+    if fn == None or output == None:
+        print("请指定输入和输出")
+        sys.exit(1)
+
+    #pickle只能整个读进来, xml/json是一个一个读一个一个写的
+    size = build_question_store(read_questions(fn),output,display=True)
+    print("question %s"%(size))
+
+if __name__ == '__main__':
+    main()
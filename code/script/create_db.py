@@ -42,6 +42,8 @@ class db_handler():
         for ent in entity:
             self.single_indx(ent)
             self.double_indx(ent,rel)
+            #按关系编号下推过滤的时候用
+            self.double_indx(ent,"rel_id")
         
 
 if __name__ == '__main__':
@@ -9,7 +9,7 @@ sys.path.append("..")
 import insummer
 from insummer.read_conf import config
 from insummer.knowledge_base import concept_tool
-from insummer.knowledge_base.relation import relation_tool
+from insummer.knowledge_base.relation import relation_tool,parse_rel
 
 import pickle
 
@@ -171,11 +171,13 @@ class copy_data(abstract_func):
     def store_function(self,line):
         rel,cp1,cp2,weight=line[1],line[2],line[3],line[5]
         
+        #关系编号和是否positive在导数据的时候就算好, 查询的时候不用再解析字符串
+        rel_id,pos = parse_rel(rel)
         rel = rel_tool.rel_name(rel)
         cp1,cp2 = cn_tool.concept_name(cp1),cn_tool.concept_name(cp2)
         
         
-        result = [rel,cp1,cp2,weight]    
+        result = [rel,cp1,cp2,weight,rel_id,int(pos)]    
         self.writer.writerow(result)
         return 1
 
@@ -6,9 +6,10 @@ from pprint import pprint
 import sys
 sys.path.append("..")
 import insummer
-from insummer.util import NLP
+from insummer.registry import lazy
+from insummer.question_reader import iter_xml_questions
 
-nlp = NLP()
+nlp = lazy("nlp")
 
 #存储数据位置
 indx_dir = "/home/lavi/project/insummer/index"
@@ -76,69 +77,13 @@ class tquestion:
 
         print(100*"=")
         
+#manner.xml流式地读, 见insummer/question_reader.py
 def gen_manner():
     source_dir = "/home/lavi/project/insummer/question_retrival/manner.xml"
-                
-    f = open(source_dir)
-
-    qnum = 0
-    nbest = []
-    title = ""
-    best = ""
-    content = ""
-
-    def contains(line,tags):
-        for tag in tags:
-            if line.startswith(tag):
-                return True
-
-        return False
-
-    def replace(line,tag):
-        line = line.replace("<%s>"%tag,"")
-        line = line.replace("</%s>"%tag,"")
-        return line.strip()
-        
-    unused_tags = ["<ystfeed>","</ystfeed>","<uri>","<yid>","<best_yid>","</nbestanswers>","<cat>","<maincat>","<subcat>"]
-    for line in f:
-        if line.startswith("<?xml version='1.0' encoding='UTF-8'?>"):
-            pass
-        elif contains(line,unused_tags):
-            pass
-
-        elif line.startswith("<vespaadd><document type=\"wisdom\">"):
-            nbest = []
-            title = ""
-            best = ""
-            content = ""
-
-        elif line.startswith("</document></vespaadd>"):
-            tq = tquestion(title=title,content=content,best=best,nbest=nbest)
-            yield tq
-            
-        elif line.startswith("<subject>"):
-            title = replace(line,"subject")
-
-        elif line.startswith("<content>"):
-            content = replace(line,"content")
-
-        elif line.startswith("<bestanswer>"):
-            best = replace(line,"bestanswer")
-
-        elif line.startswith("<nbestanswers>"):
-            line = replace(line,"nbestanswers")
-            line = replace(line,"answer_item")
-            line = nlp.remove_tag(line)
-            nbest.append(line)
-
-        elif line.startswith("<answer_item>"):
-            line = replace(line,"answer_item")
-            line = nlp.remove_tag(line)
-            nbest.append(line)
 
-        else:
-            print("error")
-            sys.exit(1)
+    for question in iter_xml_questions(source_dir):
+        nbest = [answer.get_content() for answer in question.get_nbest()]
+        yield tquestion(title=question.get_title(),content=question.get_content(),best=question.get_best(),nbest=nbest)
         
 #import whoosh
 from whoosh.index import create_in
@@ -29,9 +29,9 @@ import insummer
 
 from insummer.summarization.ilp import dis_ilp as DI
 from insummer.common_type import Question,Answer,build_question
-from insummer.util import NLP
+from insummer.registry import lazy
 
-nlp = NLP()
+nlp = lazy("nlp")
 
 app = Flask(__name__)
 
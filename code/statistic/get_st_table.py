@@ -8,7 +8,7 @@ from question_table import question_table
 sys.path.append("..")
 import insummer
 from insummer.read_conf import config
-from insummer.util import NLP
+from insummer.registry import lazy
 from insummer.query_expansion.entity_finder import NgramEntityFinder
 
 #获得两个问题集的路径信息，并读取
@@ -19,7 +19,7 @@ duc_path = ques_conf['duc_question']
 fil_spath = ques_conf['filter_statistic']
 duc_spath = ques_conf['duc_statistic']
 
-nlp = NLP()
+nlp = lazy("nlp")
 
 #获得两个语料的问题集
 finfile = open(filter_path,'rb')
@@ -13,8 +13,10 @@ sys.path.append('..')
 import insummer
 from insummer.common_type import Question,Answer
 from insummer.read_conf import config
-from insummer.util import NLP
+from insummer.question_store import load_questions
+from insummer.registry import lazy
 from insummer.query_expansion.entity_finder import NgramEntityFinder
+from insummer.graph_rank import pagerank_matrix
 
 #获得问题的路径信息
 question_conf = config('../../conf/question.conf')
@@ -25,13 +27,12 @@ duc_path = question_conf['duc_question']
 #摘要保存路径要和textrank区别开，同时为了ROUGE不能简单地用pickle存储了
 lexrank_path = question_conf['lexrank_sum']
 
-nlp = NLP()
+nlp = lazy("nlp")
 
 #获得问题
 #filter_file = open(filter_path,'rb')
 #filter_question = pickle.load(filter_file)
-duc_file = open(duc_path,'rb')
-duc_question = pickle.load(duc_file)
+duc_question = load_questions(question_conf,'duc_question')
 
 '''
     # 建图的时候需要计算这个问题的各个句子的tf idf啊喂
@@ -95,23 +96,17 @@ def ExtractSentence(answer_text):
 
     print("获得tfidf矩阵，开始构建图...")
 
-    #这里用index来表示句子，因为后面计算不用句子的文本信息了，同时也方便在矩阵中找
-    nodes = [idx for idx in range(word_N)]
-    lex_graph = nx.Graph()
-    lex_graph.add_nodes_from(nodes)
-
-    #之后建图或者邻接矩阵都可以，i，j间的相似度就是tfidf[i]和tfidf[j]的余弦相似度
-    #nodepairs = list(itertools.combinations(nodes,2))
-    for i in range(sent_N):
-        for j in range(sent_N):
-            #i,j和sents列表对应的，就用这个建图也是可以的
-            sim = get_cos(tfidf_matrix[i],tfidf_matrix[j])
-            lex_graph.add_edge(i,j,weight=sim)
+    #i，j间的相似度就是tfidf[i]和tfidf[j]的余弦相似度, 每行归一化之后乘自己的转置就是相似度矩阵
+    #这个矩阵就是图的邻接矩阵, 句子i就是第i个点
+    norms = linalg.norm(tfidf_matrix,axis=1)
+    normalized = tfidf_matrix / norms.reshape(-1,1)
+    lex_matrix = dot(normalized,normalized.T)
 
     print("图构建完成，开始迭代计算...")
 
     #开始迭代计算至收敛
-    cal_lex_rank = nx.pagerank(lex_graph)
+    scores = pagerank_matrix(lex_matrix)
+    cal_lex_rank = dict(enumerate(scores.tolist()))
 
     print("计算完成，开始摘要...")
 
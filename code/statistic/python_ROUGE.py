@@ -11,6 +11,9 @@
 import os
 import re
 import pickle
+import sys
+sys.path.append('..')
+from insummer.rouge import duc_evals,write_config
 
 # input : 
     # all summarization's path.
@@ -26,8 +29,7 @@ def pythonROUGE(sum_path,ref_path):
         这个xml可以直接全部构成，所以传入的还是path+path
     '''
     xml_path = '/home/charch/gitwork/insummer/duc/lexrank.xml'
-    xml_file = open(xml_path,'w')
-    create_xml(xml_file,sum_path,ref_path)
+    create_xml(xml_path,sum_path,ref_path)
 
     ROUGE_path = '/home/charch/gitwork/insummer/duc/RELEASE-1.5.5/ROUGE-1.5.5.pl'
     data_path = '/home/charch/gitwork/insummer/duc/RELEASE-1.5.5/data'
@@ -43,7 +45,7 @@ def pythonROUGE(sum_path,ref_path):
     os.system(exec_command)
 
 
-def create_xml(xml_file,sum_path,ref_path):
+def create_xml(xml_path,sum_path,ref_path):
     '''根据所有待rouge的sum产生一个完整的xml'''
     '''
         大概结构
@@ -56,8 +58,6 @@ def create_xml(xml_file,sum_path,ref_path):
         <models>
     '''
 
-    xml_file.write('<ROUGE_EVAL version="1.5.5">\n')
-
     peers_path = '/home/charch/gitwork/insummer/duc/sum_result/lexrank_rank'
     #peers_path = '/home/charch/gitwork/insummer/duc/sum_result/lexrank_rank'
     model_path = '/home/charch/gitwork/insummer/duc/duc_data/models'
@@ -70,33 +70,15 @@ def create_xml(xml_file,sum_path,ref_path):
 
     #然后是遍历所有的sum，按其主题再遍历所有对应的ref（一个做evalID，其余做models）
     #每个主题都产生四个，evalID不同，但是peers同
+    #EVAL的格式见insummer/rouge.py
 
     sum_list = os.listdir(sum_path)
 
+    evals = []
     for peer in sum_list:
-        for evalid in topic_ass_dict[peer]:
-            #the rest is the models
-            xml_file.write('<EVAL ID="' + evalid + '">\n')
-            xml_file.write('<PEER-ROOT>\n')
-            xml_file.write(peers_path + '\n')
-            xml_file.write('</PEER-ROOT>\n')
-            xml_file.write('<MODEL-ROOT>\n')
-            xml_file.write(model_path + '\n')
-            xml_file.write('</MODEL-ROOT>\n')
-            xml_file.write('<INPUT-FORMAT TYPE="SPL">\n')
-            xml_file.write('</INPUT-FORMAT>\n')
-            xml_file.write('<PEERS>\n')
-            xml_file.write('<P ID="'+ peer[3:5] +'">' + peer + '</P>\n')
-            xml_file.write('</PEERS>\n')
-            xml_file.write('<MODELS>\n')
-            for s_model in topic_ass_dict[peer]:
-                if s_model != evalid:
-                    xml_file.write('<M ID="' + s_model[-1] + '">' + s_model + '</M>\n')
-            xml_file.write('</MODELS>\n')
-            xml_file.write('</EVAL>\n')
-
-    xml_file.write('</ROUGE_EVAL>')
-    xml_file.close()
+        evals.extend(duc_evals(os.path.join(peers_path,peer),model_path,topic_ass_dict))
+
+    write_config(evals,xml_path)
             
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@
 #coding=utf-8
 
 from datetime import datetime
-import itertools
+from collections import OrderedDict
 import networkx as nx
 import pickle
 import math
@@ -12,8 +12,11 @@ sys.path.append('..')
 import insummer
 from insummer.common_type import Question,Answer
 from insummer.read_conf import config
-from insummer.util import NLP
+from insummer.question_store import load_questions
+from insummer.registry import lazy
 from insummer.query_expansion.entity_finder import NgramEntityFinder
+from insummer.summarization.textrank_graph import overlap_edges
+from insummer.graph_rank import pagerank_graph
 
 #获得问题的路径信息
 question_conf = config('../../conf/question.conf')
@@ -26,13 +29,11 @@ duc_abstract = question_conf['duc_abstract']
 #为了ROUGE要将每个topic分开存放到duc/sum_result中
 textrank_path = question_conf['textrank_sum']
 
-nlp = NLP()
+nlp = lazy("nlp")
 
-#xx_quesiton里面即问题列表
-filter_file = open(filter_path,'rb')
-filter_quesiton = pickle.load(filter_file)
-duc_file = open(duc_path,'rb')
-duc_question = pickle.load(duc_file)
+#xx_quesiton里面即问题列表, 配置了store的话是question_store, 用到的时候才读
+filter_quesiton = load_questions(question_conf,'filter_qa')
+duc_question = load_questions(question_conf,'duc_question')
 
 #single_question => nbest_content => top_k sents => abstract
 def get_abstract(questions,q_path,K):
@@ -96,10 +97,9 @@ def ExtractSentence(text,k):
     #建图结构
     text_graph = graph_construct(sent_tokens)
 
-    #这里pagerank有三种，一种是正常的pg，一种是利用numpy还有一种就是下面的利用scipy的稀疏矩阵
+    #所有的rank共用insummer/graph_rank.py里的pagerank
     print('start to calculate')
-    #cal_gr_page_rank = nx.pagerank(text_graph,weight='weight')
-    cal_gr_page_rank = nx.pagerank_scipy(text_graph)
+    cal_gr_page_rank = pagerank_graph(text_graph)
     print('ended')
 
     #按照最后的score得分进行排序，获得前K个，待扩展，使之取不超250个词的句子
@@ -133,22 +133,20 @@ def get_sum_sents(sents,limit_num):
     return idx
 
 #实际运行时，发现整个构建图结构才是最耗时的阶段，可以在这上面优化时间复杂度
+#现在每个句子只分词一次, 用倒排索引只给有共现词的句子对连边, 见insummer/summarization/textrank_graph.py
 def graph_construct(nodes):
     "构建text_rank_graph"
     print('构建text_graph')
 
-    #利用networkx简历图结构，节点即传入的sentences
+    #利用networkx简历图结构，节点即传入的sentences, 一样的句子是一个点
+    nodes = list(OrderedDict.fromkeys(nodes))
     text_graph = nx.Graph()
     text_graph.add_nodes_from(nodes)
 
-    #这里没有对边进行筛选，假设任意两个句子都是有相似性的
-    nodePairs = list(itertools.combinations(nodes,2))
-    for pair in nodePairs:
-        first_sent = pair[0]
-        second_sent= pair[1]
-        #weights = lDistance(first_sent,second_sent)
-        weights = sent_sim(first_sent,second_sent)
-        text_graph.add_edge(first_sent,second_sent,weight=weights)
+    #没有共现词的句子之间权重是0, 不用连边
+    token_lists = [nlp.word_tokenize(sent) for sent in nodes]
+    for first,second,weights in overlap_edges(token_lists):
+        text_graph.add_edge(nodes[first],nodes[second],weight=weights)
     print('graph construction end.')
 
     return text_graph
@@ -161,7 +159,13 @@ def sent_sim(sent_1,sent_2):
     #交集即为共现的词语
     sim_set = set(sent_1_tokens) & set(sent_2_tokens)
     num_up = len(sim_set)
+    if num_up == 0:
+        return 0.
+
+    #两个句子都只有一个词的时候分母是0
     num_down = math.log(len(sent_1_tokens)) + math.log(len(sent_2_tokens))
+    if num_down == 0:
+        return 0.
 
     return num_up * 1. / num_down
 
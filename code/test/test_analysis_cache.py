@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+
+'''
+测试问题的分析结果缓存, 答案改了之后重新分析, pickle的时候不带缓存
+分句分词换成按". "和空格切
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer import registry
+from insummer.common_type import Question,Answer
+
+import pickle
+import unittest
+
+class split_nlp:
+    def sent_tokenize(self,text):
+        return [sent.strip() for sent in text.split(". ") if len(sent.strip()) > 0]
+
+    def word_tokenize(self,sent):
+        return sent.split()
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        registry.provide("nlp",split_nlp())
+        nbest = [Answer("first answer (with notes) here. second sentence here",clean_tag=False),Answer("another answer text",clean_tag=False)]
+        self.question = Question("title","","",nbest,clean_tag=False)
+
+    def tearDown(self):
+        registry.reset("nlp")
+
+    def testCached(self):
+        analysis = self.question.get_analysis()
+        self.assertIs(self.question.get_analysis(),analysis)
+        self.assertIsNot(self.question.get_analysis(joined=True),analysis)
+        self.assertEqual(len(analysis.get_sentences()),3)
+
+    def testAnswerClean(self):
+        analysis = self.question.get_analysis()
+        joined = self.question.get_analysis(joined=True)
+        self.assertIn("first answer (with notes) here",analysis.get_sentence_texts())
+
+        #直接改答案, 不经过Question.clean
+        self.question.get_nbest()[0].clean()
+        cleaned = self.question.get_analysis()
+        self.assertIsNot(cleaned,analysis)
+        self.assertNotIn("first answer (with notes) here",cleaned.get_sentence_texts())
+        self.assertEqual(cleaned.get_sentence_texts()[0],self.question.get_nbest()[0].get_content().split(". ")[0])
+        self.assertIsNot(self.question.get_analysis(joined=True),joined)
+
+        #答案没再变, 还是同一个
+        self.assertIs(self.question.get_analysis(),cleaned)
+
+    def testAddAnswer(self):
+        analysis = self.question.get_analysis()
+        self.question.get_nbest().append(Answer("one more",clean_tag=False))
+        self.assertEqual(self.question.get_analysis().get_sentence_texts()[-1],"one more")
+
+    def testPickle(self):
+        self.question.get_analysis().get_sentences()[0].get_tokens()
+        data = pickle.dumps(self.question)
+        self.assertNotIn(b"AnalyzedDocument",data)
+
+        question = pickle.loads(data)
+        self.assertEqual(question.get_analysis().get_sentence_texts(),self.question.get_analysis().get_sentence_texts())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+
+'''
+测试批量ROUGE: 解析-d的输出, EVAL之间求平均, 分片跑和一次跑的结果一样
+ROUGE-1.5.5.pl换成一个假的脚本, 按配置里面的EVAL ID输出分数
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.rouge import rouge_eval,duc_evals,parse_output,average,write_scores,batch_rouge
+
+import os
+import stat
+import tempfile
+import unittest
+
+output = '''---------------------------------------------
+01 ROUGE-1 Average_R: 0.40000 (95%-conf.int. 0.30000 - 0.50000)
+01 ROUGE-1 Eval D0701.M.250.A.A R:0.30000 P:0.20000 F:0.24000
+01 ROUGE-1 Eval D0701.M.250.A.B R:0.50000 P:0.40000 F:0.44444
+01 ROUGE-2 Eval D0701.M.250.A.A R:0.10000 P:0.05000 F:0.06667
+02 ROUGE-1 Eval D0702.M.250.B.C R:0.70000 P:0.60000 F:0.64615
+'''
+
+#假的ROUGE, 每个EVAL ID的R是ID的长度/100, 最后一个参数是配置文件
+fake_rouge = '''#!%s
+import re,sys
+text = open(sys.argv[-1]).read()
+for eval_id in re.findall(r'<EVAL ID="(.+?)">',text):
+    pid = re.search(r'<EVAL ID="%%s">.*?<P ID="(.+?)">'%%(re.escape(eval_id)),text,re.DOTALL).group(1)
+    print("%%s ROUGE-1 Eval %%s R:%%.5f P:0.50000 F:0.10000"%%(pid,eval_id,len(eval_id)/100))
+'''%(sys.executable)
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def testParse(self):
+        scores = parse_output(output)
+        self.assertEqual(sorted(scores),["D0701.M.250.A.A","D0701.M.250.A.B","D0702.M.250.B.C"])
+        self.assertEqual(scores["D0701.M.250.A.A"]["01"]["ROUGE-2"],{"R":0.1,"P":0.05,"F":0.06667})
+
+        avg = average(scores)
+        self.assertAlmostEqual(avg["ROUGE-1"]["R"],0.5)
+        self.assertAlmostEqual(avg["ROUGE-2"]["P"],0.05)
+
+        avg = average(scores,{"D0701.M.250.A.A","D0701.M.250.A.B"})
+        self.assertAlmostEqual(avg["ROUGE-1"]["P"],0.3)
+
+    def testWriteScores(self):
+        score_path = os.path.join(self.dir.name,"score")
+        write_scores(average(parse_output(output)),score_path,"07")
+        with open(score_path) as score_file:
+            lines = [line.strip() for line in score_file if not line.startswith("-")]
+        self.assertIn("07 ROUGE-1 Average_R: 0.50000",lines)
+        self.assertEqual(len(lines),6)
+
+    def testDucEvals(self):
+        topic_ass_dict = {"D0701.M.250.A.01":["D0701.M.250.A.A","D0701.M.250.A.B","D0701.M.250.A.C"]}
+        evals = duc_evals("/peers/D0701.M.250.A.01","/models",topic_ass_dict)
+        self.assertEqual([one.eval_id for one in evals],topic_ass_dict["D0701.M.250.A.01"])
+        self.assertEqual(evals[0].peers,[("01","D0701.M.250.A.01")])
+        self.assertEqual(evals[0].models,[("B","D0701.M.250.A.B"),("C","D0701.M.250.A.C")])
+        self.assertIn('<M ID="C">D0701.M.250.A.C</M>',evals[0].to_xml())
+
+    def testShards(self):
+        rouge_path = os.path.join(self.dir.name,"ROUGE-1.5.5.pl")
+        with open(rouge_path,"w") as rouge_file:
+            rouge_file.write(fake_rouge)
+        os.chmod(rouge_path,os.stat(rouge_path).st_mode | stat.S_IEXEC)
+
+        evals = [rouge_eval("E"+"x"*indx,"/peers",[("%02d"%(indx),"peer%s"%(indx))],"/models",[("A","model")]) for indx in range(7)]
+        rouge = batch_rouge(rouge_path,"data",os.path.join(self.dir.name,"work"))
+
+        single = rouge.run(evals,shards=1)
+        self.assertEqual(len(single),7)
+        self.assertAlmostEqual(single["Exxx"]["03"]["ROUGE-1"]["R"],0.04)
+        for shards in [2,3,7,20]:
+            self.assertEqual(rouge.run(evals,shards=shards,name="s%s"%(shards)),single)
+
+        self.assertEqual(rouge.run([]),{})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+
+'''
+测试mem_cache的LRU淘汰, 过期和统计, 以及KB缓存的大小和过期时间从哪里来
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer import registry
+from insummer.registry import KB_CONF
+from insummer.util import mem_cache
+from insummer.knowledge_base import InsunnetFinder
+from insummer.knowledge_base.entity_lookup import InsunnetEntityLookup
+
+import os
+import time
+import threading
+import unittest
+
+class test(unittest.TestCase):
+
+    def testLRU(self):
+        mc = mem_cache("test",size=2)
+        mc.add("car",1)
+        mc.add("computer",2)
+
+        #访问car之后, 最久没用的是computer
+        self.assertEqual(mc.get("car"),1)
+        mc.add("person",3)
+
+        self.assertEqual(mc.get("computer"),None)
+        self.assertEqual(mc.get("car"),1)
+        self.assertEqual(mc.get("person"),3)
+        self.assertEqual(len(mc),2)
+
+        stats = mc.stats()
+        self.assertEqual(stats["hit"],3)
+        self.assertEqual(stats["miss"],1)
+        self.assertEqual(stats["eviction"],1)
+
+    def testTTL(self):
+        mc = mem_cache("test",size=10,ttl=0.05)
+        mc.add("car",[])
+        self.assertEqual(mc.get("car"),[])
+
+        time.sleep(0.1)
+        self.assertEqual(mc.get("car"),None)
+        self.assertEqual(mc.stats()["eviction"],1)
+
+    def testThread(self):
+        mc = mem_cache("test",size=50)
+
+        def work(base):
+            for i in range(1000):
+                mc.add((base,i),i)
+                mc.get((base,i-1))
+
+        threads = [threading.Thread(target=work,args=(t,)) for t in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(mc),50)
+        self.assertEqual(mc.stats()["eviction"],8000-50)
+
+    def testConf(self):
+        registry.provide("config:%s"%(KB_CONF),{"cache_size":"7","cache_ttl":"3"})
+        try:
+            finder = InsunnetFinder(backend=object())
+            self.assertEqual((finder.lookup_mc.size,finder.lookup_mc.ttl),(7,3.0))
+
+            #显式传None就是不过期, 不用配置文件里面的
+            finder = InsunnetFinder(cache_ttl=None,backend=object())
+            self.assertEqual((finder.lookup_mc.size,finder.lookup_mc.ttl),(7,None))
+
+            lookup = InsunnetEntityLookup(cache_size=5,backend=object())
+            self.assertEqual((lookup.relate_mc.size,lookup.relate_mc.ttl),(5,3.0))
+            self.assertEqual(lookup.cn_finder.weight_mc.ttl,3.0)
+        finally:
+            registry.reset("config:%s"%(KB_CONF))
+
+    def testNoConf(self):
+        #没有配置文件, 传了backend也能建, 用默认值
+        registry.reset("config:%s"%(KB_CONF))
+        if os.path.exists(KB_CONF):
+            self.skipTest("有配置文件")
+
+        finder = InsunnetFinder(backend=object())
+        self.assertEqual((finder.lookup_mc.size,finder.lookup_mc.ttl),(100000,None))
+
+        finder = InsunnetFinder(cache_size=None,backend=object())
+        finder.lookup_mc.add("car",1)
+        self.assertEqual(finder.lookup_mc.get("car"),1)
+
+if __name__ == '__main__':
+    unittest.main()
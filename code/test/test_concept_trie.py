@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+
+'''
+测试多词概念的自动机, 匹配结果和暴力枚举所有n-gram一样
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.query_expansion.concept_trie import concept_trie,build_concept_trie,longest_spans
+
+import os
+import random
+import tempfile
+import unittest
+
+#暴力: 枚举所有长度2..max_len的n-gram, 在概念集合里的就是匹配
+def brute_match(tokens,names,max_len):
+    result = []
+    for end in range(1,len(tokens)+1):
+        for length in range(max_len,1,-1):
+            start = end - length
+            if start >= 0 and "_".join(tokens[start:end]) in names:
+                result.append((start,end))
+    return result
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        self.names = ["nitrogen_oxide","oxide","get_sick","sick_leave","get_sick_leave","a_b_a","b_a_b","a_b","b_c_d_e_f_g"]
+        self.trie = build_concept_trie(self.names,max_len=5)
+
+    def testMatch(self):
+        tokens = "get sick leave emit nitrogen oxide".split()
+        self.assertEqual(sorted(self.trie.match(tokens)),[(0,2),(0,3),(1,3),(4,6)])
+
+        #单个词和超过max_len的概念不在自动机里
+        self.assertEqual(len(self.trie),7)
+        self.assertEqual(self.trie.match("b c d e f g".split()),[])
+
+    def testRandom(self):
+        rand = random.Random(1)
+        names = set(["_".join(rand.choice("abc") for i in range(rand.randint(2,4))) for j in range(20)])
+        trie = build_concept_trie(names,max_len=4)
+        for i in range(200):
+            tokens = [rand.choice("abcd") for j in range(rand.randint(0,12))]
+            self.assertEqual(sorted(trie.match(tokens)),sorted(brute_match(tokens,names,4)))
+
+    def testLongestSpans(self):
+        self.assertEqual(longest_spans([(1,3),(0,2),(0,3),(4,6),(5,6)]),[(0,3),(4,6)])
+        self.assertEqual(longest_spans([(2,4),(0,3),(3,5)]),[(0,3),(3,5)])
+        self.assertEqual(longest_spans([]),[])
+
+    def testSaveLoad(self):
+        with tempfile.TemporaryDirectory() as dirname:
+            fn = os.path.join(dirname,"trie.pkl")
+            self.trie.save(fn)
+            trie = concept_trie.load(fn)
+
+        tokens = "a b a b a get sick leave".split()
+        self.assertEqual(trie.match(tokens),self.trie.match(tokens))
+        self.assertEqual(len(trie),len(self.trie))
+
+if __name__ == '__main__':
+    unittest.main()
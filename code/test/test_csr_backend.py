@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+
+'''
+测试csr后端, 从csv建好之后, 查询的结果和直接扫一遍csv一样
+装了mongomock的话, 再和mongo后端在同样的数据上比
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.knowledge_base.backend import csr_backend,build_csr_backend,mongo_backend
+from insummer.knowledge_base.relation import rel_mask,REL_INDX
+
+import os
+import csv
+import tempfile
+import unittest
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+#关系名,概念1,概念2,权重,关系编号,positive
+rows = [
+    ["Synonym","car","auto",1.0,REL_INDX["Synonym"],1],
+    ["RelatedTo","car","wheel",2.0,REL_INDX["RelatedTo"],1],
+    ["IsA","car","vehicle",0.5,REL_INDX["IsA"],1],
+    ["Synonym","vehicle","auto",1.5,REL_INDX["Synonym"],1],
+    ["RelatedTo","dog","car",0.25,REL_INDX["RelatedTo"],1],
+    ["RelatedTo","dog","dog",0.25,REL_INDX["RelatedTo"],1],
+    ["IsA","dog","car",3.0,REL_INDX["IsA"],0],
+]
+
+def edge_key(edge):
+    return (edge['start'],edge['end'],edge['rel'],round(edge['weight'],4))
+
+def row_key(row):
+    return (row[1],row[2],row[0],round(row[3],4))
+
+#不连mongod, 用mongomock的collection代替
+def mock_mongo():
+    backend = mongo_backend.__new__(mongo_backend)
+    backend.tbl = mongomock.MongoClient().insunnet.assertion
+    backend._mongo_backend__has_rel_id = None
+    backend.tbl.insert_many([{'rel':row[0],'start':row[1],'end':row[2],'weight':row[3],'rel_id':row[4],'pos':row[5]} for row in rows])
+    return backend
+
+#不建索引, 直接扫csv的结果
+def scan(select):
+    return sorted([row_key(row) for row in rows if row[5] == 1 and select(row)])
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        csv_path = os.path.join(self.dir.name,"copy.csv")
+        with open(csv_path,"w") as csv_file:
+            csv.writer(csv_file).writerows(rows)
+        build_csr_backend(csv_path,os.path.join(self.dir.name,"csr"))
+        self.backend = csr_backend(os.path.join(self.dir.name,"csr"))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def edges(self,edges):
+        return sorted([edge_key(edge) for edge in edges])
+
+    def testLookup(self):
+        self.assertEqual(self.edges(self.backend.lookup("car")),scan(lambda row:"car" in row[1:3]))
+        self.assertEqual(self.backend.lookup("nothing"),[])
+
+        #自环出现两次
+        self.assertEqual(len(self.backend.lookup("dog")),3)
+
+        mask = rel_mask([REL_INDX["Synonym"]])
+        self.assertEqual(self.edges(self.backend.lookup("car",mask)),scan(lambda row:"car" in row[1:3] and row[0] == "Synonym"))
+
+    def testFindEdges(self):
+        names = {"car","auto","dog"}
+        self.assertEqual(self.edges(self.backend.find_edges(names)),scan(lambda row:row[1] in names or row[2] in names))
+        self.assertEqual(self.edges(self.backend.find_edges(names,both=True)),scan(lambda row:row[1] in names and row[2] in names))
+
+    def testNegative(self):
+        #dog NotIsA car 不返回
+        self.assertEqual(self.edges(self.backend.find_pair("dog","car")),[("dog","car","RelatedTo",0.25)])
+
+    @unittest.skipIf(mongomock is None,"没有mongomock")
+    def testMongo(self):
+        mongo = mock_mongo()
+        mask = rel_mask([REL_INDX["Synonym"],REL_INDX["IsA"]])
+        for name in ["car","dog","auto","nothing"]:
+            self.assertEqual(self.edges(self.backend.lookup(name)),self.edges(mongo.lookup(name)))
+            self.assertEqual(self.edges(self.backend.lookup(name,mask)),self.edges(mongo.lookup(name,mask)))
+
+        for names in [{"car","auto"},{"dog","vehicle","nothing"},{"dog"}]:
+            for both in [False,True]:
+                self.assertEqual(self.edges(self.backend.find_edges(names,both)),self.edges(mongo.find_edges(names,both)))
+            self.assertEqual(self.edges(self.backend.find_edges(names,rel_mask=mask)),self.edges(mongo.find_edges(names,rel_mask=mask)))
+
+        self.assertEqual(self.edges(self.backend.find_pair("car","auto")),self.edges(mongo.find_pair("car","auto")))
+
+if __name__ == '__main__':
+    unittest.main()
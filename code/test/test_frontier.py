@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+
+'''
+测试一层一层的扩展, 没有限制的时候和以前每层全部重新扩展的结果一样, 限制到了就停
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.query_expansion import frontier
+from insummer.query_expansion.frontier import frontier_expander
+
+import random
+import unittest
+
+#随机的邻接表, 扩展规则就是查表
+def random_graph(size,degree,seed):
+    rand = random.Random(seed)
+    return {node:rand.sample(range(size),degree) for node in range(size)}
+
+class graph_rule:
+    def __init__(self,graph):
+        self.graph = graph
+        self.calls = 0
+
+    def __call__(self,entities):
+        self.calls += len(entities)
+        return {entity:self.graph[entity] for entity in entities}
+
+#以前的做法, 每层把到目前为止所有的实体都扩展一遍
+def old_expand(graph,base_entity,level):
+    result = set(base_entity)
+    for indx in range(level):
+        for entity in list(result):
+            result.update(graph[entity])
+    return result
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = random_graph(200,3,1)
+        self.base = [0,1,2]
+
+    def testSameResult(self):
+        for level in range(5):
+            rule = graph_rule(self.graph)
+            expander = frontier_expander(rule,level)
+            result = expander.expand(self.base)
+            self.assertEqual(result,old_expand(self.graph,self.base,level))
+            self.assertIsNone(expander.stop_reason)
+
+            #每个实体最多查一次
+            self.assertEqual(rule.calls,expander.calls)
+            self.assertEqual(expander.calls,sum(size for size,new in expander.level_stats))
+            self.assertLessEqual(expander.calls,len(result))
+
+    def testLevelCap(self):
+        expander = frontier_expander(graph_rule(self.graph),3,level_cap=4)
+        result = expander.expand(self.base)
+        self.assertTrue(all(new <= 4 for size,new in expander.level_stats))
+        self.assertEqual(len(result),len(self.base)+sum(new for size,new in expander.level_stats))
+
+    def testMaxNodes(self):
+        expander = frontier_expander(graph_rule(self.graph),5,max_nodes=20)
+        result = expander.expand(self.base)
+        self.assertEqual(len(result),20)
+        self.assertEqual(expander.stop_reason,"nodes")
+        self.assertTrue(result <= old_expand(self.graph,self.base,5))
+
+        #基实体已经够多了, 一次都不查
+        rule = graph_rule(self.graph)
+        expander = frontier_expander(rule,5,max_nodes=2)
+        self.assertEqual(expander.expand(self.base),set(self.base))
+        self.assertEqual(rule.calls,0)
+
+    def testMaxCalls(self):
+        rule = graph_rule(self.graph)
+        expander = frontier_expander(rule,5,max_calls=10)
+        result = expander.expand(self.base)
+        self.assertEqual(rule.calls,10)
+        self.assertEqual(expander.stop_reason,"calls")
+        self.assertTrue(result <= old_expand(self.graph,self.base,5))
+
+    def testMaxTime(self):
+        #每次看时间过了1秒
+        now = [0]
+        def fake_clock():
+            now[0] += 1
+            return now[0]
+
+        old_clock = frontier.clock
+        frontier.clock = fake_clock
+        try:
+            expander = frontier_expander(graph_rule(self.graph),5,max_time=2.5)
+            result = expander.expand(self.base)
+        finally:
+            frontier.clock = old_clock
+
+        self.assertEqual(expander.stop_reason,"time")
+        self.assertEqual(len(expander.level_stats),2)
+        self.assertEqual(result,old_expand(self.graph,self.base,2))
+
+if __name__ == '__main__':
+    unittest.main()
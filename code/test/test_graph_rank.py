@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+
+'''
+测试graph_rank的pagerank/hits, 和networkx的结果比
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.graph_rank import pagerank_graph,hits_graph,rank_order
+
+import networkx as nx
+import unittest
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        #有孤立点(dangling)的无向图
+        self.graph = nx.gnm_random_graph(60,150,seed=1)
+        self.graph.add_nodes_from(range(60,65))
+        self.person = {node:(10 if node % 3 else 0.5) for node in self.graph}
+
+    def assertClose(self,first,second,places=8):
+        for node in first:
+            self.assertAlmostEqual(first[node],second[node],places=places)
+
+    def testPagerank(self):
+        expect = nx.pagerank(self.graph,alpha=0.8,personalization=self.person,max_iter=600)
+        result = pagerank_graph(self.graph,alpha=0.8,personalization=self.person,max_iter=600)
+        self.assertClose(expect,result)
+
+    def testWarmStart(self):
+        cold = pagerank_graph(self.graph,personalization=self.person)
+        #从收敛的结果开始, 3次迭代以内就收敛了, 两个结果都只精确到tol
+        warm = pagerank_graph(self.graph,personalization=self.person,nstart=cold,max_iter=3)
+        self.assertClose(cold,warm,places=5)
+
+    def testHits(self):
+        h,a = nx.hits(self.graph,max_iter=300)
+        h2,a2 = hits_graph(self.graph,max_iter=300)
+        self.assertClose(h,h2)
+        self.assertClose(a,a2)
+
+    def testHitsNotConverged(self):
+        #K6和少一条边的K6, 最大的两个特征值很接近, 幂迭代收敛得很慢
+        #(二分图比如星形图最大的特征值有重根, 特征向量不唯一, 不能拿来比)
+        other = nx.complete_graph(6)
+        other.remove_edge(0,1)
+        graph = nx.disjoint_union(nx.complete_graph(6),other)
+        h,a = nx.hits(graph,max_iter=1000,tol=1.0e-12)
+        with self.assertWarns(RuntimeWarning):
+            h2,a2 = hits_graph(graph,max_iter=20)
+        self.assertClose(h,h2,places=6)
+        self.assertClose(a,a2,places=6)
+
+    def testRankOrder(self):
+        self.assertEqual(rank_order([0.1,0.3,0.3,0.2]),[1,2,3,0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+
+'''
+测试LexRank的相似度矩阵, 和以前两两算余弦, 用networkx建图算pagerank的结果一样
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer import registry
+from insummer.summarization.tfidf import TFIDF,lexrank_similarity
+from insummer.graph_rank import pagerank_matrix
+
+import unittest
+import numpy as np
+import networkx as nx
+
+class split_nlp:
+    def word_tokenize(self,sent):
+        return sent.split()
+
+sents = [
+    "the cat sat on the mat",
+    "the dog sat on the log",
+    "a cat and a dog",
+    "mat mat mat",
+    "birds fly south",
+]
+
+def get_cos(vec1,vec2):
+    return np.dot(vec1,vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        registry.provide("nlp",split_nlp())
+        self.tfidf = TFIDF(sents)
+        self.dense = self.tfidf.matrix
+
+    def tearDown(self):
+        registry.reset("nlp")
+
+    def testSimilarity(self):
+        sim = lexrank_similarity(self.tfidf).toarray()
+        for i in range(len(sents)):
+            for j in range(len(sents)):
+                self.assertAlmostEqual(sim[i,j],get_cos(self.dense[i],self.dense[j]))
+
+        binary = lexrank_similarity(self.tfidf,0.1).toarray()
+        np.testing.assert_array_equal(binary,(sim > 0.1).astype(float))
+
+    def testPagerank(self):
+        #以前的图: 两两之间都加边, 权重是余弦相似度
+        graph = nx.Graph()
+        graph.add_nodes_from(range(len(sents)))
+        for i in range(len(sents)):
+            for j in range(len(sents)):
+                graph.add_edge(i,j,weight=get_cos(self.dense[i],self.dense[j]))
+        expect = nx.pagerank(graph,tol=1.0e-10)
+
+        result = pagerank_matrix(lexrank_similarity(self.tfidf),tol=1.0e-10)
+        for node in expect:
+            self.assertAlmostEqual(result[node],expect[node],places=8)
+
+if __name__ == '__main__':
+    unittest.main()
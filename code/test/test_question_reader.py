@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+
+'''
+测试流式读Yahoo Answers数据, 和以前整个文件读进来用正则找的结果一样
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.question_reader import iter_xml_questions,iter_json_questions,iter_questions
+
+import os
+import re
+import gzip
+import json
+import tempfile
+import unittest
+
+xml_data = '''<?xml version="1.0" encoding="UTF-8"?>
+<ystfeed>
+<vespaadd><document type="wisdom">
+  <uri>1</uri>
+  <subject>How do I fix a flat tire?</subject>
+  <content>My bike has a flat.</content>
+  <bestanswer>Patch the tube.</bestanswer>
+  <nbestanswers><answer_item>Patch the tube.</answer_item><answer_item>Buy a new tire.</answer_item></nbestanswers>
+</document></vespaadd>
+<vespaadd><document type="wisdom">
+  <uri>2</uri>
+  <subject>Why is the sky blue?</subject>
+  <bestanswer>Rayleigh scattering.</bestanswer>
+  <nbestanswers><answer_item>Rayleigh scattering.</answer_item></nbestanswers>
+</document></vespaadd>
+</ystfeed>
+'''
+
+#以前read_raw_data.extract1的做法
+def regex_xml_questions(text):
+    question_re = re.compile(r"<vespaadd>(.+?)</vespaadd>",re.DOTALL)
+    title_re = re.compile(r"<subject>(.+?)</subject>",re.DOTALL)
+    content_re = re.compile(r"<content>(.+?)</content>",re.DOTALL)
+    best_re = re.compile(r"<bestanswer>(.+?)</bestanswer>",re.DOTALL)
+    nbest_re = re.compile(r"<answer_item>(.+?)</answer_item>",re.DOTALL)
+
+    result = []
+    for item in question_re.findall(text):
+        content = content_re.findall(item)
+        content = content[0] if len(content) > 0 else ""
+        result.append((title_re.findall(item)[0],content,best_re.findall(item)[0],nbest_re.findall(item)))
+    return result
+
+def question_fields(question):
+    return (question.get_title(),question.get_content(),question.get_best(),[answer.get_content() for answer in question.get_nbest()])
+
+def question_line(title,count,author):
+    return json.dumps({"subject":title,"answercount":count,"postuser":author})
+
+def answer_line(content,support,oppose,author):
+    return json.dumps({"content":content,"supportnum":str(support),"opposenum":str(oppose),"answeruser":author})
+
+json_lines = [
+    "[",
+    question_line("q1","2","alice")+",",
+    answer_line("first answer",3,1,"bob")+",",
+    answer_line("second answer",0,0,"carl")+",",
+    "",
+    question_line("no answer","","dave")+",",
+    '{"content": "broken',
+    question_line("q3","1","erin")+",",
+    answer_line("third answer",1,2,"fay"),
+    "]",
+]
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self,name,text,compress=False):
+        fn = os.path.join(self.dir.name,name)
+        opener = gzip.open if compress else open
+        with opener(fn,"wt",encoding="utf-8") as out:
+            out.write(text)
+        return fn
+
+    def testXml(self):
+        fn = self.write("manner.xml",xml_data)
+        result = [question_fields(q) for q in iter_xml_questions(fn)]
+        self.assertEqual(result,regex_xml_questions(xml_data))
+
+        gz = self.write("manner.xml.gz",xml_data,compress=True)
+        self.assertEqual([question_fields(q) for q in iter_questions(gz)],result)
+
+    def testJson(self):
+        fn = self.write("computers.json","\n".join(json_lines)+"\n")
+        questions = list(iter_json_questions(fn))
+
+        #没有答案的问题不要, 解析不了的行跳过
+        self.assertEqual([q.get_title() for q in questions],["q1","q3"])
+        self.assertEqual([q.get_author() for q in questions],["alice","erin"])
+        self.assertEqual([q.get_answer_count() for q in questions],[2,1])
+
+        answers = [(a.get_content(),a.get_support(),a.get_oppose(),a.get_author()) for a in questions[0].get_nbest()]
+        self.assertEqual(answers,[("first answer",3,1,"bob"),("second answer",0,0,"carl")])
+
+        gz = self.write("computers.json.gz","\n".join(json_lines)+"\n",compress=True)
+        self.assertEqual([question_fields(q) for q in iter_questions(gz)],[question_fields(q) for q in questions])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+
+'''
+测试question_store的写入, 按qid/切片读, 追加和pickle
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.common_type import Question,Answer
+from insummer.question_store import question_store,question_store_writer,build_question_store
+
+import os
+import pickle
+import tempfile
+import unittest
+
+def make_question(indx):
+    nbest = [Answer("answer %s %s"%(indx,i),i,0,"user%s"%(i),clean_tag=False) for i in range(3)]
+    return Question("title %s"%(indx),"content","best",nbest,"author%s"%(indx),3,clean_tag=False)
+
+def dump(question):
+    nbest = [(a.get_content(),a.get_support(),a.get_oppose(),a.get_author()) for a in question.get_nbest()]
+    return (question.get_title(),question.get_content(),question.get_best(),nbest,question.get_author(),question.get_answer_count())
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.prefix = os.path.join(self.dir.name,"qa")
+        self.questions = [make_question(i) for i in range(10)]
+        build_question_store(self.questions,self.prefix)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def testGet(self):
+        store = question_store(self.prefix)
+        self.assertEqual(len(store),10)
+        self.assertEqual(dump(store[3]),dump(self.questions[3]))
+        self.assertEqual(dump(store[-1]),dump(self.questions[-1]))
+        self.assertEqual([dump(q) for q in store[2:5]],[dump(q) for q in self.questions[2:5]])
+        self.assertRaises(IndexError,store.get,10)
+
+    def testAppend(self):
+        with question_store_writer(self.prefix) as writer:
+            self.assertEqual(writer.append(make_question(10)),10)
+
+        store = question_store(self.prefix)
+        self.assertEqual(len(store),11)
+        self.assertEqual(store[10].get_title(),"title 10")
+
+    def testCrashedAppend(self):
+        #记录写进去了, 位置没写(写到一半断了), 还有半个位置
+        with open(self.prefix+".qs","ab") as data_file:
+            data_file.write(b"orphan record bytes")
+        with open(self.prefix+".qidx","ab") as index_file:
+            index_file.write(b"\x01\x02\x03")
+
+        with question_store_writer(self.prefix) as writer:
+            self.assertEqual(writer.append(make_question(10)),10)
+            self.assertEqual(writer.append(make_question(11)),11)
+
+        store = question_store(self.prefix)
+        self.assertEqual(len(store),12)
+        self.assertEqual(dump(store[10]),dump(make_question(10)))
+        self.assertEqual(dump(store[11]),dump(make_question(11)))
+        self.assertEqual(dump(store[9]),dump(self.questions[9]))
+
+    def testOldPickle(self):
+        #以前的pickle里没有_Question__analysis
+        question = make_question(0)
+        del question._Question__analysis
+        question = pickle.loads(pickle.dumps(question))
+        self.assertIs(question.get_analysis(),question.get_analysis())
+
+    def testPickle(self):
+        store = pickle.loads(pickle.dumps(question_store(self.prefix)))
+        self.assertEqual(dump(store[7]),dump(self.questions[7]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+'''
+测试进程内的ROUGE, 和手算的结果比
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer import evaluation
+from insummer.evaluation import rouge_score,rouge_tokens,rouge_confidence
+
+import unittest
+
+class test(unittest.TestCase):
+
+    def testTokens(self):
+        self.assertEqual(rouge_tokens("The cats, running!"),["the","cat","run"])
+        self.assertEqual(rouge_tokens("The cats, running!",stem=False),["the","cats","running"])
+
+    def testScore(self):
+        peer = "the cat sat on the mat"
+        models = ["the cat was on the mat","a dog sat"]
+        score = rouge_score(peer,models,stem=False)
+
+        #unigram: 第一个model命中5个(the*2,cat,on,mat), 第二个命中1个(sat)
+        self.assertAlmostEqual(score["ROUGE-1"]["R"],6/9)
+        self.assertAlmostEqual(score["ROUGE-1"]["P"],6/12)
+
+        #bigram: the_cat, on_the, the_mat
+        self.assertAlmostEqual(score["ROUGE-2"]["R"],3/7)
+        self.assertAlmostEqual(score["ROUGE-2"]["P"],3/10)
+
+        r,p = score["ROUGE-2"]["R"],score["ROUGE-2"]["P"]
+        self.assertAlmostEqual(score["ROUGE-2"]["F"],2*p*r/(p+r))
+
+    def testHigherOrder(self):
+        #三元组不一样, 前面的词id模4相同也不能算命中
+        score = rouge_score("alpha beta gamma",["eps beta gamma"],n=3,stem=False)
+        self.assertAlmostEqual(score["ROUGE-3"]["F"],0.0)
+        self.assertAlmostEqual(score["ROUGE-2"]["F"],0.5)
+
+        peer = "a b c d a b c e"
+        models = ["a b c d","b c e a b c d"]
+        score = rouge_score(peer,models,n=4,stem=False)
+        #trigram: 第一个model命中 abc,bcd, 第二个命中 bce,abc,bcd
+        self.assertAlmostEqual(score["ROUGE-3"]["R"],5/7)
+        self.assertAlmostEqual(score["ROUGE-3"]["P"],5/12)
+        #4-gram: 第一个model命中 abcd, 第二个命中 abcd
+        self.assertAlmostEqual(score["ROUGE-4"]["R"],2/5)
+
+    def testSame(self):
+        score = rouge_score("a b c d e f",["a b c d e f"])
+        for metric in score:
+            self.assertAlmostEqual(score[metric]["F"],1.0)
+
+    def testConfidence(self):
+        scores = [rouge_score("a b c",["a b d"]),rouge_score("a b c",["x y z"])]
+        conf = rouge_confidence(scores,seed=1)
+        mean,low,high = conf["ROUGE-1"]["R"]
+        self.assertAlmostEqual(mean,1/3)
+        self.assertTrue(low <= mean <= high)
+
+    def testBoundedIds(self):
+        peers = ["the cat sat on mat number %s"%(indx) for indx in range(30)]
+        models = ["a cat sat on the mat %s"%(indx) for indx in range(30)]
+        expect = [rouge_score(peer,[model],n=3) for peer,model in zip(peers,models)]
+
+        old_limit = evaluation.ROUGE_ID_LIMIT
+        evaluation.ROUGE_ID_LIMIT = 20
+        try:
+            for peer,model,score in zip(peers,models,expect):
+                self.assertEqual(rouge_score(peer,[model],n=3),score)
+                #一次调用最多加这两个文本的词和前缀
+                size = len(evaluation.ROUGE_VOCAB) + sum([len(table) for table in evaluation.ROUGE_PREFIX.values()])
+                self.assertLessEqual(size,20+30)
+        finally:
+            evaluation.ROUGE_ID_LIMIT = old_limit
+
+if __name__ == '__main__':
+    unittest.main()
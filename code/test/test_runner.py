@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+
+'''
+测试实验的运行器, checkpoint里面跑完的问题不会重跑, 参数改了就重跑
+'''
+
+import sys
+sys.path.append("..")
+sys.path.append("../exp")
+import insummer
+from runner import run,task_fingerprint
+
+import os
+import functools
+import tempfile
+import unittest
+
+calls = []
+
+def square(qid,q,scale=1):
+    calls.append(qid)
+    if q is None:
+        raise ValueError("no question")
+    return {"value":q*q*scale}
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        del calls[:]
+        self.dir = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.dir.name,"exp.ckpt")
+        self.questions = [1,2,None,4]
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def testResume(self):
+        results = run(self.questions,square,checkpoint=self.checkpoint,qids=[0,1])
+        self.assertEqual(results,{0:{"value":1},1:{"value":4}})
+
+        #最后一行写到一半就挂了
+        with open(self.checkpoint,"a") as ckpt_file:
+            ckpt_file.write('{"qid":3,"ta')
+
+        del calls[:]
+        results = run(self.questions,square,checkpoint=self.checkpoint)
+        self.assertEqual(sorted(calls),[2,3])
+        self.assertEqual(results,{0:{"value":1},1:{"value":4},3:{"value":16}})
+
+        #出错的问题不写checkpoint, 下次再跑
+        del calls[:]
+        run(self.questions,square,checkpoint=self.checkpoint)
+        self.assertEqual(calls,[2])
+
+    def testParameters(self):
+        run(self.questions,functools.partial(square,scale=2),checkpoint=self.checkpoint,qids=[0,1])
+
+        del calls[:]
+        results = run(self.questions,functools.partial(square,scale=3),checkpoint=self.checkpoint,qids=[0,1])
+        self.assertEqual(sorted(calls),[0,1])
+        self.assertEqual(results,{0:{"value":3},1:{"value":12}})
+
+        del calls[:]
+        results = run(self.questions,functools.partial(square,scale=2),checkpoint=self.checkpoint,qids=[0,1])
+        self.assertEqual(calls,[])
+        self.assertEqual(results,{0:{"value":2},1:{"value":8}})
+
+    def testFingerprint(self):
+        self.assertEqual(task_fingerprint(functools.partial(functools.partial(square,scale=2),3)),task_fingerprint(functools.partial(square,3,scale=2)))
+        self.assertNotEqual(task_fingerprint(square),task_fingerprint(functools.partial(square,scale=1)))
+
+if __name__ == '__main__':
+    unittest.main()
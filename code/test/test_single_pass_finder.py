@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+
+'''
+测试一遍完成的实体抽取, 在固定的句子上和NgramEntityFinder的结果一样
+KB换成一个固定的概念集合
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer import registry
+from insummer.query_expansion.entity_finder import NgramEntityFinder,SinglePassNgramEntityFinder
+from insummer.query_expansion.entity_finder import MoreNgramEntityFinder,SinglePassMoreNgramEntityFinder
+
+import unittest
+
+class fixed_kb:
+    def __init__(self,concepts):
+        self.concepts = set(concepts)
+
+    def kb_has_concept(self,word):
+        return word in self.concepts
+
+    def kb_has_concepts(self,words):
+        return [word in self.concepts for word in words]
+
+sentence = "Motorcycles emit large amounts of nitrogen oxides"
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        registry.provide("cp_tool",fixed_kb(["motorcycle","emit","amount","nitrogen_oxide","oxide"]))
+
+    def tearDown(self):
+        registry.reset("cp_tool")
+
+    def testNgram(self):
+        expect = NgramEntityFinder(sentence).extract_entity()
+        result = SinglePassNgramEntityFinder(sentence).extract_entity()
+        self.assertEqual(sorted(result),sorted(expect))
+        self.assertIn("nitrogen_oxide",result)
+
+    def testMoreNgram(self):
+        expect = MoreNgramEntityFinder(sentence).extract_entity()
+        result = SinglePassMoreNgramEntityFinder(sentence).extract_entity()
+        self.assertEqual(sorted(result),sorted(expect))
+
+if __name__ == '__main__':
+    unittest.main()
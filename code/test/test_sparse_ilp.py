@@ -0,0 +1,100 @@
+#!/usr/bin/python3
+
+'''
+测试稀疏的ILP模型, OCC/权重和以前稠密的一样, 解出来的目标值和以前的模型一样
+实体扩展换成固定的数据, 不查KB
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.summarization.ilp import abstract_ilp
+
+import random
+import unittest
+import numpy as np
+from pulp import LpProblem,LpMaximize,LpVariable,LpInteger,lpSum,value,PULP_CBC_CMD
+
+class fixed_analysis:
+    def __init__(self,lengths):
+        self.lengths = lengths
+
+    def get_length(self,sent):
+        return self.lengths[sent]
+
+class fixed_expansion:
+    def title_entity(self):
+        return []
+
+#以前的模型: 稠密的OCC, 每个实体的约束里面有所有的句子
+def dense_objective(ilp):
+    entity_num,sent_num = len(ilp.entity_index),len(ilp.sent_index)
+    OCC = [[0 for j in range(sent_num)] for i in range(entity_num)]
+    for sent,entities in ilp.candidate_sentence_entities_dict.items():
+        for entity in entities:
+            OCC[ilp.entity_index[entity]][ilp.sent_index[sent]] = 1
+
+    prob = LpProblem("dense",LpMaximize)
+    x = LpVariable.dicts("x",range(entity_num),cat=LpInteger,lowBound=0,upBound=10)
+    y = LpVariable.dicts("y",range(sent_num),cat=LpInteger,lowBound=0,upBound=1)
+
+    def sent_weight(j):
+        entities = ilp.candidate_sentence_entities_dict[ilp.sent_inverse_index[j]]
+        ew = sum(ilp.hit_entities[entity] for entity in entities)
+        return 2*len(entities) + ew/2
+
+    prob += lpSum([x[i]*ilp.hit_entities[ilp.entity_inverse_index[i]] for i in range(entity_num)] + [y[j]*sent_weight(j) for j in range(sent_num)])
+    length = lpSum([y[j]*ilp.analysis.get_length(ilp.sent_inverse_index[j]) for j in range(sent_num)])
+    prob += length <= ilp.word_limit
+    prob += length >= ilp.word_limit - 100
+    for i in range(entity_num):
+        prob += lpSum([OCC[i][j]*y[j] for j in range(sent_num)] + [-1*x[i]]) == 0
+
+    prob.solve(PULP_CBC_CMD(msg=False))
+    return OCC,value(prob.objective)
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        rand = random.Random(3)
+        entities = ["e%s"%(indx) for indx in range(12)]
+        self.sents = ["sentence %s"%(indx) for indx in range(30)]
+
+        ilp = abstract_ilp.__new__(abstract_ilp)
+        ilp.word_limit = 150
+        ilp.ep = fixed_expansion()
+        ilp.analysis = fixed_analysis({sent:rand.randint(5,30) for sent in self.sents})
+        ilp.hit_entities = {entity:rand.uniform(-1,3) for entity in entities[:9]}
+        #重复的句子只算一次
+        ilp.answer_entities_list = [(sent,rand.sample(entities,rand.randint(0,5))) for sent in self.sents + self.sents[:3]]
+        ilp.ilp_prepare(min_el=0,min_sl=8,max_sl=25)
+        self.ilp = ilp
+
+    def testPrepare(self):
+        ilp = self.ilp
+        OCC,objective = dense_objective(ilp)
+        np.testing.assert_array_equal(ilp.OCC.toarray(),np.array(OCC).reshape(ilp.OCC.shape))
+
+        for j,sent in ilp.sent_inverse_index.items():
+            entities = ilp.candidate_sentence_entities_dict[sent]
+            self.assertAlmostEqual(ilp.sent_weight[j],2*len(entities)+sum(ilp.hit_entities[entity] for entity in entities)/2)
+            self.assertEqual(ilp.sent_length[j],ilp.analysis.get_length(sent))
+            self.assertTrue(8 <= ilp.sent_length[j] <= 25)
+
+    def testSolve(self):
+        ilp = self.ilp
+        OCC,expect = dense_objective(ilp)
+        sent_list = ilp.ilp()
+
+        #用选出来的句子算目标值, 每个实体的x就是选中的句子里面它出现的次数
+        y = np.array([1 if ilp.sent_inverse_index[j] in sent_list else 0 for j in range(len(ilp.sent_index))])
+        x = ilp.OCC.dot(y)
+        self.assertAlmostEqual(float(ilp.entity_weight.dot(x) + ilp.sent_weight.dot(y)),expect,places=4)
+
+        length = sum(ilp.analysis.get_length(sent) for sent in sent_list)
+        self.assertTrue(ilp.word_limit - 100 <= length <= ilp.word_limit)
+        #按句子在答案里的顺序
+        self.assertEqual(sent_list,sorted(sent_list,key=ilp.sent_index.get))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+
+'''
+测试排好序的字符串表, 查找的结果和python的set一样
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.knowledge_base.string_table import string_table,build_string_table
+
+import os
+import random
+import tempfile
+import unittest
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.prefix = os.path.join(self.dir.name,"concept")
+
+        rand = random.Random(1)
+        letters = "abcé_"
+        self.names = set(["".join(rand.choice(letters) for i in range(rand.randint(1,6))) for j in range(300)])
+        self.names.add("北京")
+        self.sorted_names = build_string_table(self.names,self.prefix)
+        self.table = string_table(self.prefix)
+
+        #一半在表里, 一半不在
+        self.queries = list(self.names)[:100] + ["".join(rand.choice(letters) for i in range(rand.randint(1,7))) for j in range(200)]
+        self.queries += ["","zzz","北","北京"]
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def testIndex(self):
+        self.assertEqual(len(self.table),len(self.names))
+        self.assertEqual(list(self.table),self.sorted_names)
+        for indx,name in enumerate(self.sorted_names):
+            self.assertEqual(self.table.index(name),indx)
+            self.assertEqual(self.table.name(indx),name)
+
+        for name in self.queries:
+            self.assertEqual(name in self.table,name in self.names)
+            if name not in self.names:
+                self.assertEqual(self.table.index(name),-1)
+
+    def testContainsMany(self):
+        #有重复, 顺序是乱的
+        queries = self.queries + self.queries[::-1]
+        self.assertEqual(self.table.contains_many(queries),[name in self.names for name in queries])
+        self.assertEqual(self.table.contains_many([]),[])
+
+    def testEmpty(self):
+        prefix = os.path.join(self.dir.name,"empty")
+        build_string_table([],prefix)
+        table = string_table(prefix)
+        self.assertEqual(len(table),0)
+        self.assertEqual(table.index("a"),-1)
+        self.assertEqual(table.contains_many(["a","b"]),[False,False])
+
+if __name__ == '__main__':
+    unittest.main()
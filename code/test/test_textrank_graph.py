@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+
+'''
+测试倒排索引建的TextRank句子图, 和以前所有句子两两组合算共现词的结果一样
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer.summarization.textrank_graph import overlap_matrix,overlap_edges
+from insummer.graph_rank import pagerank_matrix
+
+import random
+import itertools
+import unittest
+from math import log
+import networkx as nx
+
+#以前的sent_sim: 共现词数 / (log(词数1) + log(词数2))
+def sent_sim(tokens1,tokens2):
+    return len(set(tokens1) & set(tokens2)) / (log(len(tokens1)) + log(len(tokens2)))
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        rand = random.Random(1)
+        words = ["w%s"%(indx) for indx in range(30)]
+        self.token_lists = [[rand.choice(words) for i in range(rand.randint(2,10))] for j in range(25)]
+        #没有共现词的句子, 和重复的词
+        self.token_lists.append(["alone","alone","here"])
+
+    def testMatrix(self):
+        matrix = overlap_matrix(self.token_lists).toarray()
+        N = len(self.token_lists)
+        for i,j in itertools.combinations(range(N),2):
+            self.assertAlmostEqual(matrix[i,j],sent_sim(self.token_lists[i],self.token_lists[j]))
+            self.assertEqual(matrix[i,j],matrix[j,i])
+        for i in range(N):
+            self.assertEqual(matrix[i,i],0)
+
+        #只有有共现词的句子对才有边
+        edges = overlap_edges(self.token_lists)
+        self.assertEqual(len(edges),(matrix > 0).sum() // 2)
+        self.assertTrue(all(i < j and weight > 0 for i,j,weight in edges))
+
+    def testPagerank(self):
+        #以前的完全图
+        graph = nx.Graph()
+        graph.add_nodes_from(range(len(self.token_lists)))
+        for i,j in itertools.combinations(range(len(self.token_lists)),2):
+            graph.add_edge(i,j,weight=sent_sim(self.token_lists[i],self.token_lists[j]))
+        expect = nx.pagerank(graph,tol=1.0e-10)
+
+        result = pagerank_matrix(overlap_matrix(self.token_lists),tol=1.0e-10)
+        for node in expect:
+            self.assertAlmostEqual(result[node],expect[node],places=8)
+
+    def testSingleWord(self):
+        #两个句子都只有一个词, 以前除0, 现在不连边
+        matrix = overlap_matrix([["a"],["a"],["a","b"],[]])
+        self.assertEqual(matrix[0,1],0)
+        self.assertAlmostEqual(matrix[0,2],1/log(2))
+        self.assertEqual(matrix[3].nnz,0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+'''
+测试tfidf矩阵, 和以前稠密的一列一列算的结果一样
+分词换成按空格切
+'''
+
+import sys
+sys.path.append("..")
+import insummer
+from insummer import registry
+from insummer.summarization.tfidf import TFIDF,idf_table
+
+import os
+import math
+import tempfile
+import unittest
+import numpy as np
+
+class split_nlp:
+    def word_tokenize(self,sent):
+        return sent.split()
+
+sents = [
+    "the cat sat on the mat",
+    "the dog sat",
+    "a cat and a dog",
+    "mat mat mat",
+]
+
+#以前的做法, 词表是set转的list, 每一列 log(词表大小/总次数)
+def dense_tfidf(token_lists):
+    words = list(set(word for tokens in token_lists for word in tokens))
+    matrix = np.zeros((len(token_lists),len(words)))
+    for idx,tokens in enumerate(token_lists):
+        for word in tokens:
+            matrix[idx,words.index(word)] += 1
+    for col in range(len(words)):
+        matrix[:,col] *= math.log(len(words) / matrix[:,col].sum())
+    return words,matrix
+
+class test(unittest.TestCase):
+
+    def setUp(self):
+        registry.provide("nlp",split_nlp())
+
+    def tearDown(self):
+        registry.reset("nlp")
+
+    def testDense(self):
+        tfidf = TFIDF(sents)
+        words,expect = dense_tfidf([sent.split() for sent in sents])
+
+        #列的顺序不一样, 按词对上
+        order = [tfidf.vocab[word] for word in words]
+        np.testing.assert_allclose(tfidf.matrix[:,order],expect)
+        np.testing.assert_allclose(tfidf.sparse.toarray(),tfidf.matrix)
+        self.assertEqual(tfidf.counts[3,tfidf.vocab["mat"]],3)
+
+    def testNormalized(self):
+        tfidf = TFIDF(sents+[""])
+        normalized = tfidf.get_normalized().toarray()
+        np.testing.assert_allclose(np.linalg.norm(normalized[:4],axis=1),np.ones(4))
+        np.testing.assert_allclose(normalized[4],np.zeros(tfidf.word_num))
+
+    def testIdfTable(self):
+        table = idf_table().add_many([sent.split() for sent in sents])
+        self.assertEqual(table.doc_num,4)
+        self.assertEqual(table.df["the"],2)
+
+        idf = table.get_idf(["the","mat","unknown"])
+        np.testing.assert_allclose(idf,[math.log(5/3),math.log(5/3),math.log(5)])
+
+        tfidf = TFIDF(sents[:2],table)
+        np.testing.assert_allclose(tfidf.idf,table.get_idf(tfidf.words))
+        self.assertAlmostEqual(tfidf.matrix[0,tfidf.vocab["the"]],2*math.log(5/3))
+
+        with tempfile.TemporaryDirectory() as dirname:
+            fn = os.path.join(dirname,"idf.pkl")
+            table.save(fn)
+            loaded = idf_table.load(fn)
+        np.testing.assert_allclose(loaded.get_idf(["the","cat","x"]),table.get_idf(["the","cat","x"]))
+
+if __name__ == '__main__':
+    unittest.main()